@@ -0,0 +1,149 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import config
+from image_pipeline import preprocess_image
+from perceptual_hash import hamming_distance
+from prompts import vision_detail
+
+VISION_MODEL = "gpt-4-turbo"
+VISION_SYSTEM_PROMPT = """You are an expert in battery analysis.
+Identify the battery and provide details in a structured format with headers:
+- Type: (e.g., Alkaline, Lithium-ion, NiMH)
+- Voltage:
+- Size/Form Factor:
+- Common Uses:
+- Approximate Capacity:
+- Shelf Life:
+- Safety Handling:
+- Recycling Instructions:"""
+
+
+# Send one preprocessed image to the vision model and return its details text.
+# Simple images go at low detail (see prompts.vision_detail).
+def analyze_battery_image(client, processed):
+    detail, tokens_saved = vision_detail(processed)
+    response = client.chat.completions.create(
+        call_site="vision",
+        tokens_saved=tokens_saved,
+        model=VISION_MODEL,
+        messages=[
+            {"role": "system", "content": VISION_SYSTEM_PROMPT},
+            {"role": "user", "content": [
+                {"type": "text", "text": "Analyze this battery and provide its details."},
+                {"type": "image_url", "image_url": {"url": processed.data_url, "detail": detail}}
+            ]}
+        ],
+        max_tokens=500,
+        timeout=config.OPENAI_VISION_TIMEOUT
+    )
+    return response.choices[0].message.content
+
+
+# Raised for batch images the local detector rejects before any API call
+class NotABatteryError(Exception):
+    def __init__(self, detection):
+        super().__init__(f"doesn't look like a battery ({detection.battery_probability:.0%} battery probability)")
+        self.detection = detection
+
+
+def _preprocess_upload(upload):
+    name, raw = upload
+    try:
+        return name, preprocess_image(raw), None
+    except Exception as e:
+        return name, None, e
+
+
+# Analyze one preprocessed image (runs on a worker thread). Near-duplicates
+# of a past analysis reuse its details instead of calling the vision model.
+# Retries and rate limiting are handled by the shared client.
+def _analyze_processed(client, processed, find_duplicate):
+    if find_duplicate is not None:
+        details = find_duplicate(processed)
+        if details is not None:
+            return details, True
+    return analyze_battery_image(client, processed), False
+
+
+# The same checks for a single image outside a batch (live capture frames):
+# raises NotABatteryError when the detector rejects it, otherwise returns
+# (details, reused)
+def analyze_checked(client, processed, find_duplicate=None, detector=None,
+                    reject_below=config.DETECTOR_REJECT_BELOW):
+    if detector is not None:
+        detection = detector.predict_bytes([processed.data])[0]
+        if detection.battery_probability < reject_below:
+            raise NotABatteryError(detection)
+    return _analyze_processed(client, processed, find_duplicate)
+
+
+# Group a batch's prepared uploads so each image is analyzed once: identical
+# files always share a group, and with dedupe on (max_distance not None) so
+# do near-identical photos. Returns [(leader, [followers])].
+def _group_duplicates(prepared, max_distance):
+    groups = []
+    for name, processed in prepared:
+        for leader, followers in groups:
+            same = leader[1].digest == processed.digest or (
+                max_distance is not None and hamming_distance(leader[1].phash, processed.phash) <= max_distance
+            )
+            if same:
+                followers.append((name, processed))
+                break
+        else:
+            groups.append(((name, processed), []))
+    return groups
+
+
+# Analyze many uploads concurrently with at most `concurrency` requests in
+# flight. Yields (name, processed, details, reused, error) as each one
+# finishes so the caller can render results incrementally. `find_duplicate`,
+# if given, maps a processed image to previously stored details or None;
+# duplicates within the batch are also analyzed once, the others reported
+# as reused. With a `detector`, the whole batch is scored locally in one pass
+# first and images below `reject_below` battery probability never reach the
+# API. Closing the generator early cancels the analyses not yet started.
+def analyze_batch(client, uploads, concurrency=config.BATCH_CONCURRENCY, find_duplicate=None,
+                  detector=None, reject_below=config.DETECTOR_REJECT_BELOW,
+                  max_distance=config.DEDUPE_MAX_DISTANCE):
+    concurrency = max(1, min(concurrency, config.BATCH_MAX_CONCURRENCY))
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="battery-batch")
+    try:
+        prepared = []
+        for name, processed, error in executor.map(_preprocess_upload, uploads):
+            if error is not None:
+                yield name, None, None, False, error
+            else:
+                prepared.append((name, processed))
+
+        if detector is not None and prepared:
+            detections = detector.predict_bytes([processed.data for _, processed in prepared])
+            accepted = []
+            for (name, processed), detection in zip(prepared, detections):
+                if detection.battery_probability < reject_below:
+                    yield name, processed, None, False, NotABatteryError(detection)
+                else:
+                    accepted.append((name, processed))
+            prepared = accepted
+
+        groups = _group_duplicates(prepared, max_distance if find_duplicate is not None else None)
+        futures = {
+            executor.submit(_analyze_processed, client, leader[1], find_duplicate): (leader, followers)
+            for leader, followers in groups
+        }
+        for future in as_completed(futures):
+            (name, processed), followers = futures[future]
+            try:
+                details, reused = future.result()
+            except Exception as e:
+                yield name, processed, None, False, e
+                for name, processed in followers:
+                    yield name, processed, None, False, e
+            else:
+                yield name, processed, details, reused, None
+                for name, processed in followers:
+                    yield name, processed, details, True, None
+    finally:
+        # Don't wait for (or pay for) queued analyses when the caller stops
+        # early, e.g. the user leaves the page mid-batch
+        executor.shutdown(wait=False, cancel_futures=True)
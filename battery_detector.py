@@ -0,0 +1,111 @@
+import io
+import os
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+NOT_BATTERY = "not_battery"
+INPUT_SIZE = 64
+HIST_BINS = 8
+ORIENTATION_BINS = 8
+
+
+@dataclass(frozen=True)
+class Detection:
+    battery_probability: float
+    label: str
+    confidence: float
+
+    @property
+    def is_battery(self):
+        return self.label != NOT_BATTERY
+
+
+def load_image(data):
+    image = Image.open(io.BytesIO(data))
+    # JPEG decoders can downscale while decoding, which is most of the cost
+    image.draft("RGB", (INPUT_SIZE * 2, INPUT_SIZE * 2))
+    return image
+
+
+# Hand-crafted features of a 64x64 thumbnail: HSV colour histograms,
+# gradient-orientation histogram, edge density and brightness statistics
+def extract_features(image):
+    small = image.convert("RGB").resize((INPUT_SIZE, INPUT_SIZE), Image.BILINEAR)
+    hsv = np.asarray(small.convert("HSV"), dtype=np.float32) / 255.0
+    gray = np.asarray(small.convert("L"), dtype=np.float32) / 255.0
+
+    colour = [
+        np.histogram(hsv[..., channel], bins=HIST_BINS, range=(0.0, 1.0))[0] / hsv[..., channel].size
+        for channel in range(3)
+    ]
+
+    gx = np.diff(gray, axis=1)[:-1, :]
+    gy = np.diff(gray, axis=0)[:, :-1]
+    magnitude = np.hypot(gx, gy)
+    angle = np.mod(np.arctan2(gy, gx), np.pi)
+    orientation = np.histogram(angle, bins=ORIENTATION_BINS, range=(0.0, np.pi), weights=magnitude)[0]
+    orientation = orientation / (orientation.sum() + 1e-6)
+
+    stats = [(magnitude > 0.1).mean(), gray.mean(), gray.std(), hsv[..., 1].mean()]
+    return np.concatenate(colour + [orientation, np.asarray(stats)]).astype(np.float32)
+
+
+def softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+# Multinomial logistic regression over extract_features(). Class 0 is
+# NOT_BATTERY; the others are coarse chemistry / form-factor labels.
+class BatteryDetector:
+    def __init__(self, classes, weights, bias, mean, std):
+        self.classes = list(classes)
+        self.weights = weights
+        self.bias = bias
+        self.mean = mean
+        self.std = std
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as model:
+            return cls([str(c) for c in model["classes"]], model["weights"], model["bias"],
+                       model["mean"], model["std"])
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez(path, classes=np.asarray(self.classes), weights=self.weights, bias=self.bias,
+                 mean=self.mean, std=self.std)
+
+    def predict_proba(self, features):
+        return softmax(((features - self.mean) / self.std) @ self.weights + self.bias)
+
+    # One Detection per image; all images go through a single matrix multiply
+    def predict(self, images):
+        if not images:
+            return []
+        features = np.stack([extract_features(image) for image in images])
+        probabilities = self.predict_proba(features)
+        not_battery = self.classes.index(NOT_BATTERY)
+
+        detections = []
+        for row in probabilities:
+            best = int(row.argmax())
+            detections.append(Detection(
+                battery_probability=float(1.0 - row[not_battery]),
+                label=self.classes[best],
+                confidence=float(row[best]),
+            ))
+        return detections
+
+    def predict_bytes(self, datas):
+        return self.predict([load_image(data) for data in datas])
+
+
+# The detector, or None when no trained model file is available
+def load_detector(path):
+    if not path or not os.path.exists(path):
+        return None
+    return BatteryDetector.load(path)
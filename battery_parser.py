@@ -0,0 +1,170 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+# Canonical battery types and the spellings the vision model uses for them
+TYPE_SYNONYMS = {
+    "Alkaline": ["alkaline", "alkaline manganese", "alkaline-manganese", "alkaline manganese dioxide"],
+    "Lithium-ion": ["lithium-ion", "lithium ion", "li-ion", "li ion", "lithium-ion polymer", "lithium polymer",
+                    "li-po", "lipo", "li-polymer", "18650 li-ion"],
+    "LiFePO4": ["lifepo4", "lithium iron phosphate", "lfp"],
+    "Lithium": ["lithium", "lithium primary", "lithium metal", "lithium manganese dioxide", "li-mno2",
+                "lithium iron disulfide", "li-fes2", "lithium thionyl chloride", "li-socl2"],
+    "NiMH": ["nimh", "ni-mh", "nickel-metal hydride", "nickel metal hydride", "nickel-metal-hydride"],
+    "NiCd": ["nicd", "ni-cd", "nicad", "nickel-cadmium", "nickel cadmium"],
+    "Lead Acid": ["lead acid", "lead-acid", "sealed lead acid", "sealed lead-acid", "sla", "agm", "vrla"],
+    "Zinc-Carbon": ["zinc-carbon", "zinc carbon", "carbon-zinc", "carbon zinc", "zinc chloride", "heavy duty"],
+    "Zinc-Air": ["zinc-air", "zinc air"],
+    "Silver Oxide": ["silver oxide", "silver-oxide", "silver-zinc"],
+    "Button Cell": ["button cell", "button-cell", "coin cell", "coin-cell"],
+}
+
+_SYNONYM_TO_TYPE = {synonym: canonical for canonical, synonyms in TYPE_SYNONYMS.items() for synonym in synonyms}
+
+# One alternation over every synonym, longest first so "lithium-ion" wins
+# over "lithium" at the same position; the lookarounds stop matches inside
+# longer words ("lithium" in "lithium-ion", "sla" in "translated").
+_TYPE_PATTERN = re.compile(
+    r"(?<![\w-])(" + "|".join(re.escape(s) for s in sorted(_SYNONYM_TO_TYPE, key=len, reverse=True)) + r")(?![\w-])",
+    re.IGNORECASE,
+)
+
+# Section headers of the structured vision response and the record field
+# each one fills
+HEADERS = {
+    "type": "type",
+    "battery type": "type",
+    "chemistry": "type",
+    "voltage": "voltage",
+    "nominal voltage": "voltage",
+    "size/form factor": "form_factor",
+    "size / form factor": "form_factor",
+    "form factor": "form_factor",
+    "size": "form_factor",
+    "common uses": "common_uses",
+    "approximate capacity": "capacity",
+    "capacity": "capacity",
+    "shelf life": "shelf_life",
+    "safety handling": "safety",
+    "safety": "safety",
+    "recycling instructions": "recycling",
+    "recycling": "recycling",
+}
+
+# A header line: optional bullet / number / markdown heading and bold
+# markers around the header name, then an optional colon and inline value
+_HEADER_PATTERN = re.compile(
+    r"^[ \t]*(?:[-*•][ \t]*|\d+[.)][ \t]*|#+[ \t]*)?\**[ \t]*("
+    + "|".join(re.escape(h) for h in sorted(HEADERS, key=len, reverse=True))
+    + r")[ \t]*\**[ \t]*:[ \t]*\**[ \t]*(.*)$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+_VOLTAGE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(?:v|volts?)\b", re.IGNORECASE)
+_CAPACITY_PATTERN = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(?:(?:-|to|–)\s*(\d[\d,]*(?:\.\d+)?)\s*)?(mah|ah|wh)\b",
+                               re.IGNORECASE)
+_YEARS_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(?:(?:-|to|–)\s*(\d+(?:\.\d+)?)\s*)?(years?|yrs?|months?)\b",
+                            re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class BatteryRecord:
+    type: str
+    type_text: Optional[str] = None
+    voltage: Optional[float] = None
+    voltage_text: Optional[str] = None
+    form_factor: Optional[str] = None
+    common_uses: Optional[str] = None
+    capacity_mah: Optional[float] = None
+    capacity_text: Optional[str] = None
+    shelf_life_years: Optional[float] = None
+    shelf_life_text: Optional[str] = None
+    safety: Optional[str] = None
+    recycling: Optional[str] = None
+
+
+def normalize_type(text):
+    if not text:
+        return None
+    match = _TYPE_PATTERN.search(text)
+    return _SYNONYM_TO_TYPE[match.group(1).lower()] if match else None
+
+
+def _clean(value):
+    value = value.strip().strip("*").strip()
+    return value or None
+
+
+# Split the response into {field: text} using the header lines. A section
+# runs until the next header, so multi-line bullet lists are kept whole.
+def _sections(details):
+    sections = {}
+    matches = list(_HEADER_PATTERN.finditer(details))
+    for i, match in enumerate(matches):
+        field = HEADERS[match.group(1).lower()]
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(details)
+        body = match.group(2) + details[match.end():end]
+        if field not in sections:
+            sections[field] = _clean(body)
+    return sections
+
+
+def _parse_voltage(text):
+    match = _VOLTAGE_PATTERN.search(text or "")
+    return float(match.group(1)) if match else None
+
+
+# Capacity in mAh; ranges are averaged and Ah converted
+def _parse_capacity(text):
+    match = _CAPACITY_PATTERN.search(text or "")
+    if not match or match.group(3).lower() == "wh":
+        return None
+    low = float(match.group(1).replace(",", ""))
+    high = float(match.group(2).replace(",", "")) if match.group(2) else low
+    value = (low + high) / 2
+    return value * 1000 if match.group(3).lower() == "ah" else value
+
+
+def _parse_years(text):
+    match = _YEARS_PATTERN.search(text or "")
+    if not match:
+        return None
+    low = float(match.group(1))
+    high = float(match.group(2)) if match.group(2) else low
+    value = (low + high) / 2
+    return value / 12 if match.group(3).lower().startswith("month") else value
+
+
+def _parse(details):
+    sections = _sections(details)
+    type_text = sections.get("type")
+    # Prefer the Type field; fall back to the first type named anywhere
+    battery_type = normalize_type(type_text) or normalize_type(details) or "Other"
+    return BatteryRecord(
+        type=battery_type,
+        type_text=type_text,
+        voltage=_parse_voltage(sections.get("voltage")),
+        voltage_text=sections.get("voltage"),
+        form_factor=sections.get("form_factor"),
+        common_uses=sections.get("common_uses"),
+        capacity_mah=_parse_capacity(sections.get("capacity")),
+        capacity_text=sections.get("capacity"),
+        shelf_life_years=_parse_years(sections.get("shelf_life")),
+        shelf_life_text=sections.get("shelf_life"),
+        safety=sections.get("safety"),
+        recycling=sections.get("recycling"),
+    )
+
+
+# Parsed record for a vision response, cached per analysis text so reruns
+# of the details tab never re-parse it
+@lru_cache(maxsize=512)
+def parse_battery_details(details):
+    if not details:
+        return BatteryRecord(type="Unknown")
+    return _parse(details)
+
+
+def extract_battery_type(details):
+    return parse_battery_details(details).type
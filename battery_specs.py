@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import config
+
+SPEC_COLUMNS = [
+    "Type", "Chemistry", "Form Factor", "Voltage", "Capacity (mAh)", "Lifespan (cycles)",
+    "Energy Density (Wh/kg)", "Self-Discharge (% per month)", "Cost", "Rechargeable",
+]
+COST_LEVELS = ["Low", "Medium", "High"]
+
+# Ranking criteria: column and direction (+1 higher is better, -1 lower is better)
+CRITERIA = {
+    "Voltage": ("Voltage", 1),
+    "Capacity": ("Capacity (mAh)", 1),
+    "Lifespan": ("Lifespan (cycles)", 1),
+    "Energy Density": ("Energy Density (Wh/kg)", 1),
+    "Self-Discharge": ("Self-Discharge (% per month)", -1),
+    "Cost": ("Cost", -1),
+}
+DEFAULT_WEIGHTS = {"Voltage": 0, "Capacity": 0, "Lifespan": 2, "Energy Density": 2, "Self-Discharge": 1, "Cost": 2}
+LOG_SCALED = {"Capacity (mAh)", "Lifespan (cycles)"}
+NUMERIC_METRICS = ["Voltage", "Capacity (mAh)", "Lifespan (cycles)", "Energy Density (Wh/kg)",
+                   "Self-Discharge (% per month)"]
+
+
+# Read-only table of battery specifications, indexed by type. The ranking
+# matrix is built once at load time so each ranking is one matrix-vector
+# product over every battery.
+class SpecTable:
+    def __init__(self, frame):
+        frame = frame[SPEC_COLUMNS].copy()
+        if frame["Type"].duplicated().any():
+            raise ValueError(f"Duplicate battery types: {sorted(frame.loc[frame['Type'].duplicated(), 'Type'])}")
+        frame["Cost"] = pd.Categorical(frame["Cost"], categories=COST_LEVELS, ordered=True)
+        frame["Chemistry"] = frame["Chemistry"].astype("category")
+        frame["Form Factor"] = frame["Form Factor"].astype("category")
+        frame["Rechargeable"] = frame["Rechargeable"].astype(bool)
+        self.frame = frame.set_index("Type")
+        self.chemistries = sorted(self.frame["Chemistry"].cat.categories)
+        self.form_factors = list(self.frame["Form Factor"].cat.categories)
+        self._scores = self._criterion_scores()
+        self._scores.flags.writeable = False
+
+    @classmethod
+    def load(cls, path=config.SPECS_PATH):
+        if os.path.splitext(path)[1].lower() == ".parquet":
+            return cls(pd.read_parquet(path))
+        return cls(pd.read_csv(path))
+
+    def __len__(self):
+        return len(self.frame)
+
+    # Every criterion scaled to 0..1 with 1 the best battery in the table.
+    # Capacity and lifespan span several orders of magnitude, so they use a
+    # log scale (otherwise a coin cell and an AA would both score ~0).
+    def _criterion_scores(self):
+        columns = []
+        for column, direction in CRITERIA.values():
+            if column == "Cost":
+                values = self.frame[column].cat.codes.to_numpy(dtype=np.float64)
+            else:
+                values = self.frame[column].to_numpy(dtype=np.float64)
+            if column in LOG_SCALED:
+                values = np.log10(values)
+            low, high = values.min(), values.max()
+            scaled = (values - low) / (high - low) if high > low else np.ones_like(values)
+            columns.append(scaled if direction > 0 else 1.0 - scaled)
+        return np.column_stack(columns)
+
+    def mask(self, chemistries=None, form_factors=None, rechargeable=None):
+        keep = np.ones(len(self.frame), dtype=bool)
+        if chemistries:
+            keep &= self.frame["Chemistry"].isin(chemistries).to_numpy()
+        if form_factors:
+            keep &= self.frame["Form Factor"].isin(form_factors).to_numpy()
+        if rechargeable is not None:
+            keep &= self.frame["Rechargeable"].to_numpy() == rechargeable
+        return keep
+
+    # Top-k batteries by weighted score; weights maps criterion name to a
+    # non-negative weight (missing criteria count as zero)
+    def rank(self, weights, k=10, chemistries=None, form_factors=None, rechargeable=None):
+        weight_vector = np.array([float(weights.get(name, 0)) for name in CRITERIA])
+        if weight_vector.sum() <= 0:
+            raise ValueError("At least one criterion needs a positive weight")
+        scores = self._scores @ (weight_vector / weight_vector.sum())
+        candidates = np.flatnonzero(self.mask(chemistries, form_factors, rechargeable))
+        if len(candidates) == 0:
+            return self.frame.iloc[[]].assign(Score=pd.Series(dtype=float))
+        k = min(k, len(candidates))
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.lexsort((top, -scores[top]))]
+        return self.frame.iloc[top].assign(Score=np.round(scores[top] * 100, 1))
+
+    # Side-by-side comparison of any number of types, one column per type
+    def compare(self, types):
+        return self.frame.loc[list(types)].T
+
+    # Typical (median) value of a metric per chemistry, optionally over a mask
+    def metric_by_chemistry(self, metric, mask=None):
+        frame = self.frame if mask is None else self.frame[mask]
+        return frame.groupby("Chemistry", observed=True)[metric].median().sort_values()
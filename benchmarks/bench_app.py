@@ -0,0 +1,252 @@
+# Headless, offline benchmark of the Streamlit app. Drives batteryhub.py with
+# Streamlit's AppTest against the local stub OpenAI server, so no API key or
+# network access is needed, and writes machine-readable JSON results that can
+# be compared between commits.
+#
+#   python benchmarks/bench_app.py [--sessions 8] [--analyses 40] [--latency 0.3]
+#   python benchmarks/bench_app.py --compare benchmarks/results/app-OLD.json
+#
+# Measures:
+#   - rerun latency of every page (median / p95 over --reruns reruns)
+#   - analyzer throughput with --sessions concurrent simulated sessions (one
+#     process each, sharing the stub server and the on-disk history)
+#   - process memory and Usage History rerun time as history accumulates
+import argparse
+import multiprocessing
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+APP_PATH = os.path.join(APP_DIR, "batteryhub.py")
+PAGES = ["Home", "Battery Analyzer", "Battery Comparison", "Recycling Info", "Usage History"]
+
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, APP_DIR)
+
+from stub_openai_server import StubOpenAIServer  # noqa: E402
+
+
+def rss_mb():
+    # Resident set size of this process (Linux /proc, falling back to the peak)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def distinct_image(seed):
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    image = Image.new("RGB", (1600, 1200), tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(30):
+        box = sorted(rng.randrange(1600) for _ in range(2)), sorted(rng.randrange(1200) for _ in range(2))
+        draw.rectangle([box[0][0], box[1][0], box[0][1], box[1][1]], fill=tuple(rng.randrange(256) for _ in range(3)))
+    buffered = io.BytesIO()
+    image.save(buffered, format="JPEG", quality=90)
+    return buffered.getvalue()
+
+
+def new_app(timeout):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    app.run()
+    return app
+
+
+def check(app):
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+
+
+def goto(app, page):
+    app.sidebar.radio[0].set_value(page).run()
+    check(app)
+
+
+def summarize(samples):
+    # Imported here: it imports config, which has to wait for the environment set in main()
+    from instrumentation import percentile
+    samples = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 2),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+        "runs": len(samples),
+    }
+
+
+def bench_pages(reruns, timeout):
+    results = {}
+    for page in PAGES:
+        app = new_app(timeout)
+        goto(app, page)
+        samples = []
+        for _ in range(reruns):
+            start = time.perf_counter()
+            app.run()
+            samples.append(time.perf_counter() - start)
+        check(app)
+        results[page] = summarize(samples)
+    return results
+
+
+# One simulated session: upload an image and click Analyze, `count` times.
+# Runs in its own process because AppTest's mock runtime is process-global.
+def analyze_session(seed, count, timeout):
+    durations = []
+    try:
+        app = new_app(timeout)
+        goto(app, "Battery Analyzer")
+        for i in range(count):
+            app.file_uploader[0].set_value((f"battery-{seed}-{i}.jpg", distinct_image(f"{seed}-{i}"), "image/jpeg")).run()
+            start = time.perf_counter()
+            app.button(key="analyze_btn").click().run()
+            durations.append(time.perf_counter() - start)
+            check(app)
+    except Exception as e:
+        return durations, repr(e)
+    return durations, None
+
+
+def bench_throughput(sessions, per_session, timeout):
+    durations = []
+    errors = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=sessions, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(analyze_session, 1000 + seed, per_session, timeout) for seed in range(sessions)]
+        for future in futures:
+            session_durations, error = future.result()
+            durations.extend(session_durations)
+            if error:
+                errors.append(error)
+    elapsed = time.perf_counter() - start
+    return {
+        "sessions": sessions,
+        "analyses": len(durations),
+        "seconds": round(elapsed, 3),
+        "analyses_per_second": round(len(durations) / elapsed, 3) if elapsed else None,
+        "analyze_rerun": summarize(durations) if durations else None,
+        "errors": errors,
+    }
+
+
+def bench_memory(analyses, step, timeout):
+    app = new_app(timeout)
+    points = []
+    history_app = new_app(timeout)
+    goto(history_app, "Usage History")
+    goto(app, "Battery Analyzer")
+    for i in range(analyses + 1):
+        if i % step == 0:
+            start = time.perf_counter()
+            history_app.run()
+            check(history_app)
+            points.append({"analyses": i, "rss_mb": round(rss_mb(), 1),
+                           "history_rerun_ms": round((time.perf_counter() - start) * 1000, 2)})
+        if i < analyses:
+            app.file_uploader[0].set_value((f"memory-{i}.jpg", distinct_image(f"memory-{i}"), "image/jpeg")).run()
+            app.button(key="analyze_btn").click().run()
+            check(app)
+    return points
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(old_path, new):
+    with open(old_path) as f:
+        old = json.load(f)
+    print(f"\nchange vs {old.get('commit')} (positive = slower / bigger)")
+    for page, stats in new["page_rerun"].items():
+        before = old.get("page_rerun", {}).get(page)
+        if before:
+            delta = (stats["median_ms"] - before["median_ms"]) / before["median_ms"] * 100
+            print(f"  {page:<20} median {before['median_ms']:>8.1f} -> {stats['median_ms']:>8.1f} ms ({delta:+.0f}%)")
+    before, after = old.get("throughput", {}), new["throughput"]
+    if before.get("analyses_per_second"):
+        print(f"  analyzer throughput   {before['analyses_per_second']:.2f} -> {after['analyses_per_second']:.2f} /s")
+    if old.get("memory") and new["memory"]:
+        growth = [run[-1]["rss_mb"] - run[0]["rss_mb"] for run in (old["memory"], new["memory"])]
+        print(f"  RSS growth            {growth[0]:.1f} -> {growth[1]:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the Battery Hub Streamlit app")
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--per-session", type=int, default=3)
+    parser.add_argument("--analyses", type=int, default=40)
+    parser.add_argument("--memory-step", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.3, help="stub API latency in seconds")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="fraction of stub responses that are 429s")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/app-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(latency=args.latency, rate_limit_ratio=args.rate_limit_ratio, retry_after=0.1).start()
+    data_dir = tempfile.mkdtemp(prefix="batteryhub-bench-")
+    # The app reads these when config is first imported, which happens inside AppTest
+    os.environ.update({
+        "OPENAI_BASE_URL": server.url,
+        "OPENAI_API_KEY": "stub",
+        "BATTERYHUB_DATA_DIR": data_dir,
+        "BATTERYHUB_OPENAI_RPM": "100000",
+        "BATTERYHUB_OPENAI_TPM": "100000000",
+    })
+
+    try:
+        results = {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "settings": vars(args),
+        }
+        # Throughput runs first: AppTest replaces __main__, which breaks the
+        # worker processes if it has already run in this one
+        results["throughput"] = bench_throughput(args.sessions, args.per_session, args.timeout)
+        results.update({
+            "page_rerun": bench_pages(args.reruns, args.timeout),
+            "memory": bench_memory(args.analyses, args.memory_step, args.timeout),
+            "stub": {"requests": server.requests, "rate_limited": server.rate_limited},
+        })
+    finally:
+        server.stop()
+
+    output = args.output or os.path.join(BENCH_DIR, "results", f"app-{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for page, stats in results["page_rerun"].items():
+        print(f"{page:<20} rerun median {stats['median_ms']:>8.1f} ms   p95 {stats['p95_ms']:>8.1f} ms")
+    throughput = results["throughput"]
+    print(f"analyzer: {throughput['analyses']} analyses in {throughput['seconds']} s across "
+          f"{throughput['sessions']} sessions ({throughput['analyses_per_second']} /s), "
+          f"{len(throughput['errors'])} errors")
+    memory = results["memory"]
+    print(f"memory: {memory[0]['rss_mb']} MB -> {memory[-1]['rss_mb']} MB over {memory[-1]['analyses']} analyses")
+    print(f"results written to {output}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# Live capture pipeline on a video: how many frames are decoded, sampled,
+# skipped as blurry / unchanged and sent to analysis, frames dropped when
+# analysis falls behind, and per-stage timing. Without a video a synthetic
+# Motion JPEG clip is generated: each battery slides in (motion-blurred) and
+# then holds still, so the expected result is one analysis per battery.
+# Analysis is simulated with a fixed latency (no API calls).
+#
+#   python benchmarks/bench_capture.py [--video clip.mjpeg] [--batteries 5] [--latency 2.0] [--realtime]
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from frame_capture import CapturePipeline, FrameSampler, StageTimes, start_video_capture  # noqa: E402
+
+
+def battery_scene(seed, width=640, height=480):
+    from PIL import Image, ImageDraw
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height), (200, 200, 190))
+    draw = ImageDraw.Draw(image)
+    # Clutter on the table
+    for _ in range(30):
+        x, y = rng.randrange(width), rng.randrange(height)
+        draw.rectangle([x, y, x + rng.randrange(5, 60), y + rng.randrange(5, 60)],
+                       fill=tuple(rng.randrange(120, 220) for _ in range(3)))
+    body_width, body_height = rng.randrange(150, 300), rng.randrange(60, 120)
+    x, y = rng.randrange(20, width - body_width - 20), rng.randrange(20, height - body_height - 20)
+    draw.rectangle([x, y, x + body_width, y + body_height], fill=tuple(rng.randrange(256) for _ in range(3)),
+                   outline=(0, 0, 0), width=3)
+    draw.rectangle([x + body_width, y + body_height // 3, x + body_width + 12, y + 2 * body_height // 3],
+                   fill=(90, 90, 90))
+    draw.text((x + 10, y + 10), f"BATTERY {seed} 1.5V AA", fill=(255, 255, 255))
+    return image
+
+
+def synthetic_video(batteries, fps, moving, still):
+    from PIL import Image, ImageFilter
+    out = io.BytesIO()
+    for seed in range(batteries):
+        scene = battery_scene(seed)
+        frames = int(moving * fps)
+        for i in range(frames):
+            shifted = scene.transform(scene.size, Image.AFFINE, (1, 0, (i - frames) * 8, 0, 1, 0))
+            shifted.filter(ImageFilter.BoxBlur(6)).save(out, "JPEG", quality=80)
+        for _ in range(int(still * fps)):
+            scene.save(out, "JPEG", quality=80)
+    return out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the live capture pipeline on a video")
+    parser.add_argument("--video", help="video file (Motion JPEG / AVI, GIF, animated WebP; others need PyAV)")
+    parser.add_argument("--batteries", type=int, default=5, help="batteries in the synthetic clip")
+    parser.add_argument("--fps", type=float, default=config.CAPTURE_MJPEG_FPS)
+    parser.add_argument("--latency", type=float, default=2.0, help="simulated analysis latency in seconds")
+    parser.add_argument("--realtime", action="store_true", help="pace decoding at the video's frame rate")
+    parser.add_argument("--queue-size", type=int, default=config.CAPTURE_QUEUE_SIZE)
+    parser.add_argument("--workers", type=int, default=config.CAPTURE_WORKERS)
+    args = parser.parse_args()
+
+    if args.video:
+        with open(args.video, "rb") as f:
+            data = f.read()
+    else:
+        data = synthetic_video(args.batteries, args.fps, moving=1.0, still=2.0)
+
+    def analyze(processed):
+        time.sleep(args.latency)
+        return "Type: Alkaline", False
+
+    times = StageTimes()
+    sampler = FrameSampler(times=times)
+    pipeline = CapturePipeline(analyze, queue_size=args.queue_size, workers=args.workers, times=times)
+    start = time.perf_counter()
+    capture = start_video_capture(data, sampler, pipeline, realtime=args.realtime)
+    capture.join()
+    capture_seconds = time.perf_counter() - start
+    results = []
+    while pipeline.pending:
+        results.extend(pipeline.results(timeout=0.1))
+    results.extend(pipeline.results())
+    total_seconds = time.perf_counter() - start
+    if capture.error:
+        print(f"capture failed: {capture.error}")
+        sys.exit(1)
+
+    counts = sampler.counts
+    print(f"frames {counts['frames']}  sampled {counts['sampled']}  blurry {counts['blurry']}  "
+          f"unchanged {counts['unchanged']}  settling {counts['settling']}  accepted {counts['accepted']}")
+    print(f"analyzed {len(results)}  dropped {pipeline.counts['dropped']}  "
+          f"({counts['frames'] / max(1, len(results)):.0f} frames per analysis)")
+    if not args.video:
+        print(f"expected {args.batteries} analyses, one per battery")
+    print(f"capture finished in {capture_seconds:.2f}s, last analysis in {total_seconds:.2f}s")
+    print(f"{'stage':<12}{'count':>7}{'total ms':>11}{'mean ms':>10}{'p95 ms':>10}")
+    for row in times.summary():
+        print(f"{row['stage']:<12}{row['count']:>7}{row['total_ms']:>11.1f}{row['mean_ms']:>10.2f}{row['p95_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
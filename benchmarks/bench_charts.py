@@ -0,0 +1,116 @@
+# Render time and memory of the comparison / history charts over many reruns,
+# comparing the old per-rerun pyplot path (a new figure every rerun, never
+# closed) with the cached PNG path the app uses now. Each mode runs in a fresh
+# process so their RSS numbers don't mix.
+#
+#   python benchmarks/bench_charts.py [--reruns 1000]
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COMPARISON = {
+    'Type': ['Alkaline', 'Lithium', 'NiMH', 'NiCd', 'Lead Acid'],
+    'Voltage': [1.5, 3.6, 1.2, 1.2, 2.0],
+    'Lifespan (cycles)': [1, 1000, 1000, 500, 300],
+    'Energy Density (Wh/kg)': [80, 150, 60, 40, 30],
+    'Self-Discharge (% per month)': [2, 1, 30, 20, 5],
+}
+METRICS = [name for name in COMPARISON if name != 'Type']
+TYPE_COUNTS = {'Alkaline': 12, 'Lithium-ion': 7, 'NiMH': 4, 'Lead Acid': 1}
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+# What every rerun used to do: st.pyplot saves the figure to PNG, and the
+# figure stays registered with pyplot
+def legacy_rerun(metric):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.bar(COMPARISON['Type'], COMPARISON[metric], color='purple')
+    ax.set_title(f'Comparison of {metric} by Battery Type')
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    fig.savefig(io.BytesIO(), format="png")
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    ax.pie(list(TYPE_COUNTS.values()), labels=list(TYPE_COUNTS), autopct='%1.1f%%', startangle=90, shadow=True)
+    ax.axis('equal')
+    fig.savefig(io.BytesIO(), format="png")
+
+
+def cached_rerun(metric, cache):
+    from charts import bar_chart_png, pie_chart_png
+
+    # Same keys the app's st.cache_data wrappers hash on
+    key = ("bar", tuple(COMPARISON['Type']), tuple(COMPARISON[metric]), metric)
+    if key not in cache:
+        cache[key] = bar_chart_png(COMPARISON['Type'], COMPARISON[metric], metric)
+    key = ("pie", tuple(TYPE_COUNTS.items()))
+    if key not in cache:
+        cache[key] = pie_chart_png(list(TYPE_COUNTS), list(TYPE_COUNTS.values()))
+
+
+def run_mode(mode, reruns):
+    import matplotlib
+    matplotlib.use("Agg")
+    import charts  # noqa: F401  (import cost excluded from the timings)
+
+    # The legacy path deliberately leaks figures; don't warn about it
+    warnings.filterwarnings("ignore", "More than 20 figures")
+    cache = {}
+    start_rss = rss_mb()
+    timings = []
+    for i in range(reruns):
+        metric = METRICS[i % len(METRICS)]
+        start = time.perf_counter()
+        if mode == "legacy":
+            legacy_rerun(metric)
+        else:
+            cached_rerun(metric, cache)
+        timings.append(time.perf_counter() - start)
+    return {
+        "mode": mode,
+        "total_s": round(sum(timings), 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "max_ms": round(max(timings) * 1000, 1),
+        "rss_start_mb": round(start_rss, 1),
+        "rss_end_mb": round(rss_mb(), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chart rendering over repeated reruns")
+    parser.add_argument("--reruns", type=int, default=1000)
+    parser.add_argument("--mode", choices=["legacy", "cached"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.reruns)))
+        return
+
+    print(f"{'mode':<8} {'total':>9} {'median':>10} {'max':>9} {'RSS start':>10} {'RSS end':>9}")
+    for mode in ("legacy", "cached"):
+        output = subprocess.check_output(
+            [sys.executable, os.path.abspath(__file__), "--mode", mode, "--reruns", str(args.reruns)], text=True
+        )
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<8} {result['total_s']:>8.2f}s {result['median_ms']:>8.3f}ms {result['max_ms']:>7.1f}ms "
+              f"{result['rss_start_mb']:>8.1f}MB {result['rss_end_mb']:>7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
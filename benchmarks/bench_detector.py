@@ -0,0 +1,88 @@
+# Latency and accuracy of the local battery detector on a held-out folder
+# laid out like the training set (one sub-folder per class, including
+# not_battery). The gate is scored the way the app applies it: an image is
+# rejected when its battery probability is below --reject-below.
+#
+#   python benchmarks/bench_detector.py heldout/ [--model models/battery_detector.npz] [--batch 16]
+#                                       [--reject-below 0.3]
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from battery_detector import NOT_BATTERY, BatteryDetector  # noqa: E402
+from instrumentation import percentile  # noqa: E402
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+def load_samples(root):
+    samples = []
+    for name in sorted(os.listdir(root)):
+        folder = os.path.join(root, name)
+        if not os.path.isdir(folder):
+            continue
+        for filename in sorted(os.listdir(folder)):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                with open(os.path.join(folder, filename), "rb") as f:
+                    samples.append((name, f.read()))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local battery detector")
+    parser.add_argument("heldout")
+    parser.add_argument("--model", default=config.DETECTOR_MODEL_PATH)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--reject-below", type=float, default=config.DETECTOR_REJECT_BELOW,
+                        help="battery probability below which the app rejects an image")
+    args = parser.parse_args()
+
+    detector = BatteryDetector.load(args.model)
+    samples = load_samples(args.heldout)
+    if not samples:
+        raise SystemExit(f"no images found under {args.heldout}")
+
+    # Single-image latency, including decode and feature extraction
+    single = []
+    detections = []
+    for _, data in samples:
+        start = time.perf_counter()
+        detections.extend(detector.predict_bytes([data]))
+        single.append(time.perf_counter() - start)
+
+    # Batched latency per image
+    start = time.perf_counter()
+    for i in range(0, len(samples), args.batch):
+        detector.predict_bytes([data for _, data in samples[i:i + args.batch]])
+    batched = (time.perf_counter() - start) / len(samples)
+
+    # A false reject is a battery the app refuses to analyze; a false accept
+    # is something else that gets sent to the vision call anyway
+    batteries = sum(label != NOT_BATTERY for label, _ in samples)
+    others = len(samples) - batteries
+    accepted = [detection.battery_probability >= args.reject_below for detection in detections]
+    false_rejects = sum(label != NOT_BATTERY and not ok for (label, _), ok in zip(samples, accepted))
+    false_accepts = sum(label == NOT_BATTERY and ok for (label, _), ok in zip(samples, accepted))
+    gate_correct = len(samples) - false_rejects - false_accepts
+    class_correct = sum(label == detection.label for (label, _), detection in zip(samples, detections))
+    single.sort()
+
+    print(f"images: {len(samples)}")
+    print(f"gate (reject below {args.reject_below:g}) accuracy: {gate_correct / len(samples):.1%}")
+    print(f"false rejects: {false_rejects} of {batteries} batteries"
+          + (f" ({false_rejects / batteries:.1%})" if batteries else ""))
+    print(f"false accepts: {false_accepts} of {others} non-batteries"
+          + (f" ({false_accepts / others:.1%})" if others else ""))
+    print(f"class accuracy: {class_correct / len(samples):.1%}")
+    print(f"latency per image  median: {statistics.median(single) * 1000:.2f} ms  "
+          f"p95: {percentile(single, 0.95) * 1000:.2f} ms")
+    print(f"batched (size {args.batch}) per image: {batched * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
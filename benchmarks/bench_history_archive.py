@@ -0,0 +1,127 @@
+# Throughput of the bulk history export (CSV, Parquet, ZIP) and the archive
+# import, on a synthetic history of distinct JPEG images in a temp directory.
+# Each step is timed on its own, then repeated under tracemalloc for the
+# peak Python allocation, which stays flat as the history grows because
+# entries are read, written and inserted one batch at a time.
+#
+#   python benchmarks/bench_history_archive.py [--entries 10000] [--batch-size 500]
+import argparse
+import hashlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history_archive import FORMATS, export_history, import_archive  # noqa: E402
+from history_store import HistoryStore  # noqa: E402
+
+OWNER = "bench"
+TYPES = ["Alkaline", "Lithium-ion", "NiMH", "NiCd", "Lead Acid", "Zinc-Carbon"]
+DETAILS = (
+    "Type: {type}\nVoltage: 1.5V\nSize/Form Factor: AA\nApproximate Capacity: 2500 mAh\n"
+    "Chemistry: {type}\nRechargeable: No\nShelf Life: 10 years\nEntry: {index}"
+)
+
+
+def jpeg(index, size):
+    from PIL import Image
+    rng = random.Random(index)
+    image = Image.frombytes("RGB", (16, 16), rng.randbytes(16 * 16 * 3)).resize((size, size), Image.BILINEAR)
+    buffered = io.BytesIO()
+    image.save(buffered, "JPEG", quality=85)
+    return buffered.getvalue()
+
+
+# Fill the store directly (images written, rows bulk-inserted) so setting up
+# 10k entries doesn't cost 10k thumbnail encodes
+def populate(store, entries, image_size, batch_size):
+    rng = random.Random(0)
+    batch = []
+    for index in range(entries):
+        data = jpeg(index, image_size)
+        digest = hashlib.sha256(data).hexdigest()
+        store.save_image(digest, "image/jpeg", data)
+        battery_type = rng.choice(TYPES)
+        batch.append({
+            "timestamp": f"2026-{1 + index % 12:02d}-{1 + index % 28:02d} 12:{index // 60 % 60:02d}:{index % 60:02d}",
+            "type": battery_type,
+            "details": DETAILS.format(type=battery_type, index=index),
+            "image_digest": digest,
+            "mime": "image/jpeg",
+            "phash": rng.getrandbits(64),
+        })
+        if len(batch) >= batch_size:
+            store.add_many(OWNER, batch)
+            batch = []
+    store.add_many(OWNER, batch)
+
+
+def timed(step):
+    start = time.perf_counter()
+    result = step()
+    return result, time.perf_counter() - start
+
+
+def peak_mb(step):
+    tracemalloc.start()
+    step()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def new_store(workdir, name):
+    return HistoryStore(os.path.join(workdir, name, "history.sqlite3"), os.path.join(workdir, name, "images"))
+
+
+def export_to(store, fmt, path, batch_size):
+    with open(path, "wb") as out:
+        return export_history(store, OWNER, fmt, out, batch_size)
+
+
+def import_from(store, path, batch_size):
+    with open(path, "rb") as archive:
+        return import_archive(store, OWNER, archive, batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk history export and import")
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--image-size", type=int, default=96, help="edge of the synthetic JPEGs in pixels")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        source = new_store(workdir, "source")
+        start = time.perf_counter()
+        populate(source, args.entries, args.image_size, args.batch_size)
+        print(f"{args.entries} entries generated in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'step':<16}{'seconds':>9}{'entries/s':>11}{'size':>10}{'peak mem':>10}")
+        for fmt, (_, extension) in FORMATS.items():
+            path = os.path.join(workdir, "history" + extension)
+            count, elapsed = timed(lambda: export_to(source, fmt, path, args.batch_size))
+            peak = peak_mb(lambda: export_to(source, fmt, path, args.batch_size))
+            print(f"{'export ' + fmt:<16}{elapsed:>9.2f}{count / elapsed:>11.0f}"
+                  f"{os.path.getsize(path) / 2 ** 20:>8.1f}MB{peak:>8.1f}MB")
+
+        archive = os.path.join(workdir, "history.zip")
+        target = new_store(workdir, "target")
+        (imported, _, _, _), elapsed = timed(lambda: import_from(target, archive, args.batch_size))
+        peak = peak_mb(lambda: import_from(new_store(workdir, "traced"), archive, args.batch_size))
+        print(f"{'import zip':<16}{elapsed:>9.2f}{imported / elapsed:>11.0f}{'':>10}{peak:>8.1f}MB")
+        (_, skipped, _, _), elapsed = timed(lambda: import_from(target, archive, args.batch_size))
+        print(f"{'re-import zip':<16}{elapsed:>9.2f}{skipped / elapsed:>11.0f}   (all {skipped} skipped as present)")
+
+        if target.type_counts(OWNER) != source.type_counts(OWNER):
+            print("type counts differ after import!")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Compare the original full-resolution PNG/base64 path against the
+# preprocessing pipeline (EXIF orientation, downscale, JPEG/WebP encode).
+#
+#   python benchmarks/bench_image_pipeline.py [image ...] [--repeat N]
+#
+# Without image arguments a synthetic 12 MP phone-style photo is used.
+import argparse
+import base64
+import io
+import os
+import statistics
+import sys
+import time
+
+from PIL import Image, ImageFilter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import image_pipeline  # noqa: E402
+
+
+def synthetic_photo(width=4032, height=3024):
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 48).filter(ImageFilter.GaussianBlur(2))
+    image = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.FLIP_LEFT_RIGHT)))
+    buffered = io.BytesIO()
+    image.save(buffered, format="JPEG", quality=92)
+    return buffered.getvalue()
+
+
+# The pre-pipeline path: decode, re-encode to full-res PNG, base64 it, and
+# encode to PNG a second time for the history entry
+def legacy_path(raw):
+    image = Image.open(io.BytesIO(raw))
+    payloads = []
+    for _ in range(2):
+        buffered = io.BytesIO()
+        image.save(buffered, format="PNG")
+        payloads.append(base64.b64encode(buffered.getvalue()).decode())
+    return len(payloads[0])
+
+
+def pipeline_path(raw, fmt):
+    image_pipeline._cache.clear()
+    processed = image_pipeline.preprocess_image(raw, fmt=fmt)
+    return len(processed.base64)
+
+
+def measure(func, raw, repeat, *args):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = func(raw, *args)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark image preprocessing against the legacy PNG path")
+    parser.add_argument("images", nargs="*")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = [(path, open(path, "rb").read()) for path in args.images] or [("synthetic 4032x3024", synthetic_photo())]
+    print(f"{'image':<28} {'path':<12} {'median ms':>10} {'payload KB':>11}")
+    for name, raw in samples:
+        rows = [("legacy PNG",) + measure(legacy_path, raw, args.repeat)]
+        for fmt in ("JPEG", "WEBP"):
+            rows.append((fmt.lower(),) + measure(pipeline_path, raw, args.repeat, fmt))
+        for label, seconds, size in rows:
+            print(f"{name[:28]:<28} {label:<12} {seconds * 1000:>10.1f} {size / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
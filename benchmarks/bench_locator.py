@@ -0,0 +1,53 @@
+# Latency of the recycling locator's k-d tree against a brute-force scan,
+# on synthetic drop-off sites spread over the continental US.
+#
+#   python benchmarks/bench_locator.py [--sites 50000] [--queries 1000] [--k 5]
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recycling_locator import KDTree, to_unit_vectors  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the recycling locator k-d tree")
+    parser.add_argument("--sites", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    points = to_unit_vectors(rng.uniform(25, 49, args.sites), rng.uniform(-124, -67, args.sites))
+    queries = to_unit_vectors(rng.uniform(25, 49, args.queries), rng.uniform(-124, -67, args.queries))
+
+    start = time.perf_counter()
+    tree = KDTree(points)
+    build = time.perf_counter() - start
+
+    tree_times, scan_times, mismatches = [], [], 0
+    for query in queries:
+        start = time.perf_counter()
+        _, indices = tree.query(query, args.k)
+        tree_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        distances = ((points - query) ** 2).sum(axis=1)
+        nearest = np.argpartition(distances, args.k)[:args.k]
+        nearest = nearest[np.argsort(distances[nearest])]
+        scan_times.append(time.perf_counter() - start)
+        mismatches += not np.array_equal(indices, nearest)
+
+    print(f"sites: {args.sites}  build {build * 1000:.0f} ms")
+    print(f"k-d tree    median {statistics.median(tree_times) * 1000:.3f} ms")
+    print(f"brute force median {statistics.median(scan_times) * 1000:.3f} ms")
+    print(f"results differing from brute force: {mismatches} of {args.queries}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Accuracy and throughput of the vision-response parser against the original
+# substring scan in extract_battery_type, over the sample response corpus.
+#
+#   python benchmarks/bench_parser.py [--corpus FILE] [--repeat N]
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import battery_parser  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_responses.jsonl")
+
+
+# The original implementation, normalised to canonical names for scoring
+def legacy_extract_battery_type(details):
+    if not details:
+        return "Unknown"
+
+    battery_types = ["Alkaline", "Lithium", "NiMH", "Nickel-Metal Hydride", "NiCd", "Nickel-Cadmium",
+                     "Lead Acid", "Li-ion", "Lithium-ion", "Button Cell", "Zinc-Carbon", "Silver Oxide"]
+
+    for btype in battery_types:
+        if btype.lower() in details.lower():
+            return battery_parser.normalize_type(btype)
+
+    return "Other"
+
+
+def close(a, b):
+    if a is None or b is None:
+        return a is b
+    return math.isclose(a, b, rel_tol=0.01)
+
+
+def throughput(func, corpus, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for sample in corpus:
+            func(sample["details"])
+    elapsed = time.perf_counter() - start
+    return repeat * len(corpus) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the battery details parser")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    with open(args.corpus) as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+
+    legacy_hits = 0
+    field_hits = {"type": 0, "voltage": 0, "form_factor": 0, "capacity_mah": 0, "shelf_life_years": 0}
+    for sample in corpus:
+        legacy_hits += legacy_extract_battery_type(sample["details"]) == sample["type"]
+        record = battery_parser._parse(sample["details"])
+        field_hits["type"] += record.type == sample["type"]
+        field_hits["voltage"] += close(record.voltage, sample["voltage"])
+        field_hits["form_factor"] += record.form_factor == sample["form_factor"]
+        field_hits["capacity_mah"] += close(record.capacity_mah, sample["capacity_mah"])
+        field_hits["shelf_life_years"] += close(record.shelf_life_years, sample["shelf_life_years"])
+        if record.type != sample["type"]:
+            print(f"  type mismatch: expected {sample['type']}, got {record.type}")
+
+    n = len(corpus)
+    print(f"corpus: {n} responses")
+    print(f"type accuracy   legacy substring scan: {legacy_hits / n:.0%}   parser: {field_hits['type'] / n:.0%}")
+    for field in ("voltage", "form_factor", "capacity_mah", "shelf_life_years"):
+        print(f"{field:<16} accuracy: {field_hits[field] / n:.0%}")
+
+    print(f"throughput      legacy type only: {throughput(legacy_extract_battery_type, corpus, args.repeat):>10,.0f} /s")
+    print(f"                parser full record: {throughput(battery_parser._parse, corpus, args.repeat):>8,.0f} /s")
+    print(f"                parser cached:     {throughput(battery_parser.parse_battery_details, corpus, args.repeat):>9,.0f} /s")
+
+
+if __name__ == "__main__":
+    main()
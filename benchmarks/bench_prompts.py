@@ -0,0 +1,199 @@
+# Prompt size per LLM call site, before and after compaction: the prompts the
+# app used to send (full vision answer, whole chat history, verbose spec
+# template, high-detail images) against the budgeted builders in prompts.py,
+# on the sample vision answers, a multi-turn chat and the spec table. Then
+# time to first token and total latency of both variants, against the local
+# stub server by default (whose latency doesn't depend on prompt size, so
+# only the API shows the real difference) or the real API with --base-url.
+#
+#   python benchmarks/bench_prompts.py [--turns 12] [--requests 10] [--base-url URL --api-key KEY]
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from battery_specs import SpecTable  # noqa: E402
+from image_pipeline import preprocess_image  # noqa: E402
+from openai_client import LLMClient  # noqa: E402
+from prompts import (  # noqa: E402
+    alternatives_messages, chat_messages, comparison_messages, image_tokens, message_tokens, tokenizer_name,
+    vision_detail,
+)
+from streaming import stream_completion  # noqa: E402
+from stub_openai_server import StubOpenAIServer  # noqa: E402
+
+MODEL = "gpt-4-turbo"
+HERE = os.path.dirname(os.path.abspath(__file__))
+ANSWER = ("Yes. {question} depends on the load: in a low-drain device such as a remote control it lasts "
+          "months, while a high-drain device like a camera flash empties it in a few hours. Store it at room "
+          "temperature, keep the contacts clean, and don't mix old and new cells in the same device. "
+          "When it is empty, take it to a battery collection point rather than the household bin.")
+
+
+# The prompts as the app built them before compaction
+
+def legacy_chat(details, history):
+    kept, used = [], 0
+    for message in reversed(history):
+        cost = len(message["content"]) // 4 + 1 + 4
+        if kept and used + cost > 2000:
+            break
+        kept.append(message)
+        used += cost
+    return [
+        {"role": "system", "content": "You are a battery expert. Answer questions based on the provided battery details."},
+        {"role": "assistant", "content": f"Battery details: {details}"},
+        *reversed(kept),
+    ]
+
+
+def legacy_alternatives(details):
+    return [
+        {"role": "system", "content": "You are a battery expert. Provide compatible battery alternatives."},
+        {"role": "user", "content": f"Given this battery info, list 3 compatible alternatives with brief descriptions:\n{details}"},
+    ]
+
+
+def legacy_comparison(comparison, types):
+    battery_specs = "\n\n".join(
+        f"""{battery_type}:
+                Chemistry: {comparison[battery_type]['Chemistry']}
+                Voltage: {comparison[battery_type]['Voltage']}
+                Capacity: {comparison[battery_type]['Capacity (mAh)']} mAh
+                Lifespan: {comparison[battery_type]['Lifespan (cycles)']} cycles
+                Energy Density: {comparison[battery_type]['Energy Density (Wh/kg)']} Wh/kg
+                Self-Discharge: {comparison[battery_type]['Self-Discharge (% per month)']}% per month
+                Cost: {comparison[battery_type]['Cost']}"""
+        for battery_type in types
+    )
+    prompt = f"""
+                Compare these battery types in detail:
+
+                {battery_specs}
+
+                Provide a paragraph comparing their key strengths and weaknesses, and provide use case recommendations.
+                """
+    return [
+        {"role": "system", "content": "You are a battery expert providing detailed technical comparisons."},
+        {"role": "user", "content": prompt},
+    ]
+
+
+# Workloads
+
+def load_jsonl(name):
+    with open(os.path.join(HERE, name)) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def chat_history(questions, turns, rng):
+    history = []
+    for _ in range(turns):
+        question = rng.choice(questions)
+        history.append({"role": "user", "content": question})
+        history.append({"role": "assistant", "content": ANSWER.format(question=question.capitalize())})
+    history.append({"role": "user", "content": rng.choice(questions)})
+    return history
+
+
+def test_images():
+    from PIL import Image, ImageDraw
+    # A product shot on a plain background and a cluttered photo of the same size
+    plain = Image.new("RGB", (1024, 768), (235, 235, 235))
+    ImageDraw.Draw(plain).rectangle([380, 200, 640, 560], fill=(200, 40, 30), outline=(0, 0, 0), width=4)
+    rng = random.Random(0)
+    noise = Image.frombytes("RGB", (128, 96), rng.randbytes(128 * 96 * 3)).resize((1024, 768), Image.BILINEAR)
+    cluttered = Image.blend(noise, plain, 0.4)
+    images = {}
+    for name, image in (("plain photo", plain), ("cluttered photo", cluttered)):
+        buffered = io.BytesIO()
+        image.save(buffered, "PNG")
+        images[name] = preprocess_image(buffered.getvalue())
+    return images
+
+
+def report(name, pairs):
+    legacy = [message_tokens(old) for old, _ in pairs]
+    compact = [message_tokens(new) for _, new in pairs]
+    saved = 1 - sum(compact) / sum(legacy)
+    print(f"{name:<16}{len(pairs):>6}{statistics.mean(legacy):>10.0f}{max(legacy):>8}"
+          f"{statistics.mean(compact):>10.0f}{max(compact):>8}{saved:>9.0%}")
+
+
+def latency(client, call_site, messages, requests):
+    ttfts, totals = [], []
+    for _ in range(requests):
+        timing = {}
+        for _ in stream_completion(client, call_site, MODEL, messages, 300, timing=timing):
+            pass
+        ttfts.append(timing["ttft"] or timing["total"])
+        totals.append(timing["total"])
+    return statistics.median(ttfts), statistics.median(totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prompt compaction per LLM call site")
+    parser.add_argument("--turns", type=int, default=12, help="earlier question/answer pairs in each chat")
+    parser.add_argument("--requests", type=int, default=10, help="requests per variant for the latency run")
+    parser.add_argument("--base-url", help="OpenAI-compatible API to time against instead of the local stub")
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY", "stub"))
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    samples = [sample["details"] for sample in load_jsonl("sample_responses.jsonl")]
+    questions = [question for pair in load_jsonl("sample_questions.jsonl") for question in (pair["a"], pair["b"])]
+    spec_table = SpecTable.load(config.SPECS_PATH)
+
+    chats = []
+    for details in samples:
+        history = chat_history(questions, args.turns, rng)
+        chats.append((legacy_chat(details, history), chat_messages(details, history)[0]))
+    alternatives = [(legacy_alternatives(details), alternatives_messages(details)[0]) for details in samples]
+    comparisons = []
+    for size in (2, 3, 4):
+        for _ in range(10):
+            types = rng.sample(list(spec_table.frame.index), size)
+            comparison = spec_table.compare(types)
+            comparisons.append((legacy_comparison(comparison, types), comparison_messages(comparison, types)[0]))
+
+    print(f"tokenizer: {tokenizer_name()}")
+    print(f"{'call site':<16}{'calls':>6}{'old mean':>10}{'max':>8}{'new mean':>10}{'max':>8}{'saved':>9}")
+    report("chat", chats)
+    report("alternatives", alternatives)
+    report("comparison", comparisons)
+    for name, processed in test_images().items():
+        detail, saved = vision_detail(processed)
+        high = image_tokens(processed.width, processed.height)
+        bits_per_pixel = len(processed.data) * 8 / (processed.width * processed.height)
+        print(f"vision {name}: {processed.width}x{processed.height}, {bits_per_pixel:.2f} bits/pixel, "
+              f"detail {detail}: {high - saved} image tokens instead of {high}")
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = StubOpenAIServer("127.0.0.1", 0, latency=0.2, chunk_delay=0.005)
+        server.start()
+        base_url = server.url
+    try:
+        client = LLMClient(api_key=args.api_key, base_url=base_url, requests_per_minute=100000,
+                           tokens_per_minute=100000000)
+        print(f"\nlatency against {'the local stub' if server else base_url}, median of {args.requests}")
+        print(f"{'call site':<16}{'old ttft':>10}{'total':>8}{'new ttft':>10}{'total':>8}")
+        for call_site, pairs in (("chat", chats), ("alternatives", alternatives), ("comparison", comparisons)):
+            old, new = max(pairs, key=lambda pair: message_tokens(pair[0]))
+            old_ttft, old_total = latency(client, call_site, old, args.requests)
+            new_ttft, new_total = latency(client, call_site, new, args.requests)
+            print(f"{call_site:<16}{old_ttft:>9.2f}s{old_total:>7.2f}s{new_ttft:>9.2f}s{new_total:>7.2f}s")
+    finally:
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
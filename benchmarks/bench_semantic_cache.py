@@ -0,0 +1,89 @@
+# Quality and speed of the chat answer semantic cache.
+#
+#   python benchmarks/bench_semantic_cache.py [--entries 100000] [--threshold 0.75]
+#
+# Quality: labelled question pairs in benchmarks/sample_questions.jsonl
+# ("same" = the first question's answer is a correct answer to the second).
+# Speed: lookups against one battery type holding --entries synthetic
+# questions, plus fill rate, memory and the cost of an eviction pass.
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from instrumentation import percentile  # noqa: E402
+from semantic_cache import SemanticCache  # noqa: E402
+
+PAIRS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_questions.jsonl")
+WORDS = ("voltage capacity recharge recycle leak store charge temperature lifespan shelf safe device toy "
+         "remote camera drain cold heat swap mix brand old new trash fire water car clock watch flashlight "
+         "smoke detector hearing aid solar inverter drone laptop phone torch scale thermometer").split()
+
+
+def quality(threshold):
+    with open(PAIRS_PATH) as f:
+        pairs = [json.loads(line) for line in f if line.strip()]
+    true_pos = false_pos = false_neg = 0
+    for pair in pairs:
+        cache = SemanticCache(threshold=threshold)
+        cache.add("Alkaline", pair["a"], "answer")
+        hit = cache.lookup("Alkaline", pair["b"]) is not None
+        true_pos += hit and pair["same"]
+        false_pos += hit and not pair["same"]
+        false_neg += not hit and pair["same"]
+        if hit != pair["same"]:
+            similarity = cache.search("Alkaline", pair["b"], k=1)
+            score = similarity[0][0] if similarity else 0.0
+            print(f"  {'false hit ' if hit else 'missed    '} {score:.2f}  {pair['a']!r} / {pair['b']!r}")
+    precision = true_pos / (true_pos + false_pos) if true_pos + false_pos else 1.0
+    recall = true_pos / (true_pos + false_neg) if true_pos + false_neg else 1.0
+    print(f"pairs: {len(pairs)}  precision {precision:.0%}  recall {recall:.0%}  (threshold {threshold})")
+
+
+def speed(entries, lookups):
+    rng = random.Random(0)
+    questions = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 8))) for _ in range(entries)]
+    cache = SemanticCache(max_entries=entries)
+
+    start = time.perf_counter()
+    for question in questions:
+        cache.add("Alkaline", question, "answer")
+    fill = time.perf_counter() - start
+
+    timings = []
+    for question in rng.sample(questions, lookups):
+        start = time.perf_counter()
+        cache.lookup("Alkaline", question + "?")
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    start = time.perf_counter()
+    cache.add("Alkaline", "one more question over the limit", "answer")
+    evict = time.perf_counter() - start
+
+    stats = cache.stats()
+    print(f"entries: {entries}  fill {entries / fill:,.0f}/s  vectors {stats['memory_bytes'] / 2 ** 20:.1f} MB (float16)")
+    print(f"lookup: median {statistics.median(timings) * 1000:.2f} ms  "
+          f"p95 {percentile(timings, 0.95) * 1000:.2f} ms  hit rate {stats['hit_rate']:.0%}")
+    print(f"eviction pass: {evict * 1000:.1f} ms, {stats['evictions']} entries evicted")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chat answer semantic cache")
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--threshold", type=float, default=config.SEMANTIC_CACHE_THRESHOLD)
+    args = parser.parse_args()
+
+    quality(args.threshold)
+    speed(args.entries, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Cold-start cost of each page: every page is rendered first thing in a fresh
+# Python process (like a new server worker), reporting time to first render
+# and which heavy dependencies it pulled in. Uses the stub OpenAI server, so
+# no API key or network is needed.
+#
+#   python benchmarks/bench_startup.py [--runs 3]
+#   python benchmarks/bench_startup.py --importtime "Battery Analyzer" [--top 20]
+#
+# --importtime runs that page under `python -X importtime` and lists the
+# slowest imports (cumulative) instead.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(os.path.dirname(BENCH_DIR), "batteryhub.py")
+PAGES = ["Home", "Battery Analyzer", "Battery Comparison", "Recycling Info", "Usage History", "Performance"]
+HEAVY_MODULES = ["openai", "httpx", "pandas", "matplotlib", "PIL", "numpy", "pyarrow"]
+
+sys.path.insert(0, BENCH_DIR)
+
+from stub_openai_server import StubOpenAIServer  # noqa: E402
+
+# Runs in the fresh process: Streamlit's own import is timed separately,
+# since a real server has it loaded before any page is requested
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+streamlit_ready = time.perf_counter()
+before = set(sys.modules)
+app = AppTest.from_file({app!r}, default_timeout=120)
+app.session_state["page"] = {page!r}
+app.run()
+done = time.perf_counter()
+if app.exception:
+    raise SystemExit(app.exception[0].value)
+loaded = {{name.split(".")[0] for name in set(sys.modules) - before}}
+print(json.dumps({{
+    "streamlit_import_s": streamlit_ready - start,
+    "first_render_s": done - streamlit_ready,
+    "modules_loaded": len(set(sys.modules) - before),
+    "heavy": sorted(loaded & set({heavy!r})),
+}}))
+"""
+
+
+def run_child(page, app, env, python_flags=()):
+    code = CHILD.format(app=app, page=page, heavy=HEAVY_MODULES)
+    return subprocess.run([sys.executable, *python_flags, "-c", code], env=env, capture_output=True, text=True)
+
+
+def importtime(page, app, env, top):
+    result = run_child(page, app, env, ("-X", "importtime"))
+    rows = []
+    # Lines look like "import time:  self_us | cumulative_us | <indent>module"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name[1:]))
+    # Only top-level entries (no indentation) give a non-overlapping picture
+    top_level = [(c, s, n) for c, s, n in rows if not n.startswith(" ")]
+    print(f"slowest top-level imports for {page!r} (cumulative ms):")
+    for cumulative_us, _, name in sorted(top_level, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:>8.1f}  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first render of each page in a fresh process")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--app", default=APP_PATH, help="app entry point (e.g. another checkout to compare)")
+    parser.add_argument("--importtime", metavar="PAGE", help="profile the imports of one page instead")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    server = StubOpenAIServer().start()
+    env = dict(os.environ, OPENAI_BASE_URL=server.url, OPENAI_API_KEY="stub",
+               BATTERYHUB_DATA_DIR=tempfile.mkdtemp(prefix="batteryhub-startup-"))
+    try:
+        if args.importtime:
+            importtime(args.importtime, args.app, env, args.top)
+            return
+
+        print(f"{'page':<20} {'first render':>13} {'streamlit import':>17} {'modules':>8}  heavy deps loaded")
+        for page in PAGES:
+            samples = []
+            for _ in range(args.runs):
+                result = run_child(page, args.app, env)
+                if result.returncode != 0:
+                    raise SystemExit(f"{page}: {result.stderr.strip().splitlines()[-1]}")
+                samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+            render = statistics.median(s["first_render_s"] for s in samples)
+            streamlit_import = statistics.median(s["streamlit_import_s"] for s in samples)
+            print(f"{page:<20} {render * 1000:>10.0f} ms {streamlit_import * 1000:>14.0f} ms "
+                  f"{samples[-1]['modules_loaded']:>8}  {', '.join(samples[-1]['heavy']) or '-'}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Load test for request coalescing: N simulated sessions ask for the same
+# recycling guide (plain completion) and the same battery comparison
+# (streamed) at the same moment, against the local stub API, with and
+# without the single-flight layer.
+#
+#   python benchmarks/load_singleflight.py [--sessions 50] [--latency 0.5]
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from llm_cache import ResponseCache, cached_completion, prompt_key  # noqa: E402
+from openai_client import LLMClient  # noqa: E402
+from singleflight import SingleFlight  # noqa: E402
+from streaming import stream_completion  # noqa: E402
+from stub_openai_server import StubOpenAIServer  # noqa: E402
+
+MODEL = "gpt-4-turbo"
+RECYCLING_MESSAGES = [
+    {"role": "system", "content": "You are a battery recycling expert. Provide detailed recycling instructions."},
+    {"role": "user", "content": "Provide detailed recycling instructions for Alkaline batteries. Include safety "
+                                "precautions, preparation steps, and where to recycle them."},
+]
+COMPARISON_MESSAGES = [
+    {"role": "system", "content": "You are a battery expert providing detailed technical comparisons."},
+    {"role": "user", "content": "Compare these two battery types in detail: Alkaline and Lithium."},
+]
+
+
+def recycling_session(client, cache, flight):
+    cached_completion(cache, client, "recycling", MODEL, RECYCLING_MESSAGES, 400, flight=flight)
+
+
+def comparison_session(client, cache, flight):
+    def upstream():
+        return stream_completion(client, "comparison", MODEL, COMPARISON_MESSAGES, 300)
+
+    stream = upstream() if flight is None else flight.do_stream(prompt_key(MODEL, COMPARISON_MESSAGES, 300), upstream)
+    "".join(stream)
+
+
+def run(server, client, scenario, sessions, use_flight):
+    server.reset()
+    cache = ResponseCache(path=":memory:")
+    flight = SingleFlight() if use_flight else None
+    barrier = threading.Barrier(sessions)
+    errors = []
+
+    def session():
+        barrier.wait()
+        try:
+            scenario(client, cache, flight)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    coalesced = flight.stats()["coalesced"] if flight else 0
+    return server.requests, coalesced, elapsed, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test single-flight request coalescing")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(latency=args.latency).start()
+    client = LLMClient(api_key="stub", base_url=server.url, requests_per_minute=100000,
+                       tokens_per_minute=100000000, max_connections=args.sessions)
+    try:
+        print(f"{args.sessions} concurrent sessions, {args.latency}s upstream latency")
+        print(f"{'scenario':<12} {'single-flight':<14} {'upstream':>9} {'coalesced':>10} {'wall s':>8} {'errors':>7}")
+        for name, scenario in (("recycling", recycling_session), ("comparison", comparison_session)):
+            for use_flight in (False, True):
+                upstream, coalesced, elapsed, errors = run(server, client, scenario, args.sessions, use_flight)
+                print(f"{name:<12} {'on' if use_flight else 'off':<14} {upstream:>9} {coalesced:>10} "
+                      f"{elapsed:>8.2f} {errors:>7}")
+    finally:
+        client.close()
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
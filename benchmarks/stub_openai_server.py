@@ -0,0 +1,160 @@
+# Local stand-in for the OpenAI chat completions endpoint, for benchmarks
+# and load tests that must not touch the real API.
+#
+#   python benchmarks/stub_openai_server.py --port 8765 --latency 0.5
+#   OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub streamlit run batteryhub.py
+#
+# Supports plain and streamed (SSE) responses, a fixed response latency,
+# per-chunk streaming delay and injected 429s.
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BATTERY_DETAILS = """- Type: Alkaline
+- Voltage: 1.5V
+- Size/Form Factor: AA
+- Common Uses: Remote controls, toys, flashlights
+- Approximate Capacity: 2000-3000 mAh
+- Shelf Life: 5-10 years
+- Safety Handling: Do not recharge, short-circuit or expose to fire.
+- Recycling Instructions: Take to a household battery collection point."""
+
+GENERIC_ANSWER = ("Alkaline cells are inexpensive and store well, while lithium-ion cells offer far higher "
+                  "energy density and hundreds of charge cycles at a higher price. Choose alkaline for "
+                  "low-drain devices and lithium-ion for high-drain, rechargeable use.")
+
+
+class StubOpenAIServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.5, chunk_delay=0.01, rate_limit_ratio=0.0,
+                 retry_after=1.0):
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.requests = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.rate_limited = 0
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))))
+                with stub._lock:
+                    stub.requests += 1
+                    limited = random.random() < stub.rate_limit_ratio
+                    stub.rate_limited += limited
+                if limited:
+                    self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests",
+                                                    "code": "rate_limit_exceeded"}},
+                                    {"retry-after": str(stub.retry_after)})
+                    return
+
+                time.sleep(stub.latency)
+                text = BATTERY_DETAILS if _has_image(body) else GENERIC_ANSWER
+                if body.get("stream"):
+                    self._send_stream(body["model"], text)
+                else:
+                    self._send_json(200, _completion(body["model"], text, body))
+
+            def _send_json(self, status, payload, headers=None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, model, text):
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.send_header("connection", "close")
+                self.end_headers()
+                for word in text.split(" "):
+                    chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                             "model": model,
+                             "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+                    self.wfile.write(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+                    self.wfile.flush()
+                    time.sleep(stub.chunk_delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+        return Handler
+
+
+def _has_image(body):
+    for message in body.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, list) and any(part.get("type") == "image_url" for part in content):
+            return True
+    return False
+
+
+def _completion(model, text, body):
+    prompt_tokens = sum(len(json.dumps(m)) // 4 for m in body.get("messages", []))
+    completion_tokens = len(text) // 4
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                  "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stub of the OpenAI chat completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds before each response starts")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="seconds between streamed chunks")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="fraction of requests answered with 429")
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(args.host, args.port, args.latency, args.chunk_delay, args.rate_limit_ratio).start()
+    print(f"stub OpenAI API listening on {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import io
+
+from matplotlib.figure import Figure
+
+# Charts are drawn on standalone Figure objects rather than through pyplot, so
+# nothing is registered in pyplot's global figure list and each figure is freed
+# as soon as it has been rendered to PNG bytes.
+CHART_DPI = 100
+
+
+def _to_png(fig):
+    buffered = io.BytesIO()
+    fig.savefig(buffered, format="png", dpi=CHART_DPI, bbox_inches="tight")
+    return buffered.getvalue()
+
+
+# Function to render the comparison bar chart for one metric
+def bar_chart_png(labels, values, metric):
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.bar(labels, values, color='purple')
+    ax.set_title(f'Comparison of {metric} by Battery Type')
+    ax.set_ylabel(metric)
+    ax.set_xlabel('Battery Type')
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    return _to_png(fig)
+
+
+# Function to render the pie chart of analysed battery types
+def pie_chart_png(labels, sizes):
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, shadow=True)
+    ax.axis('equal')
+    return _to_png(fig)
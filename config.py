@@ -0,0 +1,131 @@
+import os
+
+# Runtime state (response cache, history database, images) lives outside the
+# source tree by default so it survives restarts but never gets committed.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.environ.get("BATTERYHUB_DATA_DIR", os.path.join(BASE_DIR, ".batteryhub"))
+
+# LLM response cache
+LLM_CACHE_PATH = os.path.join(DATA_DIR, "llm_cache.sqlite3")
+LLM_CACHE_TTL = int(os.environ.get("BATTERYHUB_LLM_CACHE_TTL", 7 * 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("BATTERYHUB_LLM_CACHE_MAX_ENTRIES", 2000))
+
+# Uploaded image preprocessing
+IMAGE_MAX_EDGE = int(os.environ.get("BATTERYHUB_IMAGE_MAX_EDGE", 1024))
+IMAGE_FORMAT = os.environ.get("BATTERYHUB_IMAGE_FORMAT", "JPEG")
+IMAGE_QUALITY = int(os.environ.get("BATTERYHUB_IMAGE_QUALITY", 85))
+
+# Batch analysis
+BATCH_CONCURRENCY = int(os.environ.get("BATTERYHUB_BATCH_CONCURRENCY", 4))
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATTERYHUB_BATCH_MAX_CONCURRENCY", 16))
+
+# Near-duplicate upload detection (Hamming distance between 64-bit pHashes)
+DEDUPE_MAX_DISTANCE = int(os.environ.get("BATTERYHUB_DEDUPE_MAX_DISTANCE", 6))
+
+# Live capture (camera / video): frames whose Laplacian variance (on a
+# 256px grayscale copy) is below the blur threshold are skipped; the view
+# counts as still while consecutive samples stay within STILL_DISTANCE pHash
+# bits, and a frame within CHANGE_DISTANCE bits of the last one analyzed
+# shows the same battery. STABLE_FRAMES still samples in a row (or a view
+# held still for STABLE_SECONDS) send the sharpest of them to analysis
+# through a queue of QUEUE_SIZE frames.
+CAPTURE_BLUR_THRESHOLD = float(os.environ.get("BATTERYHUB_CAPTURE_BLUR_THRESHOLD", 100.0))
+CAPTURE_STILL_DISTANCE = int(os.environ.get("BATTERYHUB_CAPTURE_STILL_DISTANCE", 8))
+CAPTURE_CHANGE_DISTANCE = int(os.environ.get("BATTERYHUB_CAPTURE_CHANGE_DISTANCE", 12))
+CAPTURE_STABLE_FRAMES = int(os.environ.get("BATTERYHUB_CAPTURE_STABLE_FRAMES", 3))
+CAPTURE_STABLE_SECONDS = float(os.environ.get("BATTERYHUB_CAPTURE_STABLE_SECONDS", 0.5))
+CAPTURE_MIN_INTERVAL = float(os.environ.get("BATTERYHUB_CAPTURE_MIN_INTERVAL", 0.1))
+CAPTURE_MAX_INTERVAL = float(os.environ.get("BATTERYHUB_CAPTURE_MAX_INTERVAL", 0.8))
+CAPTURE_QUEUE_SIZE = int(os.environ.get("BATTERYHUB_CAPTURE_QUEUE_SIZE", 2))
+CAPTURE_WORKERS = int(os.environ.get("BATTERYHUB_CAPTURE_WORKERS", 2))
+# Raw Motion JPEG streams carry no timestamps
+CAPTURE_MJPEG_FPS = float(os.environ.get("BATTERYHUB_CAPTURE_MJPEG_FPS", 30))
+
+# Prompt compaction (see prompts.py): input token budget per call site,
+# counted with tiktoken's PROMPT_ENCODING (or a ~4 characters per token
+# estimate when the encoding can't be loaded). Chat history gets whatever
+# the system prompt, battery summary and question leave of the chat budget.
+PROMPT_ENCODING = os.environ.get("BATTERYHUB_PROMPT_ENCODING", "cl100k_base")
+PROMPT_BUDGET_CHAT = int(os.environ.get("BATTERYHUB_PROMPT_BUDGET_CHAT", 1200))
+PROMPT_BUDGET_ALTERNATIVES = int(os.environ.get("BATTERYHUB_PROMPT_BUDGET_ALTERNATIVES", 250))
+PROMPT_BUDGET_COMPARISON = int(os.environ.get("BATTERYHUB_PROMPT_BUDGET_COMPARISON", 500))
+# Longest any one field of the battery summary may be
+PROMPT_SUMMARY_FIELD_TOKENS = int(os.environ.get("BATTERYHUB_PROMPT_SUMMARY_FIELD_TOKENS", 60))
+# Vision image detail: "auto" sends simple images (at most 512px, or few JPEG
+# bits per pixel) at "low" detail, a flat 85 tokens instead of 85 + 170 per
+# 512px tile; "low" / "high" force one mode
+VISION_IMAGE_DETAIL = os.environ.get("BATTERYHUB_VISION_IMAGE_DETAIL", "auto")
+VISION_LOW_DETAIL_MAX_BPP = float(os.environ.get("BATTERYHUB_VISION_LOW_DETAIL_MAX_BPP", 1.0))
+
+# Semantic cache for chat answers: questions similar enough to one already
+# answered for the same kind of battery (chemistry, form factor, voltage and
+# capacity) reuse its answer (cosine similarity of hashed term vectors; see
+# semantic_cache.py)
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("BATTERYHUB_SEMANTIC_CACHE_THRESHOLD", 0.75))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.environ.get("BATTERYHUB_SEMANTIC_CACHE_MAX_ENTRIES", 100000))
+SEMANTIC_CACHE_DIM = int(os.environ.get("BATTERYHUB_SEMANTIC_CACHE_DIM", 256))
+
+# Analysis history
+HISTORY_DB_PATH = os.path.join(DATA_DIR, "history.sqlite3")
+HISTORY_IMAGE_DIR = os.path.join(DATA_DIR, "images")
+HISTORY_PAGE_SIZE = int(os.environ.get("BATTERYHUB_HISTORY_PAGE_SIZE", 20))
+HISTORY_PAGE_SIZES = [10, 20, 50, 100]
+HISTORY_THUMBNAIL_SIZE = int(os.environ.get("BATTERYHUB_HISTORY_THUMBNAIL_SIZE", 160))
+
+# History is private to each browser (or signed-in user). Set
+# BATTERYHUB_HISTORY_SHARED=1 for a single-user install where everyone should
+# see one shared history (this is also where entries saved before history
+# had owners are kept).
+HISTORY_SHARED = os.environ.get("BATTERYHUB_HISTORY_SHARED", "0") == "1"
+HISTORY_OWNER_COOKIE = "batteryhub_owner"
+HISTORY_OWNER_COOKIE_DAYS = int(os.environ.get("BATTERYHUB_HISTORY_OWNER_COOKIE_DAYS", 365))
+
+# Bulk export / import of the history (see history_archive.py): entries are
+# read and inserted this many at a time, and exports built for the download
+# button spill to a temp file past the in-memory limit
+HISTORY_ARCHIVE_BATCH_SIZE = int(os.environ.get("BATTERYHUB_HISTORY_ARCHIVE_BATCH_SIZE", 500))
+HISTORY_EXPORT_SPOOL_BYTES = int(os.environ.get("BATTERYHUB_HISTORY_EXPORT_SPOOL_BYTES", 16 * 1024 * 1024))
+
+# Battery specification table ranked on the comparison page (CSV or
+# Parquet); see tools/build_battery_specs.py
+SPECS_PATH = os.environ.get("BATTERYHUB_SPECS", os.path.join(BASE_DIR, "data", "battery_specs.csv"))
+
+# Recycling guide knowledge base and drop-off site locator (local files, no
+# network); see tools/build_recycling_guides.py and tools/build_recycling_sites.py
+RECYCLING_GUIDES_PATH = os.environ.get(
+    "BATTERYHUB_RECYCLING_GUIDES", os.path.join(BASE_DIR, "data", "recycling_guides.json")
+)
+RECYCLING_SITES_PATH = os.environ.get(
+    "BATTERYHUB_RECYCLING_SITES", os.path.join(BASE_DIR, "data", "recycling_sites.csv")
+)
+ZIP_CENTROIDS_PATH = os.environ.get("BATTERYHUB_ZIP_CENTROIDS", os.path.join(BASE_DIR, "data", "zip_centroids.csv"))
+RECYCLING_LOCATOR_RESULTS = int(os.environ.get("BATTERYHUB_RECYCLING_LOCATOR_RESULTS", 5))
+
+# Local battery detector (pre-filter before the vision call). The app runs
+# without it when the model file is missing; see tools/train_detector.py.
+DETECTOR_MODEL_PATH = os.environ.get(
+    "BATTERYHUB_DETECTOR_MODEL", os.path.join(BASE_DIR, "models", "battery_detector.npz")
+)
+DETECTOR_REJECT_BELOW = float(os.environ.get("BATTERYHUB_DETECTOR_REJECT_BELOW", 0.3))
+DETECTOR_CONFIDENT_ABOVE = float(os.environ.get("BATTERYHUB_DETECTOR_CONFIDENT_ABOVE", 0.8))
+
+# Shared OpenAI client: connection pool, timeouts, retries and the
+# process-wide rate limits every session draws from
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL") or None
+OPENAI_TIMEOUT = float(os.environ.get("BATTERYHUB_OPENAI_TIMEOUT", 60))
+OPENAI_VISION_TIMEOUT = float(os.environ.get("BATTERYHUB_OPENAI_VISION_TIMEOUT", 90))
+OPENAI_CONNECT_TIMEOUT = float(os.environ.get("BATTERYHUB_OPENAI_CONNECT_TIMEOUT", 5))
+OPENAI_MAX_RETRIES = int(os.environ.get("BATTERYHUB_OPENAI_MAX_RETRIES", 5))
+OPENAI_MAX_CONNECTIONS = int(os.environ.get("BATTERYHUB_OPENAI_MAX_CONNECTIONS", 32))
+OPENAI_MAX_KEEPALIVE = int(os.environ.get("BATTERYHUB_OPENAI_MAX_KEEPALIVE", 16))
+OPENAI_REQUESTS_PER_MINUTE = int(os.environ.get("BATTERYHUB_OPENAI_RPM", 500))
+OPENAI_TOKENS_PER_MINUTE = int(os.environ.get("BATTERYHUB_OPENAI_TPM", 30000))
+
+# Instrumentation: bounded in-memory buffer of per-call records, optionally
+# appended to a JSONL file and/or served as Prometheus text on a local port
+METRICS_BUFFER_SIZE = int(os.environ.get("BATTERYHUB_METRICS_BUFFER_SIZE", 5000))
+METRICS_JSONL_PATH = os.environ.get("BATTERYHUB_METRICS_JSONL") or None
+METRICS_PORT = int(os.environ.get("BATTERYHUB_METRICS_PORT", 0))
+# USD per 1M tokens (prompt, completion), for the token spend estimate
+MODEL_PRICES = {"gpt-4-turbo": (10.0, 30.0)}
@@ -0,0 +1,462 @@
+import io
+import queue
+import struct
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+import config
+from image_pipeline import preprocess_image
+from instrumentation import percentile
+from perceptual_hash import hamming_distance, phash
+
+# Live capture: frames from the camera or a video file are sampled, the
+# blurry ones and the ones showing what was already analyzed are skipped,
+# and one sharp frame per battery (once the view has held still) is handed
+# to the analysis workers through a small bounded queue.
+
+# Sharpness and hashes are measured on frames downscaled to this edge, so the
+# blur threshold doesn't depend on the camera resolution
+ANALYSIS_EDGE = 256
+
+VIDEO_TYPES = ["mp4", "mov", "webm", "mkv", "avi", "mjpeg", "mjpg", "gif", "webp"]
+
+
+class UnsupportedVideoError(ValueError):
+    pass
+
+
+@dataclass
+class Frame:
+    index: int
+    timestamp: float
+    image: Image.Image
+    sharpness: float
+    phash: int
+
+
+# Variance of the 4-neighbour Laplacian; low for blurry frames, which have
+# little high-frequency detail
+def laplacian_variance(gray):
+    lap = gray[:-2, 1:-1] + gray[2:, 1:-1] + gray[1:-1, :-2] + gray[1:-1, 2:] - 4 * gray[1:-1, 1:-1]
+    return float(lap.var())
+
+
+# Per-stage wall time (seconds), shared by the capture and analysis threads
+class StageTimes:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._times = {}
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self._times.setdefault(stage, []).append(seconds)
+
+    def summary(self):
+        with self._lock:
+            times = {stage: sorted(values) for stage, values in self._times.items()}
+        return [{
+            "stage": stage,
+            "count": len(values),
+            "total_ms": sum(values) * 1000,
+            "mean_ms": sum(values) / len(values) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+        } for stage, values in times.items()]
+
+
+# Frame sources. Each yields (timestamp, load) where load() decodes the frame
+# to an RGB image, so frames the sampler isn't due to look at are skipped
+# without being decoded (or converted, for PyAV).
+
+# End offset of the JPEG starting at `start`: walk the marker segments to the
+# scan, then the entropy-coded data up to EOI (FF bytes in it are stuffed)
+def _jpeg_end(data, start):
+    position = start + 2
+    while position + 2 <= len(data):
+        if data[position] != 0xFF:
+            return -1
+        marker = data[position + 1]
+        if marker == 0xFF:
+            position += 1
+            continue
+        if marker == 0xD9:
+            return position + 2
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            position += 2
+            continue
+        if position + 4 > len(data):
+            return -1
+        length = struct.unpack(">H", data[position + 2:position + 4])[0]
+        position += 2 + length
+        if marker == 0xDA:
+            while True:
+                position = data.find(b"\xff", position)
+                if position < 0 or position + 1 >= len(data):
+                    return -1
+                following = data[position + 1]
+                if following == 0x00 or 0xD0 <= following <= 0xD7:
+                    position += 2
+                    continue
+                break
+    return -1
+
+
+# Motion JPEG: a raw stream of concatenated JPEGs, or an AVI wrapping one
+# (frame rate read from the AVI main header when present)
+def _iter_mjpeg(data, fps):
+    if data[:4] == b"RIFF" and data[8:12] == b"AVI ":
+        header = data.find(b"avih")
+        if header >= 0:
+            frame_micros = struct.unpack("<I", data[header + 8:header + 12])[0]
+            fps = 1e6 / frame_micros if frame_micros else fps
+    index, position = 0, data.find(b"\xff\xd8\xff")
+    while position >= 0:
+        end = _jpeg_end(data, position)
+        if end < 0:
+            return
+        chunk = data[position:end]
+        yield index / fps, lambda chunk=chunk: Image.open(io.BytesIO(chunk)).convert("RGB")
+        index += 1
+        position = data.find(b"\xff\xd8\xff", end)
+
+
+# Animated GIF / WebP / PNG. Frames are composited in order, so each one is
+# decoded even if it is then skipped.
+def _iter_animation(image):
+    timestamp = 0.0
+    for frame in ImageSequence.Iterator(image):
+        rgb = frame.convert("RGB")
+        yield timestamp, lambda rgb=rgb: rgb
+        timestamp += (frame.info.get("duration") or 100) / 1000
+
+
+# Anything else goes through PyAV (FFmpeg), if it is installed
+def _iter_av(data):
+    try:
+        import av
+    except ImportError:
+        raise UnsupportedVideoError(
+            "Reading this video needs PyAV (pip install av); Motion JPEG / AVI, GIF and animated WebP work without it"
+        ) from None
+    try:
+        container = av.open(io.BytesIO(data))
+    except Exception as e:
+        raise UnsupportedVideoError(f"Could not read the video: {e}") from e
+    with container:
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        for frame in container.decode(stream):
+            yield float(frame.time or 0.0), frame.to_image
+
+
+def iter_video_frames(data, fps=config.CAPTURE_MJPEG_FPS):
+    if data[:3] == b"\xff\xd8\xff" or (data[:4] == b"RIFF" and data[8:12] == b"AVI "):
+        return _iter_mjpeg(data, fps)
+    try:
+        image = Image.open(io.BytesIO(data))
+    except Exception:
+        return _iter_av(data)
+    if getattr(image, "n_frames", 1) > 1:
+        return _iter_animation(image)
+    # A still image is a one-frame video
+    return iter([(0.0, lambda: image.convert("RGB"))])
+
+
+# Decides which frames go to analysis. Frames are looked at every
+# `interval` seconds: the interval resets to min_interval while the view is
+# moving and doubles (up to max_interval) while it stays still. A sampled
+# frame is skipped when it is blurry, or when it shows what was last sent to
+# analysis (within change_distance bits of its pHash); otherwise it joins
+# the current still run, and once `stable_frames` consecutive samples agree
+# (within still_distance bits of each other) the sharpest of them is sent.
+# A run cut short by motion is still sent if the view had been held for
+# stable_seconds: a long-displayed frame (GIFs merge repeated frames, and
+# variable frame rate video does the same) may only get sampled once.
+class FrameSampler:
+    def __init__(self, blur_threshold=config.CAPTURE_BLUR_THRESHOLD, still_distance=config.CAPTURE_STILL_DISTANCE,
+                 change_distance=config.CAPTURE_CHANGE_DISTANCE, stable_frames=config.CAPTURE_STABLE_FRAMES,
+                 stable_seconds=config.CAPTURE_STABLE_SECONDS, min_interval=config.CAPTURE_MIN_INTERVAL,
+                 max_interval=config.CAPTURE_MAX_INTERVAL, times=None):
+        self.blur_threshold = blur_threshold
+        self.still_distance = still_distance
+        self.change_distance = change_distance
+        self.stable_frames = stable_frames
+        self.stable_seconds = stable_seconds
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.times = times or StageTimes()
+        self.counts = Counter()
+        self.interval = min_interval
+        self._next_due = None
+        self._last_hash = None
+        self._sent_hash = None
+        self._run = []
+
+    def due(self, timestamp):
+        return self._next_due is None or timestamp >= self._next_due
+
+    # Measure one frame. Returns (decision, frame to analyze or None) where
+    # decision is "blurry", "unchanged", "settling" or "accepted" (the
+    # accepted frame may be an earlier one, from a run this frame ended).
+    def offer(self, image, timestamp=0.0, index=0):
+        self.counts["sampled"] += 1
+        start = time.perf_counter()
+        gray = image.convert("L")
+        scale = ANALYSIS_EDGE / max(gray.size)
+        if scale < 1:
+            gray = gray.resize((max(1, round(gray.width * scale)), max(1, round(gray.height * scale))), Image.BILINEAR)
+        sharpness = laplacian_variance(np.asarray(gray, dtype=np.float32))
+        self.times.add("sharpness", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        hash_value = phash(gray)
+        self.times.add("phash", time.perf_counter() - start)
+        frame = Frame(index, timestamp, image, sharpness, hash_value)
+
+        moved = self._last_hash is not None and hamming_distance(hash_value, self._last_hash) > self.still_distance
+        self._last_hash = hash_value
+        held = None
+        if moved:
+            if self._run and timestamp - self._run[0].timestamp >= self.stable_seconds:
+                held = self._select()
+                self.counts["accepted"] += 1
+            self._run = []
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * 2, self.max_interval)
+        self._next_due = timestamp + self.interval
+
+        if sharpness < self.blur_threshold:
+            decision = "blurry"
+        elif self._sent_hash is not None and hamming_distance(hash_value, self._sent_hash) <= self.change_distance:
+            self._run = []
+            decision = "unchanged"
+        else:
+            self._run.append(frame)
+            decision = "settling"
+        if decision == "settling" and len(self._run) >= self.stable_frames:
+            self.counts["accepted"] += 1
+            return "accepted", self._select()
+        self.counts[decision] += 1
+        if held is not None:
+            return "accepted", held
+        return decision, None
+
+    # The video ended while a battery was in view but before the run was
+    # long enough; send its sharpest frame anyway
+    def flush(self):
+        if not self._run:
+            return None
+        self.counts["accepted"] += 1
+        return self._select()
+
+    def _select(self):
+        selected = max(self._run, key=lambda frame: frame.sharpness)
+        self._sent_hash = selected.phash
+        self._run = []
+        return selected
+
+
+@dataclass
+class CaptureResult:
+    frame: Frame
+    processed: object = None
+    details: str = None
+    reused: bool = False
+    error: Exception = None
+    queued_at: float = field(default=0.0, repr=False)
+
+
+# Bounded producer/consumer hand-off between capture and analysis. For live
+# capture submit() never blocks: when the analysis workers fall behind and
+# the queue is full, the oldest waiting frame is dropped in favour of the new
+# one. With block=True (a video file, which has no frame deadline) it waits
+# for a free slot instead, so no battery is lost. Workers call
+# analyze(processed) -> (details, reused) and exit after idle_timeout seconds
+# without work; submit() starts them again. stop() shuts the workers down for
+# good when nobody is reading the results any more.
+class CapturePipeline:
+    def __init__(self, analyze, queue_size=config.CAPTURE_QUEUE_SIZE, workers=config.CAPTURE_WORKERS,
+                 times=None, idle_timeout=30.0):
+        self.analyze = analyze
+        self.workers = workers
+        self.idle_timeout = idle_timeout
+        self.times = times or StageTimes()
+        self.counts = Counter()
+        self._frames = queue.Queue(maxsize=queue_size)
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pending = 0
+        self._stopped = threading.Event()
+
+    # Nothing is on its way from a stopped pipeline
+    @property
+    def pending(self):
+        with self._lock:
+            return 0 if self._stopped.is_set() else self._pending
+
+    def submit(self, frame, block=False):
+        result = CaptureResult(frame, queued_at=time.perf_counter())
+        with self._lock:
+            if self._stopped.is_set():
+                return
+            self._start_workers()
+            self._pending += 1
+            self.counts["queued"] += 1
+        if block:
+            # Wait for a free slot, but not on a pipeline that was stopped meanwhile
+            while not self._stopped.is_set():
+                try:
+                    self._frames.put(result, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            return
+        with self._lock:
+            while True:
+                try:
+                    self._frames.put_nowait(result)
+                    break
+                except queue.Full:
+                    try:
+                        self._frames.get_nowait()
+                    except queue.Empty:
+                        continue
+                    self._pending -= 1
+                    self.counts["dropped"] += 1
+
+    # Discard the waiting frames and wake the idle workers so they exit. A
+    # frame already being analyzed finishes, but its result is dropped.
+    def stop(self):
+        with self._lock:
+            self._stopped.set()
+            while True:
+                try:
+                    self._frames.get_nowait()
+                except queue.Empty:
+                    break
+            for _ in self._threads:
+                try:
+                    self._frames.put_nowait(None)
+                except queue.Full:
+                    break
+
+    # Called with the lock held
+    def _start_workers(self):
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name="battery-capture", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            try:
+                result = self._frames.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                result = None
+            if result is None:
+                with self._lock:
+                    # submit() counts a frame as pending before queueing it,
+                    # so this only exits when nothing is on its way
+                    if self._pending == 0 or self._stopped.is_set():
+                        self._threads = [thread for thread in self._threads if thread is not threading.current_thread()]
+                        return
+                continue
+            if self._stopped.is_set():
+                continue
+            self.times.add("queue_wait", time.perf_counter() - result.queued_at)
+            try:
+                start = time.perf_counter()
+                buffered = io.BytesIO()
+                result.frame.image.save(buffered, format="JPEG", quality=95)
+                result.processed = preprocess_image(buffered.getvalue())
+                self.times.add("preprocess", time.perf_counter() - start)
+
+                start = time.perf_counter()
+                result.details, result.reused = self.analyze(result.processed)
+                self.times.add("analysis", time.perf_counter() - start)
+            except Exception as e:
+                result.error = e
+            with self._lock:
+                self._pending -= 1
+            if not self._stopped.is_set():
+                self._results.put(result)
+
+    # Finished results so far; waits up to `timeout` for the first one
+    def results(self, timeout=0.0):
+        finished = []
+        try:
+            finished.append(self._results.get(timeout=timeout) if timeout else self._results.get_nowait())
+            while True:
+                finished.append(self._results.get_nowait())
+        except queue.Empty:
+            pass
+        return finished
+
+
+# Feed a video through a sampler into a pipeline on a background thread, so
+# decoding and sampling keep going while frames are being analyzed. With
+# realtime=True the video is paced at its frame rate and treated like a live
+# camera (frames are dropped rather than waited for when analysis falls
+# behind). Any decode error is stored as `error`; stop() ends the decoding
+# and the pipeline.
+class VideoCapture(threading.Thread):
+    def __init__(self, data, sampler, pipeline, realtime=False):
+        super().__init__(name="battery-capture-video", daemon=True)
+        self.data = data
+        self.sampler = sampler
+        self.pipeline = pipeline
+        self.realtime = realtime
+        self.error = None
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+        self.pipeline.stop()
+
+    def run(self):
+        sampler, pipeline = self.sampler, self.pipeline
+        started = time.perf_counter()
+        try:
+            frames = iter(iter_video_frames(self.data))
+            index = 0
+            while not self._stopped.is_set():
+                start = time.perf_counter()
+                try:
+                    timestamp, load = next(frames)
+                except StopIteration:
+                    break
+                sampler.counts["frames"] += 1
+                if sampler.due(timestamp):
+                    image = load()
+                    sampler.times.add("decode", time.perf_counter() - start)
+                    _, selected = sampler.offer(image, timestamp, index)
+                    if selected is not None:
+                        pipeline.submit(selected, block=not self.realtime)
+                else:
+                    sampler.times.add("skip", time.perf_counter() - start)
+                index += 1
+                # Pace the capture like a live camera
+                if self.realtime:
+                    delay = timestamp - (time.perf_counter() - started)
+                    if delay > 0:
+                        self._stopped.wait(delay)
+            if self._stopped.is_set():
+                return
+            selected = sampler.flush()
+            if selected is not None:
+                pipeline.submit(selected, block=not self.realtime)
+        except Exception as e:
+            self.error = e
+
+
+def start_video_capture(data, sampler, pipeline, realtime=False):
+    capture = VideoCapture(data, sampler, pipeline, realtime)
+    capture.start()
+    return capture
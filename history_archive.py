@@ -0,0 +1,255 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from collections import Counter
+
+import config
+from history_store import EXTENSIONS
+
+# Bulk export / import of the analysis history.
+#
+# Exports are written batch by batch straight from the store (images are read
+# from disk one at a time, never held as base64), either to a file object or
+# as a generator of byte chunks. The ZIP archive holds each image once under
+# images/ plus a manifest.jsonl with one line per entry; it is also the format
+# import_archive() reads back. Both work on one owner's history.
+
+MANIFEST_NAME = "manifest.jsonl"
+ARCHIVE_VERSION = 1
+
+FIELDS = ["id", "timestamp", "type", "details", "image_digest", "mime", "phash"]
+
+FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "zip": ("application/zip", ".zip"),
+}
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _row(entry):
+    row = {field: entry[field] for field in FIELDS}
+    row["phash"] = f"{entry['phash']:016x}" if entry["phash"] is not None else None
+    return row
+
+
+def archive_image_name(entry):
+    return f"images/{entry['image_digest']}{EXTENSIONS.get(entry['mime'], '.bin')}"
+
+
+# Each writer is a generator that writes one batch of entries to `out` per
+# step, so iter_export() can hand the bytes on between batches
+
+def _write_csv(store, owner, out, batch_size, filters):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    writer = csv.DictWriter(text, fieldnames=FIELDS)
+    writer.writeheader()
+    for batch in store.iter_entries(owner, batch_size, **filters):
+        writer.writerows(_row(entry) for entry in batch)
+        yield len(batch)
+    text.detach()
+
+
+def _write_parquet(store, owner, out, batch_size, filters):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()), ("timestamp", pa.string()), ("type", pa.string()), ("details", pa.string()),
+        ("image_digest", pa.string()), ("mime", pa.string()), ("phash", pa.string()),
+    ])
+    # One row group per batch
+    with pq.ParquetWriter(out, schema, compression="zstd") as writer:
+        for batch in store.iter_entries(owner, batch_size, **filters):
+            writer.write_table(pa.Table.from_pylist([_row(entry) for entry in batch], schema=schema))
+            yield len(batch)
+
+
+def _write_zip(store, owner, out, batch_size, filters):
+    written = set()
+    # Manifest lines are spooled aside while the images are streamed into the
+    # archive, then copied in as the last member
+    with tempfile.SpooledTemporaryFile(max_size=config.HISTORY_EXPORT_SPOOL_BYTES) as manifest:
+        manifest.write(json.dumps({"version": ARCHIVE_VERSION, "fields": FIELDS}).encode() + b"\n")
+        with zipfile.ZipFile(out, "w") as archive:
+            for batch in store.iter_entries(owner, batch_size, **filters):
+                for entry in batch:
+                    name = archive_image_name(entry)
+                    if name not in written:
+                        try:
+                            image = store.load_image(entry)
+                        except FileNotFoundError:
+                            name = None
+                        else:
+                            # JPEG / WebP / PNG are already compressed
+                            archive.writestr(name, image, compress_type=zipfile.ZIP_STORED)
+                            written.add(name)
+                    manifest.write(json.dumps(dict(_row(entry), image=name)).encode() + b"\n")
+                yield len(batch)
+            manifest.seek(0)
+            with archive.open(MANIFEST_NAME, "w", force_zip64=True) as member:
+                shutil.copyfileobj(manifest, member)
+
+
+_WRITERS = {"csv": _write_csv, "parquet": _write_parquet, "zip": _write_zip}
+
+
+def export_history(store, owner, fmt, out, batch_size=config.HISTORY_ARCHIVE_BATCH_SIZE, **filters):
+    count = 0
+    for batch_count in _WRITERS[fmt](store, owner, out, batch_size, filters):
+        count += batch_count
+    return count
+
+
+# Write-only sink that collects bytes until the generator below drains them
+class _ChunkSink(io.RawIOBase):
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def iter_export(store, owner, fmt, batch_size=config.HISTORY_ARCHIVE_BATCH_SIZE, **filters):
+    sink = _ChunkSink()
+    for _ in _WRITERS[fmt](store, owner, sink, batch_size, filters):
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+# Export into a temp file (in memory until it gets large, then on disk) for
+# st.download_button, which needs a file object rather than a generator
+def spool_export(store, owner, fmt, batch_size=config.HISTORY_ARCHIVE_BATCH_SIZE, **filters):
+    out = tempfile.SpooledTemporaryFile(max_size=config.HISTORY_EXPORT_SPOOL_BYTES)
+    export_history(store, owner, fmt, out, batch_size, **filters)
+    out.seek(0)
+    return out
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+def _parse_line(line, line_number):
+    try:
+        record = json.loads(line)
+        entry = {
+            "timestamp": str(record["timestamp"]),
+            "type": str(record["type"]),
+            "details": str(record["details"]),
+            "image_digest": str(record["image_digest"]),
+            "mime": str(record["mime"]),
+            "phash": int(record["phash"], 16) if record.get("phash") else None,
+        }
+        image = record.get("image")
+    except (ValueError, KeyError, TypeError) as e:
+        raise ArchiveError(f"{MANIFEST_NAME} line {line_number}: {e}") from e
+    # The digest becomes part of the image path on disk
+    if not _DIGEST_RE.match(entry["image_digest"]):
+        raise ArchiveError(f"{MANIFEST_NAME} line {line_number}: invalid image digest")
+    return entry, image
+
+
+# Image bytes from an archive must match their digest (they're stored under
+# it, and later uploads with that digest would show them) and decode
+def _valid_image(data, digest):
+    if hashlib.sha256(data).hexdigest() != digest:
+        return False
+    from PIL import Image
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+    except Exception:
+        return False
+    return True
+
+
+# Bulk import of a ZIP archive written by export_history(). Entries are
+# inserted batch_size at a time; after each batch on_batch(inserted, counts)
+# is called with the entries just inserted and the running per-type counts,
+# so callers can update their own indexes and progress as it goes. Returns
+# (imported, skipped, invalid, counts), where invalid counts entries whose
+# image didn't match its digest or couldn't be decoded.
+def import_archive(store, owner, fileobj, batch_size=config.HISTORY_ARCHIVE_BATCH_SIZE, on_batch=None):
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile as e:
+        raise ArchiveError(f"Not a history archive: {e}") from e
+
+    counts = Counter()
+    imported = skipped = invalid = 0
+    saved = set()
+    rejected = set()
+
+    def flush(batch):
+        nonlocal imported, skipped
+        inserted = store.add_many(owner, batch)
+        imported += len(inserted)
+        skipped += len(batch) - len(inserted)
+        counts.update(entry["type"] for entry in inserted)
+        if on_batch is not None:
+            on_batch(inserted, counts)
+
+    with archive:
+        if MANIFEST_NAME not in archive.namelist():
+            raise ArchiveError(f"Not a history archive: no {MANIFEST_NAME}")
+        names = set(archive.namelist())
+        batch = []
+        with archive.open(MANIFEST_NAME) as manifest:
+            try:
+                header = json.loads(manifest.readline() or b"{}")
+            except ValueError as e:
+                raise ArchiveError(f"{MANIFEST_NAME} line 1: {e}") from e
+            if not isinstance(header, dict) or header.get("version") != ARCHIVE_VERSION:
+                raise ArchiveError(f"Unsupported archive version in {MANIFEST_NAME}")
+            for line_number, line in enumerate(manifest, start=2):
+                if not line.strip():
+                    continue
+                entry, image = _parse_line(line, line_number)
+                if image not in names:
+                    # Entry without its image (missing when it was exported)
+                    skipped += 1
+                    continue
+                if image in rejected:
+                    invalid += 1
+                    continue
+                if image not in saved and not os.path.exists(store.image_path(entry["image_digest"], entry["mime"])):
+                    data = archive.read(image)
+                    if not _valid_image(data, entry["image_digest"]):
+                        rejected.add(image)
+                        invalid += 1
+                        continue
+                    store.save_image(entry["image_digest"], entry["mime"], data)
+                    saved.add(image)
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+        if batch:
+            flush(batch)
+    return imported, skipped, invalid, counts
@@ -0,0 +1,292 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import config
+
+EXTENSIONS = {"image/jpeg": ".jpg", "image/webp": ".webp", "image/png": ".png"}
+
+_ENTRY_COLUMNS = "id, created_at, type, details, image_digest, image_mime, phash"
+
+
+def _row_to_entry(row):
+    return {
+        "id": row[0],
+        "timestamp": row[1],
+        "type": row[2],
+        "details": row[3],
+        "image_digest": row[4],
+        "mime": row[5],
+        "phash": int(row[6], 16) if row[6] else None,
+    }
+
+
+# Persistent analysis history. Entries live in SQLite (WAL mode) with
+# indexes on owner, timestamp and type; images and their thumbnails are
+# stored once per content hash under image_dir instead of inline base64.
+# Every entry belongs to an owner (a browser or signed-in user, see
+# views/common.py) and all reads and writes are scoped to one owner; only the
+# image files are shared, since they're addressed by content.
+class HistoryStore:
+    def __init__(self, db_path=config.HISTORY_DB_PATH, image_dir=config.HISTORY_IMAGE_DIR):
+        self.db_path = db_path
+        self.image_dir = image_dir
+        self._lock = threading.Lock()
+
+        os.makedirs(image_dir, exist_ok=True)
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at TEXT NOT NULL,
+                type TEXT NOT NULL,
+                details TEXT NOT NULL,
+                image_digest TEXT NOT NULL,
+                image_mime TEXT NOT NULL,
+                phash TEXT,
+                owner TEXT NOT NULL DEFAULT ''
+            )
+        """)
+        # Databases from before entries had owners: their entries get the
+        # shared owner "" (see config.HISTORY_SHARED)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(entries)")]
+        if "owner" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+        self._conn.execute("DROP INDEX IF EXISTS idx_entries_created_at")
+        self._conn.execute("DROP INDEX IF EXISTS idx_entries_type_created_at")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_owner_created_at ON entries(owner, created_at)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entries_owner_type_created_at ON entries(owner, type, created_at)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_image_digest ON entries(image_digest)")
+
+    # Images
+
+    def image_path(self, digest, mime):
+        return os.path.join(self.image_dir, digest[:2], digest + EXTENSIONS.get(mime, ".bin"))
+
+    def thumbnail_path(self, digest):
+        return os.path.join(self.image_dir, "thumbs", digest[:2], digest + ".jpg")
+
+    def _write_file(self, path, data):
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial image
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def save_image(self, digest, mime, data):
+        self._write_file(self.image_path(digest, mime), data)
+
+    def load_image(self, entry):
+        with open(self.image_path(entry["image_digest"], entry["mime"]), "rb") as f:
+            return f.read()
+
+    # Thumbnails are written at save time; entries saved before thumbnails
+    # existed get theirs generated on first view
+    def load_thumbnail(self, entry):
+        path = self.thumbnail_path(entry["image_digest"])
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            # PIL is only needed here and in add(), so import it lazily; the
+            # home page only counts entries
+            from image_pipeline import make_thumbnail
+            thumbnail = make_thumbnail(self.load_image(entry))
+            self._write_file(path, thumbnail)
+            return thumbnail
+
+    def _remove_image(self, digest, mime):
+        for path in (self.image_path(digest, mime), self.thumbnail_path(digest)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    # Writes
+
+    # The image is written under the lock together with the insert, so a
+    # concurrent remove() can't delete it in between (the file already
+    # existing is what makes the write a no-op for a repeated image)
+    def add(self, owner, processed, details, battery_type, timestamp=None):
+        timestamp = timestamp or time.strftime("%Y-%m-%d %H:%M:%S")
+        thumbnail = None
+        if not os.path.exists(self.thumbnail_path(processed.digest)):
+            from image_pipeline import make_thumbnail
+            thumbnail = make_thumbnail(processed.data)
+        with self._lock:
+            self._write_file(self.image_path(processed.digest, processed.mime), processed.data)
+            if thumbnail is not None:
+                self._write_file(self.thumbnail_path(processed.digest), thumbnail)
+            cursor = self._conn.execute(
+                "INSERT INTO entries (created_at, type, details, image_digest, image_mime, phash, owner) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (timestamp, battery_type, details, processed.digest, processed.mime, f"{processed.phash:016x}",
+                 owner),
+            )
+            return cursor.lastrowid
+
+    # Bulk insert of entries in one transaction (used by the archive import).
+    # Their images must already be saved; thumbnails are generated on first
+    # view. Entries the owner already has (same timestamp, type and image)
+    # are skipped so re-importing an archive is harmless, and so are entries
+    # whose image a concurrent remove() deleted after it was saved. Returns
+    # the inserted entries with their new IDs.
+    def add_many(self, owner, entries):
+        if not entries:
+            return []
+        digests = list({entry["image_digest"] for entry in entries})
+        placeholders = ",".join("?" * len(digests))
+        inserted = []
+        with self._lock:
+            existing = set(self._conn.execute(
+                f"SELECT created_at, type, image_digest FROM entries WHERE owner = ? AND image_digest IN ({placeholders})",
+                [owner] + digests
+            ).fetchall())
+            self._conn.execute("BEGIN")
+            try:
+                for entry in entries:
+                    key = (entry["timestamp"], entry["type"], entry["image_digest"])
+                    if key in existing or not os.path.exists(self.image_path(entry["image_digest"], entry["mime"])):
+                        continue
+                    existing.add(key)
+                    phash = entry.get("phash")
+                    cursor = self._conn.execute(
+                        "INSERT INTO entries (created_at, type, details, image_digest, image_mime, phash, owner) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (entry["timestamp"], entry["type"], entry["details"], entry["image_digest"], entry["mime"],
+                         f"{phash:016x}" if phash is not None else None, owner),
+                    )
+                    inserted.append(dict(entry, id=cursor.lastrowid))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return inserted
+
+    # Images are shared between owners, so they're only deleted once no entry
+    # of any owner refers to them. The files go while the lock is still held:
+    # otherwise an add() of the same image could insert its entry between the
+    # check and the delete and be left without a file.
+    def remove(self, owner, entry_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT image_digest, image_mime FROM entries WHERE id = ? AND owner = ?", (entry_id, owner)
+            ).fetchone()
+            if row is None:
+                return False
+            self._conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+            still_used = self._conn.execute(
+                "SELECT 1 FROM entries WHERE image_digest = ? LIMIT 1", (row[0],)
+            ).fetchone()
+            if not still_used:
+                self._remove_image(*row)
+        return True
+
+    def clear(self, owner):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT image_digest, image_mime FROM entries WHERE owner = ?", (owner,)
+            ).fetchall()
+            self._conn.execute("DELETE FROM entries WHERE owner = ?", (owner,))
+            still_used = {row[0] for row in self._conn.execute("SELECT DISTINCT image_digest FROM entries")}
+            for row in rows:
+                if row[0] not in still_used:
+                    self._remove_image(*row)
+
+    # Queries
+
+    def get(self, owner, entry_id):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_ENTRY_COLUMNS} FROM entries WHERE id = ? AND owner = ?", (entry_id, owner)
+            ).fetchone()
+        return _row_to_entry(row) if row else None
+
+    def get_many(self, owner, entry_ids):
+        if not entry_ids:
+            return []
+        placeholders = ",".join("?" * len(entry_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_ENTRY_COLUMNS} FROM entries WHERE owner = ? AND id IN ({placeholders})",
+                [owner] + list(entry_ids)
+            ).fetchall()
+        by_id = {row[0]: _row_to_entry(row) for row in rows}
+        return [by_id[entry_id] for entry_id in entry_ids if entry_id in by_id]
+
+    # WHERE clause for the owner and the optional type / date filters. Dates
+    # are inclusive "YYYY-MM-DD" strings compared against the indexed
+    # created_at column.
+    @staticmethod
+    def _filters(owner, battery_type=None, start_date=None, end_date=None):
+        clauses, params = ["owner = ?"], [owner]
+        if battery_type is not None:
+            clauses.append("type = ?")
+            params.append(battery_type)
+        if start_date is not None:
+            clauses.append("created_at >= ?")
+            params.append(str(start_date))
+        if end_date is not None:
+            clauses.append("created_at <= ?")
+            params.append(f"{end_date} 23:59:59")
+        return " WHERE " + " AND ".join(clauses), params
+
+    def count(self, owner, battery_type=None, start_date=None, end_date=None):
+        where, params = self._filters(owner, battery_type, start_date, end_date)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM entries{where}", params).fetchone()[0]
+
+    # Newest-first page of entry IDs matching the filters
+    def page_ids(self, owner, offset=0, limit=config.HISTORY_PAGE_SIZE, battery_type=None, start_date=None,
+                 end_date=None):
+        where, params = self._filters(owner, battery_type, start_date, end_date)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id FROM entries{where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # All entries matching the filters, oldest first, in lists of batch_size.
+    # Pages are keyed on the ID rather than OFFSET so each batch is an index
+    # seek, and the lock is only held while a batch is read.
+    def iter_entries(self, owner, batch_size=config.HISTORY_ARCHIVE_BATCH_SIZE, battery_type=None, start_date=None,
+                     end_date=None):
+        where, params = self._filters(owner, battery_type, start_date, end_date)
+        where = where + " AND id > ?"
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {_ENTRY_COLUMNS} FROM entries{where} ORDER BY id LIMIT ?",
+                    params + [last_id, batch_size],
+                ).fetchall()
+            if not rows:
+                return
+            yield [_row_to_entry(row) for row in rows]
+            last_id = rows[-1][0]
+
+    def type_counts(self, owner):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT type, COUNT(*) FROM entries WHERE owner = ? GROUP BY type ORDER BY COUNT(*) DESC, type",
+                (owner,)
+            ).fetchall()
+        return dict(rows)
+
+    def iter_phashes(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT id, phash FROM entries WHERE phash IS NOT NULL").fetchall()
+        for entry_id, phash in rows:
+            yield entry_id, int(phash, 16)
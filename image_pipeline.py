@@ -0,0 +1,110 @@
+import base64
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from PIL import Image, ImageOps
+
+import config
+from instrumentation import track
+from perceptual_hash import phash
+
+MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+# Preprocessed uploads memoized by content hash, so reruns with the same
+# file never decode or encode it again
+_CACHE_SIZE = 64
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ProcessedImage:
+    digest: str
+    data: bytes
+    mime: str
+    width: int
+    height: int
+    phash: int
+
+    @property
+    def base64(self):
+        return base64.b64encode(self.data).decode()
+
+    @property
+    def data_url(self):
+        return f"data:{self.mime};base64,{self.base64}"
+
+
+def file_digest(raw):
+    return hashlib.sha256(raw).hexdigest()
+
+
+# Decode, orient, downscale and re-encode an uploaded image exactly once
+def preprocess_image(raw, max_edge=None, fmt=None, quality=None):
+    max_edge = max_edge or config.IMAGE_MAX_EDGE
+    fmt = (fmt or config.IMAGE_FORMAT).upper()
+    quality = quality or config.IMAGE_QUALITY
+    if fmt not in MIME_TYPES:
+        raise ValueError(f"Unsupported image format: {fmt}")
+
+    with track("image_preprocess", "image") as span:
+        digest = file_digest(raw)
+        key = (digest, max_edge, fmt, quality)
+        with _cache_lock:
+            if key in _cache:
+                _cache.move_to_end(key)
+                span["cache"] = "hit"
+                return _cache[key]
+        span["cache"] = "miss"
+
+        image = Image.open(io.BytesIO(raw))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        image = _convert_mode(image, fmt)
+        hash_value = phash(image)
+
+        buffered = io.BytesIO()
+        if fmt == "JPEG":
+            image.save(buffered, format="JPEG", quality=quality, optimize=True, progressive=True)
+        elif fmt == "WEBP":
+            image.save(buffered, format="WEBP", quality=quality, method=4)
+        else:
+            image.save(buffered, format="PNG", optimize=True)
+
+        span["payload_bytes"] = len(buffered.getvalue())
+        processed = ProcessedImage(digest, buffered.getvalue(), MIME_TYPES[fmt], image.width, image.height, hash_value)
+        with _cache_lock:
+            _cache[key] = processed
+            _cache.move_to_end(key)
+            while len(_cache) > _CACHE_SIZE:
+                _cache.popitem(last=False)
+        return processed
+
+
+# Small JPEG preview for history listings
+def make_thumbnail(data, size=None):
+    size = size or config.HISTORY_THUMBNAIL_SIZE
+    image = Image.open(io.BytesIO(data))
+    image.draft("RGB", (size, size))
+    image.thumbnail((size, size), Image.LANCZOS)
+    image = _convert_mode(image, "JPEG")
+    buffered = io.BytesIO()
+    image.save(buffered, format="JPEG", quality=80, optimize=True)
+    return buffered.getvalue()
+
+
+def _convert_mode(image, fmt):
+    if fmt == "JPEG" and image.mode != "RGB":
+        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            # Flatten transparency onto white, JPEG has no alpha channel
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            return background
+        return image.convert("RGB")
+    if image.mode not in ("RGB", "RGBA", "L"):
+        return image.convert("RGBA" if "transparency" in image.info else "RGB")
+    return image
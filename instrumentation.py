@@ -0,0 +1,181 @@
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+
+QUANTILES = (0.5, 0.95, 0.99)
+_TOTAL_FIELDS = ("count", "seconds", "prompt_tokens", "completion_tokens", "tokens_saved", "cost_usd",
+                 "payload_bytes", "errors", "cache_hits", "cache_lookups")
+
+
+# Nearest-rank percentile: the smallest value with at least q of the values
+# at or below it (q * n is rounded first so float error like 0.07 * 100 =
+# 7.000000000000001 doesn't push it up a rank)
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(round(q * len(sorted_values), 9)) - 1)]
+
+
+# Per-call records (wall time, tokens, payload size, cache status) kept in a
+# bounded ring buffer, plus running totals that are never truncated
+class Recorder:
+    def __init__(self, size=config.METRICS_BUFFER_SIZE, jsonl_path=config.METRICS_JSONL_PATH):
+        self.jsonl_path = jsonl_path
+        self._records = deque(maxlen=size)
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, call_site, kind, duration, **fields):
+        record = {"call_site": call_site, "kind": kind, "at": time.time(), "duration": duration}
+        record.update((key, value) for key, value in fields.items() if value is not None)
+        with self._lock:
+            self._records.append(record)
+            totals = self._totals.setdefault((call_site, kind), dict.fromkeys(_TOTAL_FIELDS, 0))
+            totals["count"] += 1
+            totals["seconds"] += duration
+            totals["prompt_tokens"] += record.get("prompt_tokens", 0)
+            totals["completion_tokens"] += record.get("completion_tokens", 0)
+            totals["tokens_saved"] += record.get("tokens_saved", 0)
+            if "model" in record:
+                totals["cost_usd"] += estimate_cost(
+                    record["model"], record.get("prompt_tokens", 0), record.get("completion_tokens", 0)
+                )
+            totals["payload_bytes"] += record.get("payload_bytes", 0)
+            totals["errors"] += bool(record.get("error"))
+            if "cache" in record:
+                totals["cache_lookups"] += 1
+                totals["cache_hits"] += record["cache"] == "hit"
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+        return record
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._totals.clear()
+
+    # One row per (call site, kind): latency percentiles over the buffered
+    # window and running totals since start-up
+    def summary(self):
+        with self._lock:
+            records = list(self._records)
+            totals = {key: dict(value) for key, value in self._totals.items()}
+
+        durations, ttfts = {}, {}
+        for record in records:
+            key = (record["call_site"], record["kind"])
+            durations.setdefault(key, []).append(record["duration"])
+            if "ttft" in record:
+                ttfts.setdefault(key, []).append(record["ttft"])
+
+        rows = []
+        for key in sorted(totals):
+            window = sorted(durations.get(key, []))
+            ttft = sorted(ttfts.get(key, []))
+            total = totals[key]
+            rows.append({
+                "call_site": key[0],
+                "kind": key[1],
+                **total,
+                **{f"p{int(q * 100)}": percentile(window, q) for q in QUANTILES},
+                "ttft_p50": percentile(ttft, 0.5),
+            })
+        return rows
+
+    def prometheus_text(self):
+        lines = [
+            "# HELP batteryhub_call_duration_seconds Wall time per call site (quantiles over the recent window).",
+            "# TYPE batteryhub_call_duration_seconds summary",
+        ]
+        rows = self.summary()
+        for row in rows:
+            labels = f'call_site="{row["call_site"]}",kind="{row["kind"]}"'
+            for q in QUANTILES:
+                value = row[f"p{int(q * 100)}"]
+                if value is not None:
+                    lines.append(f'batteryhub_call_duration_seconds{{{labels},quantile="{q}"}} {value:.6f}')
+            lines.append(f"batteryhub_call_duration_seconds_sum{{{labels}}} {row['seconds']:.6f}")
+            lines.append(f"batteryhub_call_duration_seconds_count{{{labels}}} {row['count']}")
+
+        counters = (
+            ("batteryhub_tokens_total", "Tokens used per call site.", None),
+            ("batteryhub_tokens_saved_total", "Input tokens removed by prompt compaction per call site.",
+             "tokens_saved"),
+            ("batteryhub_payload_bytes_total", "Request payload bytes per call site.", "payload_bytes"),
+            ("batteryhub_errors_total", "Failed calls per call site.", "errors"),
+            ("batteryhub_cache_hits_total", "Cache hits per call site.", "cache_hits"),
+            ("batteryhub_cache_lookups_total", "Cache lookups per call site.", "cache_lookups"),
+        )
+        for name, help_text, field in counters:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for row in rows:
+                labels = f'call_site="{row["call_site"]}",kind="{row["kind"]}"'
+                if field is None:
+                    lines.append(f'{name}{{{labels},direction="prompt"}} {row["prompt_tokens"]}')
+                    lines.append(f'{name}{{{labels},direction="completion"}} {row["completion_tokens"]}')
+                else:
+                    lines.append(f"{name}{{{labels}}} {row[field]}")
+        return "\n".join(lines) + "\n"
+
+    def jsonl(self):
+        return "".join(json.dumps(record) + "\n" for record in self.records())
+
+
+# Process-wide recorder used by every instrumented call site
+recorder = Recorder()
+
+
+# Time a block and record it on exit. The yielded dict can be filled with
+# extra fields (tokens, payload_bytes, cache, ...) inside the block;
+# exceptions are recorded with error=True and re-raised.
+@contextmanager
+def track(call_site, kind, **fields):
+    span = dict(fields)
+    start = time.perf_counter()
+    try:
+        yield span
+    except Exception:
+        span["error"] = True
+        raise
+    finally:
+        recorder.record(call_site, kind, time.perf_counter() - start, **span)
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    prompt_price, completion_price = config.MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+# Serve recorder.prometheus_text() at /metrics on a background thread
+def start_metrics_server(port, host="127.0.0.1"):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = recorder.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("content-type", "text/plain; version=0.0.4")
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
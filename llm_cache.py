@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import config
+from instrumentation import track
+from streaming import stream_completion
+
+# Stable identity of a prompt, used for caching and request coalescing
+def prompt_key(model, messages, max_tokens):
+    payload = json.dumps([model, messages, max_tokens], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Shared, on-disk cache for deterministic LLM prompts (recycling guides,
+# compatible alternatives). Entries are keyed on model + prompt + max_tokens,
+# expire after a TTL and are evicted least-recently-used once the table grows
+# past max_entries.
+class ResponseCache:
+    def __init__(self, path=config.LLM_CACHE_PATH, ttl=config.LLM_CACHE_TTL,
+                 max_entries=config.LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                content TEXT NOT NULL,
+                latency REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+
+    @staticmethod
+    def make_key(model, messages, max_tokens):
+        return prompt_key(model, messages, max_tokens)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, latency, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[2] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+            self.saved_seconds += row[1]
+            return row[0]
+
+    def set(self, key, model, content, latency):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, content, latency, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, content, latency, now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self.hits = self.misses = 0
+            self.saved_seconds = 0.0
+
+    def stats(self):
+        with self._lock:
+            entries, lifetime_hits, lifetime_saved = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0), COALESCE(SUM(hits * latency), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_seconds": self.saved_seconds,
+            "lifetime_hits": lifetime_hits,
+            "lifetime_saved_seconds": lifetime_saved,
+        }
+
+
+# Run a chat completion through the cache, only calling the API on a miss.
+# With a SingleFlight, concurrent misses for the same prompt share one call.
+# The "cache" record times the lookup only; the API call records its own.
+def cached_completion(cache, client, call_site, model, messages, max_tokens, flight=None):
+    with track(call_site, "cache") as span:
+        key = cache.make_key(model, messages, max_tokens)
+        content = cache.get(key)
+        span["cache"] = "hit" if content is not None else "miss"
+    if content is not None:
+        return content
+
+    def fetch():
+        start = time.perf_counter()
+        response = client.chat.completions.create(
+            call_site=call_site, model=model, messages=messages, max_tokens=max_tokens
+        )
+        content = response.choices[0].message.content
+        cache.set(key, model, content, time.perf_counter() - start)
+        return content
+
+    return fetch() if flight is None else flight.do(key, fetch)
+
+
+# Streaming variant: a cached answer is yielded in one piece, a miss is
+# streamed from the API and stored once it completes. With a SingleFlight,
+# concurrent misses for the same prompt read from one upstream stream.
+def stream_cached_completion(cache, client, call_site, model, messages, max_tokens, timing=None, flight=None,
+                             tokens_saved=None):
+    # Closed before anything is yielded, so the "cache" record times the
+    # lookup only, not the upstream stream or the caller rendering it
+    with track(call_site, "cache") as span:
+        key = cache.make_key(model, messages, max_tokens)
+        content = cache.get(key)
+        span["cache"] = "hit" if content is not None else "miss"
+    if content is not None:
+        if timing is not None:
+            timing.update(call_site=call_site, ttft=0.0, total=0.0, cached=True)
+        yield content
+        return
+
+    def upstream():
+        start = time.perf_counter()
+        parts = []
+        for delta in stream_completion(client, call_site, model, messages, max_tokens, timing=timing,
+                                       tokens_saved=tokens_saved):
+            parts.append(delta)
+            yield delta
+        cache.set(key, model, "".join(parts), time.perf_counter() - start)
+
+    if flight is None:
+        yield from upstream()
+    else:
+        yield from flight.do_stream(key, upstream)
@@ -0,0 +1,210 @@
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+import config
+from instrumentation import recorder
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+# Rough prompt cost of an image part (high-detail tiles average out to
+# roughly this for the downscaled uploads; low detail is a flat 85)
+IMAGE_TOKEN_ESTIMATE = 765
+LOW_DETAIL_IMAGE_TOKENS = 85
+
+
+# Token bucket refilled continuously at capacity / period. A request larger
+# than the whole bucket is clamped so it can still go through on a full one.
+class TokenBucket:
+    def __init__(self, capacity, period=60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.level = self.capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    # Block until `amount` is available; returns the seconds spent waiting
+    def acquire(self, amount):
+        amount = min(float(amount), self.capacity)
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.level >= amount:
+                    self.level -= amount
+                    return now - start
+                self._cond.wait((amount - self.level) / self.rate)
+
+    # Correct an earlier estimate once the real cost is known (negative
+    # amounts debit the bucket further, positive ones refund it)
+    def adjust(self, amount):
+        with self._cond:
+            self._refill(time.monotonic())
+            self.level = min(self.capacity, self.level + amount)
+            self._cond.notify_all()
+
+
+# Requests/min and tokens/min limits shared by every session in the process.
+# A 429 from the API pauses all callers until its Retry-After has passed.
+class RateLimiter:
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def acquire(self, tokens):
+        waited = 0.0
+        with self._lock:
+            pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+            waited += pause
+        waited += self.requests.acquire(1)
+        waited += self.tokens.acquire(tokens)
+        return waited
+
+
+def estimate_prompt_tokens(messages):
+    tokens = 0
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, str):
+            tokens += len(content) // 4 + 4
+            continue
+        for part in content:
+            if part.get("type") == "text":
+                tokens += len(part["text"]) // 4 + 4
+            elif part["image_url"].get("detail") == "low":
+                tokens += LOW_DETAIL_IMAGE_TOKENS
+            else:
+                tokens += IMAGE_TOKEN_ESTIMATE
+    return tokens
+
+
+def payload_size(messages):
+    return len(json.dumps(messages, ensure_ascii=False).encode("utf-8"))
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+# Process-wide OpenAI client. It keeps the `client.chat.completions.create`
+# surface, so callers are unchanged, and adds a pooled keep-alive HTTP
+# client, per-call timeouts, jittered exponential backoff and the shared
+# rate limiter. The SDK's own retries are disabled so retries are counted
+# against the limiter.
+class LLMClient:
+    def __init__(self, api_key=config.OPENAI_API_KEY, base_url=config.OPENAI_BASE_URL,
+                 timeout=config.OPENAI_TIMEOUT, max_retries=config.OPENAI_MAX_RETRIES,
+                 requests_per_minute=config.OPENAI_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=config.OPENAI_TOKENS_PER_MINUTE,
+                 max_connections=config.OPENAI_MAX_CONNECTIONS,
+                 max_keepalive_connections=config.OPENAI_MAX_KEEPALIVE):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self._http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=30.0,
+            ),
+            timeout=httpx.Timeout(timeout, connect=config.OPENAI_CONNECT_TIMEOUT),
+        )
+        self._client = openai.OpenAI(
+            api_key=api_key, base_url=base_url, http_client=self._http_client, max_retries=0
+        )
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+        self._stats_lock = threading.Lock()
+        self._stats = {"calls": 0, "retries": 0, "rate_limited": 0, "errors": 0, "throttle_seconds": 0.0}
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    # Non-streamed calls are recorded here under `call_site` (with the input
+    # tokens prompt compaction saved, if given); streamed calls are recorded
+    # by streaming.stream_completion once the stream ends
+    def create(self, call_site="completion", base_delay=1.0, max_delay=30.0, tokens_saved=None, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        estimate = estimate_prompt_tokens(kwargs["messages"]) + kwargs.get("max_tokens", 0)
+        self._count("calls")
+        start = time.perf_counter()
+        retries = 0
+
+        for attempt in range(self.max_retries + 1):
+            self._count("throttle_seconds", self.limiter.acquire(estimate))
+            try:
+                response = self._client.chat.completions.create(**kwargs)
+            except RETRYABLE_ERRORS as e:
+                delay = _retry_after(e)
+                if isinstance(e, openai.RateLimitError):
+                    self._count("rate_limited")
+                    # Back every session off, not just this caller
+                    self.limiter.pause(delay if delay is not None else base_delay)
+                if attempt == self.max_retries:
+                    self._count("errors")
+                    self._record(call_site, kwargs, start, retries, tokens_saved, error=True)
+                    raise
+                if delay is None:
+                    delay = min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+                self._count("retries")
+                retries += 1
+                time.sleep(delay)
+                continue
+            except Exception:
+                self._count("errors")
+                self._record(call_site, kwargs, start, retries, tokens_saved, error=True)
+                raise
+
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                self.limiter.tokens.adjust(estimate - usage.total_tokens)
+            if not kwargs.get("stream"):
+                self._record(call_site, kwargs, start, retries, tokens_saved, usage=usage)
+            return response
+
+    def _record(self, call_site, kwargs, start, retries, tokens_saved=None, usage=None, error=None):
+        recorder.record(
+            call_site, "llm", time.perf_counter() - start,
+            model=kwargs.get("model"), retries=retries or None, error=error,
+            payload_bytes=payload_size(kwargs["messages"]),
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else None,
+            tokens_saved=tokens_saved,
+        )
+
+    def close(self):
+        self._http_client.close()
@@ -0,0 +1,118 @@
+import threading
+
+import numpy as np
+from PIL import Image
+
+HASH_SIZE = 8
+_DCT_SIZE = 32
+
+
+def _dct_matrix(n):
+    k = np.arange(n).reshape(-1, 1)
+    i = np.arange(n).reshape(1, -1)
+    return np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def _bits_to_int(bits):
+    value = 0
+    for bit in bits.ravel():
+        value = (value << 1) | int(bit)
+    return value
+
+
+# 64-bit average hash over an 8x8 grayscale thumbnail
+def average_hash(image):
+    pixels = np.asarray(image.convert("L").resize((HASH_SIZE, HASH_SIZE), Image.LANCZOS), dtype=np.float32)
+    return _bits_to_int(pixels > pixels.mean())
+
+
+# 64-bit DCT perceptual hash: low 8x8 frequencies of a 32x32 grayscale
+# thumbnail, thresholded at their median (DC term excluded)
+def phash(image):
+    pixels = np.asarray(image.convert("L").resize((_DCT_SIZE, _DCT_SIZE), Image.LANCZOS), dtype=np.float64)
+    low = (_DCT @ pixels @ _DCT.T)[:HASH_SIZE, :HASH_SIZE]
+    median = np.median(low.ravel()[1:])
+    return _bits_to_int(low > median)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+# Multi-index hashing over Hamming distance. The 64-bit hash is split into
+# max_distance + 1 disjoint chunks; by the pigeonhole principle any hash
+# within max_distance matches the query exactly on at least one chunk, so a
+# lookup only verifies the few entries sharing a chunk bucket with the query.
+class MultiIndexHash:
+    def __init__(self, max_distance=6, bits=64):
+        self.max_distance = max_distance
+        chunks = max_distance + 1
+        widths = [bits // chunks + (1 if i < bits % chunks else 0) for i in range(chunks)]
+        self._chunks = []
+        shift = bits
+        for width in widths:
+            shift -= width
+            self._chunks.append((shift, (1 << width) - 1))
+        self._tables = [{} for _ in self._chunks]
+        self._hashes = []
+        self._items = []
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def add(self, hash_value, item):
+        entry = len(self._hashes)
+        self._hashes.append(hash_value)
+        self._items.append(item)
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            table.setdefault((hash_value >> shift) & mask, []).append(entry)
+
+    # All (distance, item) pairs within max_distance, nearest first
+    def search(self, hash_value, max_distance=None):
+        if max_distance is None:
+            max_distance = self.max_distance
+        if max_distance > self.max_distance:
+            raise ValueError(f"Index was built for distances up to {self.max_distance}")
+
+        candidates = set()
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            candidates.update(table.get((hash_value >> shift) & mask, ()))
+
+        # Nearest first; among equal distances the most recently added wins
+        matches = []
+        for entry in sorted(candidates, reverse=True):
+            distance = hamming_distance(hash_value, self._hashes[entry])
+            if distance <= max_distance:
+                matches.append((distance, self._items[entry]))
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+
+# Thread-safe index of past analyses keyed by perceptual hash
+class DuplicateIndex:
+    def __init__(self, max_distance=6):
+        self.max_distance = max_distance
+        self._index = MultiIndexHash(max_distance)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._index)
+
+    def add(self, hash_value, item):
+        with self._lock:
+            self._index.add(hash_value, item)
+
+    # All (distance, item) pairs within the threshold, nearest first
+    def matches(self, hash_value, max_distance=None):
+        if max_distance is None:
+            max_distance = self.max_distance
+        with self._lock:
+            return self._index.search(hash_value, min(max_distance, self.max_distance))
+
+    # Closest (distance, item) within the threshold, or None
+    def find(self, hash_value, max_distance=None):
+        matches = self.matches(hash_value, max_distance)
+        return matches[0] if matches else None
@@ -0,0 +1,282 @@
+import math
+import re
+from functools import lru_cache
+
+import config
+from battery_parser import parse_battery_details
+
+# Prompt building for the LLM call sites. Instead of the vision model's full
+# free-text answer, prompts carry a compact summary of the parsed battery
+# record (key fields only, each clipped), and every prompt is fitted to a
+# per-call input token budget counted with the model's tokenizer. Builders
+# return (messages, tokens_saved), where tokens_saved is how many input
+# tokens the compaction removed compared with sending the same inputs
+# verbatim; it is recorded with the call.
+
+# Chat format overhead (OpenAI's counting guide for gpt-4 models): each
+# message costs a few tokens on top of its content, and the reply is primed
+# with a few more
+MESSAGE_TOKENS = 3
+REPLY_TOKENS = 3
+
+# Vision image cost: a flat 85 tokens at low detail; at high detail the image
+# is fitted in 2048x2048, its short side scaled to 768, and each 512px tile
+# costs 170 more
+LOW_DETAIL_IMAGE_TOKENS = 85
+IMAGE_TILE_TOKENS = 170
+
+SUMMARY_FIELDS = [
+    ("Type", "type_text"),
+    ("Voltage", "voltage_text"),
+    ("Form factor", "form_factor"),
+    ("Capacity", "capacity_text"),
+    ("Shelf life", "shelf_life_text"),
+    ("Uses", "common_uses"),
+    ("Safety", "safety"),
+    ("Recycling", "recycling"),
+]
+ALTERNATIVES_FIELDS = ["Type", "Voltage", "Form factor", "Capacity", "Uses"]
+
+CHAT_SYSTEM_PROMPT = "You are a battery expert. Answer questions about this battery:"
+ALTERNATIVES_SYSTEM_PROMPT = "You are a battery expert. Provide compatible battery alternatives."
+COMPARISON_SYSTEM_PROMPT = "You are a battery expert providing detailed technical comparisons."
+
+# Chat history answers are clipped rather than dropped while at least this
+# much of the budget is left for them
+MIN_CLIPPED_TOKENS = 32
+
+# Share of the budget the system message (with the battery summary) keeps
+# before an oversized question is clipped
+SYSTEM_BUDGET_SHARE = 0.25
+
+_BULLET_PATTERN = re.compile(r"\s*\n\s*(?:[-*•]|\d+[.)])?\s*")
+_SPACE_PATTERN = re.compile(r"\s+")
+
+
+# Tokenizer
+
+# tiktoken needs its vocabulary file, which it downloads on first use; when
+# that isn't possible the ~4 characters per token estimate is used instead.
+# Loaded (or given up on) once per process.
+@lru_cache(maxsize=None)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(config.PROMPT_ENCODING)
+    except Exception:
+        return None
+
+
+def tokenizer_name():
+    return f"tiktoken {config.PROMPT_ENCODING}" if _encoding() is not None else "estimate (~4 characters per token)"
+
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def count_tokens(text):
+    encoding = _encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+# Cut text to at most max_tokens, marking the cut
+def clip_tokens(text, max_tokens):
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _encoding()
+    if encoding is None:
+        clipped = text[:max(0, max_tokens - 1) * 4]
+    else:
+        clipped = encoding.decode(encoding.encode(text, disallowed_special=())[:max(0, max_tokens - 1)])
+    return clipped.rstrip() + "…"
+
+
+def image_tokens(width, height, detail="high"):
+    if detail == "low":
+        return LOW_DETAIL_IMAGE_TOKENS
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return LOW_DETAIL_IMAGE_TOKENS + IMAGE_TILE_TOKENS * math.ceil(width / 512) * math.ceil(height / 512)
+
+
+def message_tokens(messages):
+    tokens = REPLY_TOKENS
+    for message in messages:
+        tokens += MESSAGE_TOKENS
+        content = message["content"]
+        if isinstance(content, str):
+            tokens += count_tokens(content)
+            continue
+        for part in content:
+            if part.get("type") == "text":
+                tokens += count_tokens(part["text"])
+            else:
+                detail = part["image_url"].get("detail", "high")
+                # Size unknown here: count a 1024x768 image at high detail
+                tokens += image_tokens(1024, 768, detail)
+    return tokens
+
+
+# Clip text contents until the messages fit the budget, in order: earlier
+# messages (history), the system message down to its share of the budget (it
+# carries the battery summary), the last message (the question being asked),
+# and finally anything still above the minimum
+def fit_messages(messages, budget):
+    messages = [dict(message) for message in messages]
+    last = len(messages) - 1
+    earlier = [i for i in range(last) if messages[i]["role"] != "system"]
+    system = [i for i in range(last) if messages[i]["role"] == "system"]
+    system_floor = max(MIN_CLIPPED_TOKENS, int(budget * SYSTEM_BUDGET_SHARE))
+    for indexes, floor in ((earlier, MIN_CLIPPED_TOKENS), (system, system_floor), ([last], MIN_CLIPPED_TOKENS),
+                           (range(last), MIN_CLIPPED_TOKENS)):
+        _clip_longest(messages, indexes, floor, budget)
+    return messages
+
+
+def _clip_longest(messages, indexes, floor, budget):
+    indexes = [i for i in indexes if isinstance(messages[i]["content"], str)]
+    over = message_tokens(messages) - budget
+    while over > 0:
+        sizes = {i: count_tokens(messages[i]["content"]) for i in indexes}
+        sizes = {i: size for i, size in sizes.items() if size > floor}
+        if not sizes:
+            return
+        longest = max(sizes, key=sizes.get)
+        messages[longest]["content"] = clip_tokens(messages[longest]["content"], max(floor, sizes[longest] - over))
+        if count_tokens(messages[longest]["content"]) >= sizes[longest]:
+            return
+        over = message_tokens(messages) - budget
+
+
+# Battery summary
+
+def _squash(text):
+    return _SPACE_PATTERN.sub(" ", _BULLET_PATTERN.sub("; ", text.strip())).strip("; ")
+
+
+# Key fields of the parsed record, one "Field: value" line each. Falls back
+# to the clipped raw text when nothing could be parsed.
+def battery_summary(details, fields=None, field_tokens=None):
+    field_tokens = field_tokens or config.PROMPT_SUMMARY_FIELD_TOKENS
+    record = parse_battery_details(details)
+    lines = []
+    for label, attribute in SUMMARY_FIELDS:
+        if fields is not None and label not in fields:
+            continue
+        value = getattr(record, attribute) or (record.type if label == "Type" and record.type != "Other" else None)
+        if value:
+            lines.append(f"{label}: {clip_tokens(_squash(value), field_tokens)}")
+    if len(lines) <= 1:
+        return clip_tokens(_squash(details or ""), field_tokens * 4)
+    return "\n".join(lines)
+
+
+def _saved(verbatim, messages):
+    return max(0, message_tokens(verbatim) - message_tokens(messages))
+
+
+# Chat history by priority: the newest message (the question) is always
+# kept; the rest of the budget goes to earlier questions, newest first, and
+# then to earlier answers, newest first, clipping the one that no longer
+# fits whole. Order is preserved.
+def prioritize_history(history, budget):
+    if not history:
+        return []
+    keep = {len(history) - 1: history[-1]["content"]}
+    remaining = budget - count_tokens(history[-1]["content"]) - MESSAGE_TOKENS
+    for role in ("user", "assistant"):
+        for i in range(len(history) - 2, -1, -1):
+            if history[i]["role"] != role or remaining <= MESSAGE_TOKENS:
+                continue
+            content = history[i]["content"]
+            cost = count_tokens(content) + MESSAGE_TOKENS
+            if cost <= remaining:
+                keep[i] = content
+                remaining -= cost
+            elif role == "assistant" and remaining - MESSAGE_TOKENS >= MIN_CLIPPED_TOKENS:
+                keep[i] = clip_tokens(content, remaining - MESSAGE_TOKENS)
+                remaining -= count_tokens(keep[i]) + MESSAGE_TOKENS
+    return [{"role": history[i]["role"], "content": keep[i]} for i in sorted(keep)]
+
+
+# Builders, one per call site
+
+def chat_messages(details, history, budget=None):
+    budget = budget or config.PROMPT_BUDGET_CHAT
+    system = {"role": "system", "content": f"{CHAT_SYSTEM_PROMPT}\n{battery_summary(details)}"}
+    history_budget = budget - message_tokens([system])
+    messages = fit_messages([system, *prioritize_history(history, history_budget)], budget)
+    verbatim = [
+        {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+        {"role": "assistant", "content": f"Battery details: {details}"},
+        *history,
+    ]
+    return messages, _saved(verbatim, messages)
+
+
+def alternatives_messages(details, budget=None):
+    budget = budget or config.PROMPT_BUDGET_ALTERNATIVES
+    instruction = "List 3 compatible alternatives with brief descriptions for this battery:"
+    messages = fit_messages([
+        {"role": "system", "content": ALTERNATIVES_SYSTEM_PROMPT},
+        {"role": "user", "content": f"{instruction}\n{battery_summary(details, fields=ALTERNATIVES_FIELDS)}"},
+    ], budget)
+    verbatim = [
+        {"role": "system", "content": ALTERNATIVES_SYSTEM_PROMPT},
+        {"role": "user", "content": f"{instruction}\n{details}"},
+    ]
+    return messages, _saved(verbatim, messages)
+
+
+def _format_value(value):
+    # NumPy scalars from the table to plain Python values
+    value = value.item() if hasattr(value, "item") else value
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+# `comparison` is SpecTable.compare() output (one column per battery type):
+# sent as one header line and one " | "-separated row per type
+def comparison_messages(comparison, types, budget=None):
+    budget = budget or config.PROMPT_BUDGET_COMPARISON
+    fields = list(comparison.index)
+    rows = [" | ".join(["Type", *fields])]
+    rows += [" | ".join([battery_type, *(_format_value(comparison[battery_type][field]) for field in fields)])
+             for battery_type in types]
+    instruction = ("Provide a paragraph comparing their key strengths and weaknesses, "
+                   "and provide use case recommendations.")
+    messages = fit_messages([
+        {"role": "system", "content": COMPARISON_SYSTEM_PROMPT},
+        {"role": "user", "content": "Compare these battery types:\n" + "\n".join(rows) + "\n" + instruction},
+    ], budget)
+    specs = "\n\n".join(
+        f"{battery_type}:\n" + "\n".join(f"{field}: {comparison[battery_type][field]}" for field in fields)
+        for battery_type in types
+    )
+    verbatim = [
+        {"role": "system", "content": COMPARISON_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Compare these battery types in detail:\n\n{specs}\n\n{instruction}"},
+    ]
+    return messages, _saved(verbatim, messages)
+
+
+# Vision detail for a preprocessed image: small images gain nothing from high
+# detail, and so do simple ones (plain background, little texture), which
+# compress to few JPEG bits per pixel. Returns (detail, tokens_saved).
+def vision_detail(processed):
+    detail = config.VISION_IMAGE_DETAIL
+    if detail == "auto":
+        bits_per_pixel = len(processed.data) * 8 / (processed.width * processed.height)
+        simple = max(processed.width, processed.height) <= 512 or bits_per_pixel <= config.VISION_LOW_DETAIL_MAX_BPP
+        detail = "low" if simple else "high"
+    if detail != "low":
+        return detail, 0
+    return detail, image_tokens(processed.width, processed.height) - LOW_DETAIL_IMAGE_TOKENS
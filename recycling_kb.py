@@ -0,0 +1,38 @@
+import json
+import os
+from dataclasses import dataclass
+
+import config
+
+# Battery types the recycling guide covers (the Recycling Info selectbox)
+RECYCLING_TYPES = ["Alkaline", "Lithium-ion", "NiMH", "NiCd", "Lead Acid", "Button Cell"]
+
+
+# Prompt used to generate a guide, shared by the build tool and the page's
+# fallback for types missing from the knowledge base
+def guide_messages(battery_type):
+    return [
+        {"role": "system", "content": "You are a battery recycling expert. Provide detailed recycling instructions."},
+        {"role": "user", "content": f"Provide detailed recycling instructions for {battery_type} batteries. Include safety precautions, preparation steps, and where to recycle them."}
+    ]
+
+
+# Versioned set of recycling guides (markdown per battery type), built once
+# by tools/build_recycling_guides.py and shipped with the app
+@dataclass(frozen=True)
+class RecyclingGuides:
+    version: int
+    source: str
+    updated: str
+    guides: dict
+
+    def get(self, battery_type):
+        return self.guides.get(battery_type)
+
+
+def load_recycling_guides(path=config.RECYCLING_GUIDES_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return RecyclingGuides(data["version"], data.get("source", ""), data.get("updated", ""), data["guides"])
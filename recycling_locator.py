@@ -0,0 +1,152 @@
+import bisect
+import csv
+import heapq
+
+import numpy as np
+
+import config
+
+EARTH_RADIUS_MILES = 3958.8
+SAMPLE_SOURCE = "sample"
+
+
+# Points on the unit sphere, so straight-line (chord) distance orders places
+# the same way great-circle distance does
+def to_unit_vectors(lat, lon):
+    lat, lon = np.radians(np.asarray(lat, dtype=np.float64)), np.radians(np.asarray(lon, dtype=np.float64))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def chord_to_miles(chord):
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.minimum(np.asarray(chord) / 2, 1.0))
+
+
+# Static k-d tree over 3-D points. Each node covers a contiguous run of
+# `_order`; leaves are scanned with one vectorized distance computation.
+class KDTree:
+    def __init__(self, points, leaf_size=16):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.leaf_size = leaf_size
+        self._order = np.arange(len(self.points))
+        # Per node: start, end, split dimension (-1 for leaves), split value, children
+        self._start, self._end, self._dim, self._split, self._left, self._right = [], [], [], [], [], []
+        if len(self.points):
+            self._build(0, len(self.points))
+
+    def __len__(self):
+        return len(self.points)
+
+    def _build(self, start, end):
+        node = len(self._start)
+        self._start.append(start)
+        self._end.append(end)
+        for values in (self._dim, self._split, self._left, self._right):
+            values.append(-1)
+        if end - start <= self.leaf_size:
+            return node
+        segment = self._order[start:end]
+        coords = self.points[segment]
+        dim = int(np.argmax(coords.max(axis=0) - coords.min(axis=0)))
+        middle = (end - start) // 2
+        partitioned = np.argpartition(coords[:, dim], middle)
+        self._order[start:end] = segment[partitioned]
+        self._dim[node] = dim
+        self._split[node] = float(self.points[self._order[start + middle], dim])
+        self._left[node] = self._build(start, start + middle)
+        self._right[node] = self._build(start + middle, end)
+        return node
+
+    # The k nearest points as (distances, indices), nearest first
+    def query(self, point, k=1):
+        point = np.asarray(point, dtype=np.float64)
+        k = min(k, len(self.points))
+        if k == 0:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        heap = []  # max-heap of (-squared distance, index)
+        self._search(0, point, k, heap)
+        best = sorted((-neg, index) for neg, index in heap)
+        return np.sqrt([d for d, _ in best]), np.array([i for _, i in best], dtype=np.int64)
+
+    def _search(self, node, point, k, heap):
+        dim = self._dim[node]
+        if dim < 0:
+            indices = self._order[self._start[node]:self._end[node]]
+            distances = ((self.points[indices] - point) ** 2).sum(axis=1)
+            for distance, index in zip(distances.tolist(), indices.tolist()):
+                if len(heap) < k:
+                    heapq.heappush(heap, (-distance, index))
+                elif distance < -heap[0][0]:
+                    heapq.heapreplace(heap, (-distance, index))
+            return
+        offset = point[dim] - self._split[node]
+        near, far = (self._left[node], self._right[node]) if offset < 0 else (self._right[node], self._left[node])
+        self._search(near, point, k, heap)
+        if len(heap) < k or offset * offset < -heap[0][0]:
+            self._search(far, point, k, heap)
+
+
+# Nearest battery drop-off sites to a ZIP code, from local CSV files: ZIP
+# centroids (zip, lat, lon) and sites (name, address, zip, lat, lon, accepts
+# as a ";"-separated list of battery types, and an optional source naming
+# where the row came from; "sample" marks the made-up demo sites shipped with
+# the app). One tree per accepted type, so a query only looks at sites that
+# take that battery.
+class RecyclingLocator:
+    def __init__(self, sites_path=config.RECYCLING_SITES_PATH, zips_path=config.ZIP_CENTROIDS_PATH):
+        with open(zips_path, newline="") as f:
+            self._zips = {row["zip"]: (float(row["lat"]), float(row["lon"])) for row in csv.DictReader(f)}
+        self._zip_list = sorted(self._zips)
+
+        with open(sites_path, newline="") as f:
+            self.sites = [
+                {
+                    "name": row["name"],
+                    "address": row["address"],
+                    "zip": row["zip"],
+                    "lat": float(row["lat"]),
+                    "lon": float(row["lon"]),
+                    "accepts": [t.strip() for t in row["accepts"].split(";") if t.strip()],
+                    "source": row.get("source") or "",
+                    "sample": row.get("source") == SAMPLE_SOURCE,
+                }
+                for row in csv.DictReader(f)
+            ]
+        points = to_unit_vectors([s["lat"] for s in self.sites], [s["lon"] for s in self.sites]).reshape(-1, 3)
+
+        self._trees = {None: (KDTree(points), np.arange(len(self.sites)))}
+        for battery_type in sorted({t for site in self.sites for t in site["accepts"]}):
+            members = np.array([i for i, site in enumerate(self.sites) if battery_type in site["accepts"]])
+            self._trees[battery_type] = (KDTree(points[members]), members)
+
+    @property
+    def battery_types(self):
+        return [t for t in self._trees if t is not None]
+
+    # Centroid of a ZIP code as (lat, lon, matched ZIP). ZIPs missing from the
+    # table fall back to the closest listed ZIP sharing at least the 3-digit
+    # prefix (ZIP prefixes are regional); None if there is none.
+    def locate(self, zip_code):
+        if zip_code in self._zips:
+            return (*self._zips[zip_code], zip_code)
+        position = bisect.bisect_left(self._zip_list, zip_code)
+        best, best_shared = None, 2
+        for candidate in self._zip_list[max(0, position - 1):position + 1]:
+            shared = next((i for i, (a, b) in enumerate(zip(candidate, zip_code)) if a != b), len(zip_code))
+            if shared > best_shared:
+                best, best_shared = candidate, shared
+        return (*self._zips[best], best) if best else None
+
+    # Up to k nearest sites accepting battery_type (any type when None), each
+    # a copy of the site record with "distance_miles"; None if the ZIP is unknown
+    def nearest(self, zip_code, battery_type=None, k=config.RECYCLING_LOCATOR_RESULTS):
+        location = self.locate(zip_code)
+        if location is None:
+            return None
+        tree, members = self._trees.get(battery_type, (None, None))
+        if tree is None:
+            return []
+        chords, indices = tree.query(to_unit_vectors(location[0], location[1]), k)
+        return [
+            dict(self.sites[members[index]], distance_miles=float(miles))
+            for index, miles in zip(indices, chord_to_miles(chords))
+        ]
@@ -0,0 +1,76 @@
+import streamlit as st
+
+import config
+
+# Process-wide objects shared by every session. Each one is created the first
+# time a page asks for it, and its module is imported only then, so pages
+# that don't need the OpenAI client, NumPy or pandas never load them.
+
+# Optional Prometheus endpoint for the instrumentation records
+@st.cache_resource
+def get_metrics_server():
+    from instrumentation import start_metrics_server
+    return start_metrics_server(config.METRICS_PORT) if config.METRICS_PORT else None
+
+# One pooled, rate-limited OpenAI client per process, shared by every session
+@st.cache_resource
+def get_llm_client():
+    from openai_client import LLMClient
+    return LLMClient()
+
+# One response cache per process, shared by every session
+@st.cache_resource
+def get_response_cache():
+    from llm_cache import ResponseCache
+    return ResponseCache()
+
+# Chat answers reused for similar questions about the same battery type
+@st.cache_resource
+def get_semantic_cache():
+    from semantic_cache import SemanticCache
+    return SemanticCache()
+
+# Coalesces identical in-flight prompts from concurrent sessions into one API call
+@st.cache_resource
+def get_single_flight():
+    from singleflight import SingleFlight
+    return SingleFlight()
+
+# Local battery detector, loaded once per process (None when no model is installed)
+@st.cache_resource
+def get_detector():
+    from battery_detector import load_detector
+    return load_detector(config.DETECTOR_MODEL_PATH)
+
+# Persistent analysis history, shared by every session
+@st.cache_resource
+def get_history_store():
+    from history_store import HistoryStore
+    return HistoryStore()
+
+# Perceptual-hash index of past analyses (hash -> history entry ID), used to
+# skip re-analysing near-duplicate uploads
+@st.cache_resource
+def get_dedupe_index():
+    from perceptual_hash import DuplicateIndex
+    index = DuplicateIndex(max_distance=config.DEDUPE_MAX_DISTANCE)
+    for entry_id, hash_value in get_history_store().iter_phashes():
+        index.add(hash_value, entry_id)
+    return index
+
+# Battery specification table, loaded once per process and shared read-only
+@st.cache_resource
+def get_spec_table():
+    from battery_specs import SpecTable
+    return SpecTable.load(config.SPECS_PATH)
+
+# Recycling guides and drop-off locator, loaded from local files once per process
+@st.cache_resource
+def get_recycling_guides():
+    from recycling_kb import load_recycling_guides
+    return load_recycling_guides(config.RECYCLING_GUIDES_PATH)
+
+@st.cache_resource
+def get_recycling_locator():
+    from recycling_locator import RecyclingLocator
+    return RecyclingLocator(config.RECYCLING_SITES_PATH, config.ZIP_CENTROIDS_PATH)
@@ -0,0 +1,207 @@
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+import config
+from battery_parser import parse_battery_details
+
+# Words that carry no meaning for matching questions about a battery. The
+# battery is already the partition, so "battery" itself is noise too.
+STOP_WORDS = frozenset("""
+    a an the is it its it's this that these those i me my we you your can could would should will
+    do does did to of for in on at with and or be are was were am how what which when where why who
+    there here please tell about any so if as by from up out much many have has had ok okay way other
+    battery batteries one
+""".split())
+NEGATIONS = frozenset({"not", "no", "never"})
+_SUFFIXES = ("ability", "able", "ible", "ing", "ed", "es", "er", "ly", "s")
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_NOT_PATTERN = re.compile(r"n't\b")
+_FORM_FACTOR_PATTERN = re.compile(r"[a-z0-9-]+")
+
+
+# Crude suffix stripping so "rechargeable" / "recharge" / "recharging" meet
+def _stem(word):
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def question_terms(text):
+    text = _NOT_PATTERN.sub(" not", text.lower())
+    return [_stem(word) for word in _WORD_PATTERN.findall(text) if len(word) > 1 and word not in STOP_WORDS]
+
+
+# Unit-length hashed term vector of a question: each (stemmed) content word
+# is hashed into one of `dim` buckets with a random sign. Negations weigh
+# double so "can use" and "can't use" don't match. Only a handful of buckets
+# are non-zero, which is what keeps searches cheap.
+def embed(text, dim=config.SEMANTIC_CACHE_DIM):
+    vector = np.zeros(dim, dtype=np.float32)
+    terms = question_terms(text)
+    for term in terms:
+        h = zlib.crc32(term.encode("utf-8"))
+        weight = 2.0 if term in NEGATIONS else 1.0
+        vector[h % dim] += weight if h & 0x80000000 else -weight
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector), len(terms)
+
+
+# Partition key for the analyzed battery: chemistry, form factor, voltage
+# and capacity parsed from the vision answer, so an answer stored for one
+# battery ("1.5 V, AA cell") is only reused for the same kind of battery,
+# not for any battery of that chemistry. None (don't cache) when the
+# chemistry couldn't be identified.
+def battery_partition(details):
+    record = parse_battery_details(details or "")
+    if record.type == "Other":
+        return None
+    form_factor = _FORM_FACTOR_PATTERN.search((record.form_factor or "").lower())
+    return (record.type, form_factor.group(0) if form_factor else None, record.voltage,
+            round(record.capacity_mah) if record.capacity_mah is not None else None)
+
+
+# Questions and answers of one battery. Vectors are stored
+# feature-major (dim x capacity, float16), so a search only reads the rows
+# of the features present in the query.
+class _Partition:
+    def __init__(self, dim, capacity=64):
+        self.vectors = np.zeros((dim, capacity), dtype=np.float16)
+        self.last_used = np.zeros(capacity)
+        self.hits = np.zeros(capacity, dtype=np.int64)
+        self.questions = []
+        self.answers = []
+        self.size = 0
+
+    def append(self, vector, question, answer, now):
+        if self.size == self.vectors.shape[1]:
+            capacity = max(64, self.size * 2)
+            self.vectors = np.pad(self.vectors, ((0, 0), (0, capacity - self.size)))
+            self.last_used = np.pad(self.last_used, (0, capacity - self.size))
+            self.hits = np.pad(self.hits, (0, capacity - self.size))
+        self.vectors[:, self.size] = vector
+        self.last_used[self.size] = now
+        self.hits[self.size] = 0
+        self.questions.append(question)
+        self.answers.append(answer)
+        self.size += 1
+
+    # Top-k (similarity, row) pairs, best first
+    def search(self, vector, k):
+        if self.size == 0:
+            return []
+        features = np.flatnonzero(vector)
+        scores = vector[features] @ self.vectors[features, :self.size].astype(np.float32)
+        k = min(k, self.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[row]), int(row)) for row in top]
+
+    def keep(self, mask):
+        rows = np.flatnonzero(mask)
+        self.size = len(rows)
+        self.vectors = self.vectors[:, rows]
+        self.last_used = self.last_used[rows]
+        self.hits = self.hits[rows]
+        self.questions = [self.questions[row] for row in rows]
+        self.answers = [self.answers[row] for row in rows]
+
+
+# Per-process cache of chat answers keyed by question meaning rather than
+# exact text, partitioned by battery (see battery_partition()). Once it holds more than
+# max_entries answers the least recently used tenth is evicted in one pass.
+class SemanticCache:
+    def __init__(self, threshold=config.SEMANTIC_CACHE_THRESHOLD, max_entries=config.SEMANTIC_CACHE_MAX_ENTRIES,
+                 dim=config.SEMANTIC_CACHE_DIM):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.dim = dim
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.evictions = 0
+        self._partitions = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    # Closest stored questions for a battery: (similarity, question, answer)
+    def search(self, partition, question, k=5):
+        vector, _ = embed(question, self.dim)
+        with self._lock:
+            part = self._partitions.get(partition)
+            if part is None:
+                return []
+            return [(score, part.questions[row], part.answers[row]) for score, row in part.search(vector, k)]
+
+    # Stored answer of the most similar question above the threshold, as
+    # (answer, similarity, matched question), or None. Questions with no
+    # content words ("why?", "and then?") depend on the conversation and are
+    # never answered from the cache.
+    def lookup(self, partition, question):
+        vector, terms = embed(question, self.dim)
+        with self._lock:
+            if terms == 0:
+                self.skipped += 1
+                return None
+            part = self._partitions.get(partition)
+            best = part.search(vector, 1) if part is not None else []
+            if not best or best[0][0] < self.threshold:
+                self.misses += 1
+                return None
+            score, row = best[0]
+            part.last_used[row] = time.time()
+            part.hits[row] += 1
+            self.hits += 1
+            return part.answers[row], score, part.questions[row]
+
+    def add(self, partition, question, answer):
+        vector, terms = embed(question, self.dim)
+        if terms == 0:
+            return
+        with self._lock:
+            part = self._partitions.get(partition)
+            if part is None:
+                part = self._partitions[partition] = _Partition(self.dim)
+            part.append(vector, question, answer, time.time())
+            self._size += 1
+            if self._size > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        last_used = np.concatenate([part.last_used[:part.size] for part in self._partitions.values()])
+        drop = max(1, len(last_used) // 10)
+        cutoff = np.partition(last_used, drop - 1)[drop - 1]
+        for name, part in list(self._partitions.items()):
+            part.keep(part.last_used[:part.size] > cutoff)
+            if part.size == 0:
+                del self._partitions[name]
+        size = sum(part.size for part in self._partitions.values())
+        self.evictions += self._size - size
+        self._size = size
+
+    def clear(self):
+        with self._lock:
+            self._partitions.clear()
+            self._size = 0
+            self.hits = self.misses = self.skipped = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": self._size,
+                "partitions": len(self._partitions),
+                "hits": self.hits,
+                "misses": self.misses,
+                "skipped": self.skipped,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "memory_bytes": sum(part.vectors.nbytes for part in self._partitions.values()),
+            }
@@ -0,0 +1,44 @@
+import time
+
+from instrumentation import recorder
+from openai_client import payload_size
+
+
+# Stream a chat completion as text deltas (suitable for st.write_stream).
+# Time-to-first-token, total latency and token usage are recorded for the
+# call site (with the input tokens prompt compaction saved, if given) and,
+# if a `timing` dict is passed, written into it once the stream ends.
+def stream_completion(client, call_site, model, messages, max_tokens, timing=None, tokens_saved=None):
+    start = time.perf_counter()
+    ttft = None
+    usage = None
+    error = None
+    try:
+        stream = client.chat.completions.create(
+            call_site=call_site, model=model, messages=messages, max_tokens=max_tokens, stream=True,
+            stream_options={"include_usage": True}
+        )
+        for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                yield delta
+    except Exception:
+        error = True
+        raise
+    finally:
+        total = time.perf_counter() - start
+        recorder.record(
+            call_site, "llm", total, model=model, ttft=ttft, error=error,
+            payload_bytes=payload_size(messages),
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else None,
+            tokens_saved=tokens_saved,
+        )
+        if timing is not None:
+            timing.update(call_site=call_site, ttft=ttft, total=total)
@@ -0,0 +1,203 @@
+# Build the battery specification table the comparison page ranks over
+# (data/battery_specs.csv) from per-chemistry reference figures and the
+# form factors each chemistry is sold in. Edit the tables below, or append
+# rows to the CSV directly, then re-run:
+#
+#   python tools/build_battery_specs.py [--output data/battery_specs.csv] [--parquet]
+#
+# Chemistry figures are typical published values for a cell of that
+# chemistry; per-row capacity is derived from the form factor's typical mass
+# unless the form factor states one.
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from battery_specs import SPEC_COLUMNS  # noqa: E402
+
+# variant: (chemistry, nominal cell voltage, cycles, Wh/kg, self-discharge % per month, cost)
+CHEMISTRIES = {
+    "Alkaline": ("Alkaline", 1.5, 1, 110, 2, "Low"),
+    "Rechargeable Alkaline": ("Alkaline", 1.5, 50, 85, 0.3, "Low"),
+    "Zinc-Carbon": ("Zinc-Carbon", 1.5, 1, 40, 3, "Low"),
+    "Zinc Chloride": ("Zinc-Carbon", 1.5, 1, 55, 2.5, "Low"),
+    "Lithium Iron Disulfide": ("Lithium", 1.5, 1, 297, 0.1, "Medium"),
+    "Lithium Manganese Dioxide": ("Lithium", 3.0, 1, 230, 0.1, "Medium"),
+    "Lithium Thionyl Chloride": ("Lithium", 3.6, 1, 500, 0.1, "High"),
+    "Lithium-ion (LCO)": ("Lithium-ion", 3.6, 500, 180, 2, "High"),
+    "Lithium-ion (NMC)": ("Lithium-ion", 3.6, 1000, 220, 2, "High"),
+    "Lithium-ion (NCA)": ("Lithium-ion", 3.6, 800, 250, 2, "High"),
+    "Lithium-ion (LMO)": ("Lithium-ion", 3.7, 700, 140, 2, "Medium"),
+    "Lithium Polymer": ("Lithium-ion", 3.7, 500, 200, 3, "High"),
+    "Lithium Titanate": ("Lithium-ion", 2.4, 10000, 80, 2, "High"),
+    "LiFePO4": ("LiFePO4", 3.2, 3000, 120, 3, "Medium"),
+    "NiMH": ("NiMH", 1.2, 1000, 90, 30, "Medium"),
+    "NiMH Low Self-Discharge": ("NiMH", 1.2, 1500, 80, 1.5, "Medium"),
+    "NiCd": ("NiCd", 1.2, 500, 45, 20, "Medium"),
+    "NiZn": ("NiZn", 1.6, 400, 100, 13, "Medium"),
+    "Lead Acid (Flooded)": ("Lead Acid", 2.0, 300, 30, 5, "Low"),
+    "Lead Acid (AGM)": ("Lead Acid", 2.0, 500, 35, 3, "Low"),
+    "Lead Acid (Gel)": ("Lead Acid", 2.0, 700, 33, 2, "Medium"),
+    "Zinc-Air": ("Zinc-Air", 1.4, 1, 440, 0.2, "Low"),
+    "Silver Oxide": ("Silver Oxide", 1.55, 1, 130, 0.1, "Medium"),
+    "Alkaline Button": ("Alkaline", 1.5, 1, 60, 0.5, "Low"),
+    "Lithium-ion Coin": ("Lithium-ion", 3.6, 500, 90, 2, "Medium"),
+}
+
+CONSUMER = ["Alkaline", "Rechargeable Alkaline", "Zinc-Carbon", "Zinc Chloride", "Lithium Iron Disulfide",
+            "NiMH", "NiMH Low Self-Discharge", "NiCd", "NiZn"]
+LARGE_CONSUMER = ["Alkaline", "Zinc-Carbon", "Zinc Chloride", "NiMH", "NiMH Low Self-Discharge", "NiCd",
+                  "Lithium Thionyl Chloride"]
+LI_ION = ["Lithium-ion (LCO)", "Lithium-ion (NMC)", "Lithium-ion (NCA)", "Lithium-ion (LMO)", "LiFePO4"]
+LEAD_ACID = ["Lead Acid (Flooded)", "Lead Acid (AGM)", "Lead Acid (Gel)", "LiFePO4"]
+
+# form factor: (typical mass in grams, cells in series, variants, stated capacity in mAh or None)
+FORM_FACTORS = {
+    "AAAA": (6.5, 1, ["Alkaline", "NiMH"], None),
+    "AAA": (11.5, 1, CONSUMER, None),
+    "AA": (23, 1, CONSUMER, None),
+    "C": (66, 1, LARGE_CONSUMER, None),
+    "D": (141, 1, LARGE_CONSUMER, None),
+    "N": (9, 1, ["Alkaline", "NiMH"], None),
+    "9V": (45, 6, ["Alkaline", "Zinc-Carbon", "NiMH", "NiCd"], None),
+    "9V Lithium": (34, 3, ["Lithium Manganese Dioxide"], None),
+    "9V Li-ion": (30, 2, ["Lithium-ion (LCO)"], None),
+    "A23 (12V)": (8, 8, ["Alkaline"], None),
+    "A27 (12V)": (4.4, 8, ["Alkaline"], None),
+    "6V Lantern": (600, 4, ["Alkaline", "Zinc-Carbon"], None),
+    "10440": (9, 1, LI_ION, None),
+    "14500": (19, 1, LI_ION, None),
+    "16340": (17, 1, LI_ION, None),
+    "18350": (31, 1, LI_ION, None),
+    "18500": (40, 1, LI_ION, None),
+    "18650": (46, 1, LI_ION + ["Lithium Titanate"], None),
+    "20700": (63, 1, LI_ION, None),
+    "21700": (68, 1, LI_ION, None),
+    "26650": (90, 1, LI_ION + ["Lithium Titanate"], None),
+    "32700": (150, 1, ["LiFePO4", "Lithium-ion (NMC)"], None),
+    "4680": (355, 1, ["Lithium-ion (NMC)", "Lithium-ion (NCA)"], None),
+    "66160 LTO": (240, 1, ["Lithium Titanate"], None),
+    "CR123A": (17, 1, ["Lithium Manganese Dioxide"], None),
+    "CR2": (11, 1, ["Lithium Manganese Dioxide"], None),
+    "CR-P2": (37, 2, ["Lithium Manganese Dioxide"], None),
+    "2CR5": (40, 2, ["Lithium Manganese Dioxide"], None),
+    "ER14505 (AA)": (18, 1, ["Lithium Thionyl Chloride"], None),
+    "ER34615 (D)": (100, 1, ["Lithium Thionyl Chloride"], None),
+    "CR927": (0.5, 1, ["Lithium Manganese Dioxide"], None),
+    "CR1025": (0.7, 1, ["Lithium Manganese Dioxide"], None),
+    "CR1220": (0.8, 1, ["Lithium Manganese Dioxide"], None),
+    "CR1616": (1.2, 1, ["Lithium Manganese Dioxide"], None),
+    "CR1620": (1.3, 1, ["Lithium Manganese Dioxide"], None),
+    "CR1632": (1.8, 1, ["Lithium Manganese Dioxide"], None),
+    "CR2016": (1.8, 1, ["Lithium Manganese Dioxide"], None),
+    "CR2025": (2.5, 1, ["Lithium Manganese Dioxide"], None),
+    "CR2032": (3.0, 1, ["Lithium Manganese Dioxide", "Lithium-ion Coin"], None),
+    "CR2430": (4.0, 1, ["Lithium Manganese Dioxide"], None),
+    "CR2450": (6.8, 1, ["Lithium Manganese Dioxide", "Lithium-ion Coin"], None),
+    "CR2477": (10.5, 1, ["Lithium Manganese Dioxide"], None),
+    "LR41 / SR41": (0.6, 1, ["Alkaline Button", "Silver Oxide"], None),
+    "LR43 / SR43": (1.2, 1, ["Alkaline Button", "Silver Oxide"], None),
+    "LR44 / SR44": (2.0, 1, ["Alkaline Button", "Silver Oxide"], None),
+    "LR54 / SR54": (0.8, 1, ["Alkaline Button", "Silver Oxide"], None),
+    "LR60 / SR60": (0.3, 1, ["Alkaline Button", "Silver Oxide"], None),
+    "LR66 / SR66": (0.2, 1, ["Alkaline Button", "Silver Oxide"], None),
+    "SR516": (0.15, 1, ["Silver Oxide"], None),
+    "SR521": (0.2, 1, ["Silver Oxide"], None),
+    "SR527": (0.25, 1, ["Silver Oxide"], None),
+    "SR626": (0.6, 1, ["Silver Oxide"], None),
+    "SR920": (0.9, 1, ["Silver Oxide"], None),
+    "SR927": (1.0, 1, ["Silver Oxide"], None),
+    "Hearing Aid 10": (0.3, 1, ["Zinc-Air"], None),
+    "Hearing Aid 13": (0.83, 1, ["Zinc-Air"], None),
+    "Hearing Aid 312": (0.58, 1, ["Zinc-Air"], None),
+    "Hearing Aid 675": (1.9, 1, ["Zinc-Air"], None),
+    "LiPo Pouch 500mAh": (10, 1, ["Lithium Polymer"], 500),
+    "LiPo Pouch 1000mAh": (20, 1, ["Lithium Polymer"], 1000),
+    "LiPo Pouch 2200mAh 3S": (180, 3, ["Lithium Polymer"], 2200),
+    "LiPo Pouch 5000mAh 4S": (530, 4, ["Lithium Polymer"], 5000),
+    "Phone Prismatic 4000mAh": (60, 1, ["Lithium-ion (LCO)", "Lithium Polymer"], 4000),
+    "Laptop Pack 3S2P": (300, 3, ["Lithium-ion (NMC)", "Lithium-ion (LCO)"], 5200),
+    "E-bike Pack 36V": (3000, 10, ["Lithium-ion (NMC)", "Lithium-ion (NCA)"], 14000),
+    "Prismatic Cell 100Ah": (2000, 1, ["LiFePO4"], 100000),
+    "Prismatic Cell 280Ah": (5400, 1, ["LiFePO4"], 280000),
+    "2V Cell": (8000, 1, ["Lead Acid (Flooded)", "Lead Acid (Gel)"], 200000),
+    "6V 4.5Ah": (700, 3, LEAD_ACID, 4500),
+    "6V 12Ah": (1900, 3, LEAD_ACID, 12000),
+    "12V 7Ah": (2100, 6, LEAD_ACID, 7000),
+    "12V 9Ah": (2600, 6, LEAD_ACID, 9000),
+    "12V 18Ah": (5600, 6, LEAD_ACID, 18000),
+    "12V 35Ah": (10500, 6, LEAD_ACID, 35000),
+    "12V 100Ah": (29000, 6, LEAD_ACID, 100000),
+    "Group 24 (12V)": (20000, 6, LEAD_ACID, 75000),
+    "Group 27 (12V)": (24000, 6, LEAD_ACID, 90000),
+    "Group 31 (12V)": (27000, 6, LEAD_ACID, 105000),
+    "Group 65 Car (12V)": (22000, 6, ["Lead Acid (Flooded)", "Lead Acid (AGM)"], 70000),
+    "Golf Cart 6V": (28000, 3, ["Lead Acid (Flooded)"], 225000),
+    "Solar Wall 48V": (100000, 15, ["LiFePO4"], 100000),
+}
+
+# LiFePO4 packs replacing a lead-acid block use four cells for 12V, not six
+SERIES_OVERRIDES = {("LiFePO4", 6): 4, ("LiFePO4", 3): 2}
+
+
+def packaging_factor(mass_g):
+    # Casing and terminals take a bigger share of very small cells
+    if mass_g < 2:
+        return 0.8
+    if mass_g < 10:
+        return 0.9
+    return 1.0
+
+
+def build_rows():
+    rows = []
+    for form_factor, (mass_g, cells, variants, stated_capacity) in FORM_FACTORS.items():
+        for variant in variants:
+            chemistry, cell_voltage, cycles, density, self_discharge, cost = CHEMISTRIES[variant]
+            series = SERIES_OVERRIDES.get((variant, cells), cells)
+            voltage = round(cell_voltage * series, 2)
+            density = round(density * packaging_factor(mass_g))
+            if stated_capacity:
+                capacity = stated_capacity
+                # Stated packs: mass scales with the chemistry's energy density
+                mass_g = round(capacity / 1000 * voltage / density * 1000, 1)
+            else:
+                capacity = round(density * mass_g / voltage)
+            rows.append({
+                "Type": f"{variant} {form_factor}",
+                "Chemistry": chemistry,
+                "Form Factor": form_factor,
+                "Voltage": voltage,
+                "Capacity (mAh)": capacity,
+                "Lifespan (cycles)": cycles,
+                "Energy Density (Wh/kg)": density,
+                "Self-Discharge (% per month)": self_discharge,
+                "Cost": cost,
+                "Rechargeable": cycles > 1,
+            })
+    return pd.DataFrame(rows, columns=SPEC_COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the battery specification table")
+    parser.add_argument("--output", default=config.SPECS_PATH)
+    parser.add_argument("--parquet", action="store_true", help="also write a .parquet copy next to the CSV")
+    args = parser.parse_args()
+
+    frame = build_rows()
+    if frame["Type"].duplicated().any():
+        raise SystemExit(f"duplicate types: {sorted(frame.loc[frame['Type'].duplicated(), 'Type'])}")
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    frame.to_csv(args.output, index=False)
+    if args.parquet:
+        frame.to_parquet(os.path.splitext(args.output)[0] + ".parquet", index=False)
+    print(f"wrote {len(frame)} batteries ({frame['Chemistry'].nunique()} chemistries, "
+          f"{frame['Form Factor'].nunique()} form factors) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# (Re)generate the recycling knowledge base the Recycling Info page serves
+# (data/recycling_guides.json) by asking the model once per battery type,
+# instead of on every page view. Existing guides for types not being
+# regenerated are kept, and the version number is bumped.
+#
+#   python tools/build_recycling_guides.py                 # every type
+#   python tools/build_recycling_guides.py --types NiCd "Lead Acid"
+#
+# Review the generated text before committing it; the shipped guides are
+# curated by hand ("source": "curated").
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from openai_client import LLMClient  # noqa: E402
+from recycling_kb import RECYCLING_TYPES, guide_messages  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the recycling guide knowledge base")
+    parser.add_argument("--output", default=config.RECYCLING_GUIDES_PATH)
+    parser.add_argument("--types", nargs="+", default=RECYCLING_TYPES, choices=RECYCLING_TYPES)
+    parser.add_argument("--model", default="gpt-4-turbo")
+    parser.add_argument("--max-tokens", type=int, default=600)
+    args = parser.parse_args()
+
+    existing = {"version": 0, "guides": {}}
+    if os.path.exists(args.output):
+        with open(args.output, encoding="utf-8") as f:
+            existing = json.load(f)
+
+    client = LLMClient()
+    guides = dict(existing["guides"])
+    for battery_type in args.types:
+        response = client.create(
+            call_site="recycling_build", model=args.model, messages=guide_messages(battery_type),
+            max_tokens=args.max_tokens
+        )
+        guides[battery_type] = response.choices[0].message.content.strip() + "\n"
+        print(f"generated {battery_type} ({len(guides[battery_type])} chars)")
+
+    knowledge_base = {
+        "version": existing["version"] + 1,
+        "source": args.model,
+        "updated": time.strftime("%Y-%m-%d"),
+        "guides": {t: guides[t] for t in RECYCLING_TYPES if t in guides},
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(knowledge_base, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    print(f"wrote version {knowledge_base['version']} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
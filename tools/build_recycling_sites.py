@@ -0,0 +1,107 @@
+# Build the locator's local datasets from real data:
+#
+#   python tools/build_recycling_sites.py [--gazetteer 2023_Gaz_zcta_national.zip] [--sites sites.csv]
+#
+# --gazetteer  US Census ZCTA gazetteer file (tab-separated, with GEOID,
+#              INTPTLAT and INTPTLONG columns, either the .txt or the .zip it
+#              is published in), a path or a URL. Public domain; defaults to
+#              downloading the national file from GAZETTEER_URL, see
+#              https://www.census.gov/geographies/reference-files/time-series/geo/gazetteer-files.html
+#              Every ZCTA (~33,800) goes into data/zip_centroids.csv, so any
+#              residential ZIP code resolves.
+# --sites      CSV of drop-off sites with name, address, zip and accepts
+#              (";"-separated battery types, e.g. "Alkaline;Lithium-ion").
+#              lat / lon columns are used when present, otherwise the site
+#              is placed at its ZIP centroid.
+# --source     where the sites come from, stored with each row (defaults to
+#              the sites file name); the shipped sample rows say "sample",
+#              which makes the app label them as demonstration data.
+#
+# Writes data/zip_centroids.csv, and data/recycling_sites.csv when --sites is
+# given; without it the existing sites (such as the shipped sample) are kept
+# and only the ZIP table is rebuilt.
+import argparse
+import csv
+import io
+import os
+import sys
+import urllib.request
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from recycling_kb import RECYCLING_TYPES  # noqa: E402
+
+GAZETTEER_URL = "https://www2.census.gov/geo/docs/maps-data/data/gazetteer/2023_Gazetteer/2023_Gaz_zcta_national.zip"
+
+
+def read_gazetteer(source):
+    if source.startswith(("http://", "https://")):
+        print(f"downloading {source}")
+        try:
+            with urllib.request.urlopen(source, timeout=120) as response:
+                data = response.read()
+        except OSError as e:
+            raise SystemExit(f"could not download the gazetteer ({e}); download it by hand and pass --gazetteer FILE")
+    else:
+        with open(source, "rb") as f:
+            data = f.read()
+    if zipfile.is_zipfile(io.BytesIO(data)):
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            name = next(name for name in archive.namelist() if name.endswith(".txt"))
+            data = archive.read(name)
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8")), delimiter="\t")
+    # The last header of the Census file carries trailing whitespace
+    reader.fieldnames = [name.strip() for name in reader.fieldnames]
+    return {row["GEOID"].strip(): (float(row["INTPTLAT"]), float(row["INTPTLONG"])) for row in reader}
+
+
+def write_sites(path, output, source, centroids):
+    written = skipped = 0
+    with open(path, newline="", encoding="utf-8") as f, open(output, "w", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(["name", "address", "zip", "lat", "lon", "accepts", "source"])
+        for row in csv.DictReader(f):
+            zip_code = row["zip"].strip().zfill(5)[:5]
+            accepts = [t.strip() for t in row["accepts"].split(";") if t.strip() in RECYCLING_TYPES]
+            if row.get("lat") and row.get("lon"):
+                lat, lon = float(row["lat"]), float(row["lon"])
+            elif zip_code in centroids:
+                lat, lon = centroids[zip_code]
+            else:
+                lat = lon = None
+            if lat is None or not accepts:
+                skipped += 1
+                continue
+            writer.writerow([row["name"].strip(), row["address"].strip(), zip_code, lat, lon, ";".join(accepts),
+                             source])
+            written += 1
+    return written, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the recycling locator datasets")
+    parser.add_argument("--gazetteer", default=GAZETTEER_URL, help="Census ZCTA gazetteer path or URL (.txt or .zip)")
+    parser.add_argument("--sites", help="CSV of drop-off sites (default: keep the current sites file)")
+    parser.add_argument("--source", help="source recorded with each site (default: the sites file name)")
+    parser.add_argument("--zips-output", default=config.ZIP_CENTROIDS_PATH)
+    parser.add_argument("--sites-output", default=config.RECYCLING_SITES_PATH)
+    args = parser.parse_args()
+
+    centroids = read_gazetteer(args.gazetteer)
+    with open(args.zips_output, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["zip", "lat", "lon"])
+        for zip_code in sorted(centroids):
+            writer.writerow([zip_code, *centroids[zip_code]])
+    print(f"{len(centroids)} ZIP centroids -> {args.zips_output}")
+
+    if args.sites:
+        source = args.source or os.path.basename(args.sites)
+        written, skipped = write_sites(args.sites, args.sites_output, source, centroids)
+        print(f"{written} sites -> {args.sites_output} ({skipped} skipped: unknown ZIP or no known battery type)")
+
+
+if __name__ == "__main__":
+    main()
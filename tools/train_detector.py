@@ -0,0 +1,83 @@
+# Train the local battery detector from a folder of labelled images:
+#
+#   dataset/
+#     not_battery/*.jpg      anything that is not a battery
+#     Alkaline/*.jpg         one folder per coarse class to predict
+#     Lithium-ion/*.jpg
+#     Button Cell/*.jpg
+#
+#   python tools/train_detector.py dataset/ [--output models/battery_detector.npz]
+#
+# Use benchmarks/bench_detector.py on a separate held-out folder with the same
+# layout to measure accuracy and latency.
+import argparse
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from battery_detector import NOT_BATTERY, BatteryDetector, extract_features, softmax  # noqa: E402
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+def load_dataset(root):
+    classes = sorted(d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d)))
+    if NOT_BATTERY not in classes:
+        raise SystemExit(f"{root} needs a '{NOT_BATTERY}' folder of negative examples")
+    classes.remove(NOT_BATTERY)
+    classes.insert(0, NOT_BATTERY)
+
+    features, labels = [], []
+    for label, name in enumerate(classes):
+        folder = os.path.join(root, name)
+        for filename in sorted(os.listdir(folder)):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                with Image.open(os.path.join(folder, filename)) as image:
+                    features.append(extract_features(image))
+                labels.append(label)
+    return classes, np.stack(features), np.asarray(labels)
+
+
+# Full-batch gradient descent on the L2-regularised softmax cross-entropy
+def train(features, labels, n_classes, epochs, learning_rate, l2):
+    mean = features.mean(axis=0)
+    std = features.std(axis=0) + 1e-6
+    x = (features - mean) / std
+    targets = np.eye(n_classes)[labels]
+    weights = np.zeros((x.shape[1], n_classes), dtype=np.float64)
+    bias = np.zeros(n_classes, dtype=np.float64)
+
+    for _ in range(epochs):
+        error = (softmax(x @ weights + bias) - targets) / len(x)
+        weights -= learning_rate * (x.T @ error + l2 * weights)
+        bias -= learning_rate * error.sum(axis=0)
+    return weights.astype(np.float32), bias.astype(np.float32), mean, std
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local battery detector")
+    parser.add_argument("dataset")
+    parser.add_argument("--output", default=config.DETECTOR_MODEL_PATH)
+    parser.add_argument("--epochs", type=int, default=2000)
+    parser.add_argument("--learning-rate", type=float, default=0.5)
+    parser.add_argument("--l2", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    classes, features, labels = load_dataset(args.dataset)
+    print(f"{len(labels)} images, classes: {', '.join(classes)}")
+    weights, bias, mean, std = train(features, labels, len(classes), args.epochs, args.learning_rate, args.l2)
+
+    detector = BatteryDetector(classes, weights, bias, mean.astype(np.float32), std.astype(np.float32))
+    predictions = detector.predict_proba(features).argmax(axis=1)
+    print(f"training accuracy: {(predictions == labels).mean():.1%}")
+    detector.save(args.output)
+    print(f"saved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
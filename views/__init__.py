@@ -0,0 +1,16 @@
+import importlib
+
+# Sidebar label -> module in this package. A page's module (and everything
+# it imports) is loaded the first time the page is opened.
+PAGES = {
+    "Home": "home",
+    "Battery Analyzer": "analyzer",
+    "Battery Comparison": "comparison",
+    "Recycling Info": "recycling",
+    "Usage History": "history",
+    "Performance": "performance",
+}
+
+
+def render(page):
+    importlib.import_module(f"{__name__}.{PAGES[page]}").render()
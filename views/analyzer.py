@@ -0,0 +1,329 @@
+from functools import partial
+
+import streamlit as st
+
+import config
+from battery_analysis import analyze_battery_image, analyze_batch, NotABatteryError
+from battery_parser import extract_battery_type
+from image_pipeline import preprocess_image
+from instrumentation import track
+from llm_cache import stream_cached_completion
+from resources import (get_dedupe_index, get_detector, get_history_store, get_llm_client,
+                       get_response_cache, get_semantic_cache, get_single_flight)
+from prompts import alternatives_messages, chat_messages
+from semantic_cache import battery_partition
+from streaming import stream_completion
+from views.capture import render_live_capture, stop_capture
+from views.common import history_owner, render_cache_stats
+
+
+# Details of the closest past analysis of a near-identical image in the
+# owner's history, if any. The index covers every owner; entries of other
+# owners, and ones removed since the index was built, are skipped. Batch
+# analysis calls this from worker threads, so it takes the shared objects
+# and the owner as arguments instead of looking them up.
+def find_duplicate(processed, history_store, dedupe_index, owner):
+    for _, entry_id in dedupe_index.matches(processed.phash):
+        entry = history_store.get(owner, entry_id)
+        if entry is not None:
+            return entry["details"]
+    return None
+
+# Function to save battery to history
+def save_to_history(processed, details):
+    # Extract key info
+    battery_type = extract_battery_type(details)
+    
+    # Store the entry; the image is written once per content hash
+    entry_id = get_history_store().add(history_owner(), processed, details, battery_type)
+    
+    # Remember the analysis so near-identical uploads can reuse it
+    get_dedupe_index().add(processed.phash, entry_id)
+
+
+def render():
+    client = get_llm_client()
+    response_cache = get_response_cache()
+    single_flight = get_single_flight()
+    semantic_cache = get_semantic_cache()
+    detector = get_detector()
+    find_previous = partial(find_duplicate, history_store=get_history_store(), dedupe_index=get_dedupe_index(),
+                            owner=history_owner())
+    render_cache_stats()
+    
+    if "battery_details" not in st.session_state:
+        st.session_state.battery_details = None
+    if "messages" not in st.session_state:
+        st.session_state.messages = []
+    if "chat_enabled" not in st.session_state:
+        st.session_state.chat_enabled = False
+    if "feedback_given" not in st.session_state:
+        st.session_state.feedback_given = False
+    
+    st.title("🔍 Battery Analyzer")
+    analysis_mode = st.radio("Analysis mode", ["Single image", "Batch", "Live capture"], horizontal=True,
+                             key="analysis_mode")
+    if analysis_mode != "Live capture":
+        stop_capture()
+
+    if analysis_mode == "Single image":
+        st.write("Upload an image of a household battery to analyze it.")
+
+        # Image Upload
+        uploaded_file = st.file_uploader("Upload a battery image", type=["jpg", "jpeg", "png"])
+
+        # Display uploaded image in a smaller size
+        if uploaded_file is not None:
+            # Orient, downscale and encode once per uploaded file (memoized by hash)
+            try:
+                processed = preprocess_image(uploaded_file.getvalue())
+            except Exception as e:
+                st.error(f"Error reading the image: {e}")
+                st.stop()
+            st.image(processed.data, caption="Uploaded Battery Image", width=250)
+
+            # Cheap local check before paying for the vision call
+            rejected = False
+            if detector is not None:
+                detection = detector.predict_bytes([processed.data])[0]
+                if detection.battery_probability < config.DETECTOR_REJECT_BELOW:
+                    rejected = True
+                    st.warning("This image doesn't look like a battery. "
+                               "Try a clearer photo, or analyze it anyway.")
+                elif detection.is_battery and detection.confidence >= config.DETECTOR_CONFIDENT_ABOVE:
+                    st.caption(f"Quick check: looks like a {detection.label} battery ({detection.confidence:.0%} confidence)")
+
+            # Look for a near-identical photo that was analyzed before. Not once
+            # this upload has been analyzed in this session: the history entry
+            # that analysis just added would match it.
+            duplicate = None
+            if st.session_state.get("analyzed_digest") != processed.digest:
+                duplicate = find_previous(processed)
+            if duplicate is not None:
+                st.info("This looks like a battery you've analyzed before. "
+                        "Reuse the previous analysis or analyze it again.")
+
+            # Call OpenAI Vision API
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                if duplicate is not None and st.button("♻️ Reuse Previous Analysis", key="reuse_btn"):
+                    st.session_state.battery_details = duplicate
+                    st.session_state.chat_enabled = True
+                    st.session_state.messages = []
+                    save_to_history(processed, duplicate)
+                    st.session_state.analyzed_digest = processed.digest
+
+                if rejected:
+                    analyze_label = "Analyze Anyway"
+                elif duplicate is not None:
+                    analyze_label = "Force Re-analyze"
+                else:
+                    analyze_label = "Analyze Battery"
+                if st.button(analyze_label, key="analyze_btn"):
+                    with st.spinner("Analyzing battery... This may take a moment."):
+                        try:
+                            # Store battery details in session
+                            st.session_state.battery_details = analyze_battery_image(client, processed)
+                            st.session_state.chat_enabled = True
+                            st.session_state.messages = []
+                            
+                            # Save to history
+                            save_to_history(processed, st.session_state.battery_details)
+                            st.session_state.analyzed_digest = processed.digest
+
+                        except Exception as e:
+                            st.error(f"Error analyzing the image: {e}")
+            
+            with col2:
+                # Widget state can only be changed before the radio is drawn, hence the callback
+                st.button("Take Photo (Camera)", key="camera_btn",
+                          on_click=lambda: st.session_state.update(analysis_mode="Live capture", capture_source="Camera"))
+
+    elif analysis_mode == "Live capture":
+        st.write("Take photos with your camera or upload a video; each battery is analyzed once, "
+                 "from its sharpest steady frame.")
+        render_live_capture(client, detector, find_previous, save_to_history)
+
+    else:
+        st.write("Upload a batch of battery images to analyze them all at once.")
+
+        uploaded_files = st.file_uploader(
+            "Upload battery images", type=["jpg", "jpeg", "png"], accept_multiple_files=True
+        )
+        concurrency = st.slider(
+            "Parallel requests", min_value=1, max_value=config.BATCH_MAX_CONCURRENCY,
+            value=config.BATCH_CONCURRENCY
+        )
+        reuse_duplicates = st.checkbox("Reuse previous analyses for near-duplicate images", value=True)
+
+        if uploaded_files and st.button(f"Analyze All ({len(uploaded_files)})", key="analyze_batch_btn"):
+            progress = st.progress(0.0, text="Analyzing batteries...")
+            results = st.container()
+            uploads = [(f.name, f.getvalue()) for f in uploaded_files]
+            failed = 0
+            skipped = 0
+            reused_count = 0
+
+            # Results are rendered as each request finishes, not in upload order
+            for done, (name, processed, details, reused, error) in enumerate(
+                analyze_batch(client, uploads, concurrency=concurrency,
+                              find_duplicate=find_previous if reuse_duplicates else None, detector=detector),
+                start=1
+            ):
+                if isinstance(error, NotABatteryError):
+                    skipped += 1
+                    results.warning(f"{name}: skipped, {error}")
+                elif error is not None:
+                    failed += 1
+                    results.error(f"{name}: error analyzing the image: {error}")
+                else:
+                    reused_count += reused
+                    save_to_history(processed, details)
+                    label = f"{name} - {extract_battery_type(details)} Battery" + (" (reused)" if reused else "")
+                    with results.expander(label):
+                        col1, col2 = st.columns([1, 3])
+                        with col1:
+                            st.image(processed.data, width=150)
+                        with col2:
+                            st.markdown(details)
+                progress.progress(done / len(uploads), text=f"Analyzed {done} of {len(uploads)} batteries")
+
+            st.success(f"Batch complete: {len(uploads) - failed - skipped} analyzed "
+                       f"({reused_count} reused from earlier analyses), {skipped} not batteries, {failed} failed.")
+
+    # Create tabs for displaying results
+    if st.session_state.battery_details:
+        tabs = st.tabs(["Battery Details", "Ask Questions", "Feedback"])
+        
+        # Tab 1: Battery Details
+        with tabs[0]:
+            st.markdown('<div class="battery-card">', unsafe_allow_html=True)
+            st.subheader("🔋 Battery Details")
+            st.markdown(st.session_state.battery_details)
+            
+            # Generate battery replacement suggestions
+            battery_type = extract_battery_type(st.session_state.battery_details)
+            if battery_type != "Unknown":
+                with st.expander("View Compatible Alternatives"):
+                    try:
+                        # Key fields of the battery only, within the call's token budget
+                        messages, tokens_saved = alternatives_messages(st.session_state.battery_details)
+                        st.write_stream(stream_cached_completion(
+                            response_cache,
+                            client,
+                            "alternatives",
+                            model="gpt-4-turbo",
+                            messages=messages,
+                            max_tokens=300,
+                            flight=single_flight,
+                            tokens_saved=tokens_saved
+                        ))
+                    except Exception as e:
+                        st.error(f"Error generating alternatives: {e}")
+            
+            st.markdown('</div>', unsafe_allow_html=True)
+            
+            # Add download option
+            if st.download_button(
+                label="Download Battery Info (TXT)",
+                data=st.session_state.battery_details,
+                file_name="battery_analysis.txt",
+                mime="text/plain"
+            ):
+                st.success("Battery information downloaded!")
+        
+        # Tab 2: Chatbot UI
+        with tabs[1]:
+            st.subheader("⚡ Power Up Your Knowledge! Ask About This Battery")
+            
+            # Display chat history
+            for message in st.session_state.messages:
+                with st.chat_message(message["role"]):
+                    st.write(message["content"])
+
+            # User Input
+            user_query = st.chat_input("Ask something about this battery...")
+
+            if user_query:
+                # Add user query to session and immediately display it
+                st.session_state.messages.append({"role": "user", "content": user_query})
+                
+                # Display the new user message immediately
+                with st.chat_message("user"):
+                    st.write(user_query)
+
+                try:
+                    # A question close enough to one already answered for the same
+                    # kind of battery gets the stored answer without an API call
+                    partition = battery_partition(st.session_state.battery_details)
+                    cached = None
+                    if partition is not None:
+                        with track("chat", "semantic_cache") as span:
+                            cached = semantic_cache.lookup(partition, user_query)
+                            span["cache"] = "hit" if cached is not None else "miss"
+                    
+                    if cached is not None:
+                        # The cache is shared by all users, so the earlier
+                        # question itself isn't shown
+                        bot_reply, similarity, _ = cached
+                        with st.chat_message("assistant"):
+                            st.write(bot_reply)
+                            st.caption(f"Answered from a similar earlier question ({similarity:.0%} match)")
+                    else:
+                        # Stream the chatbot response with a summary of the battery and
+                        # as much of the conversation as fits the chat token budget
+                        messages, tokens_saved = chat_messages(st.session_state.battery_details,
+                                                               st.session_state.messages)
+                        timing = {}
+                        with st.chat_message("assistant"):
+                            bot_reply = st.write_stream(stream_completion(
+                                client,
+                                "chat",
+                                model="gpt-4-turbo",
+                                messages=messages,
+                                max_tokens=300,
+                                timing=timing,
+                                tokens_saved=tokens_saved
+                            ))
+                            if timing.get("ttft") is not None:
+                                st.caption(f"First token in {timing['ttft']:.2f}s, complete in {timing['total']:.2f}s")
+                        
+                        if partition is not None:
+                            semantic_cache.add(partition, user_query, bot_reply)
+                    
+                    # Add to session
+                    st.session_state.messages.append({"role": "assistant", "content": bot_reply})
+
+                except Exception as e:
+                    st.error(f"Error processing chatbot response: {e}")
+        
+        # Tab 3: Feedback
+        with tabs[2]:
+            st.subheader("💬 Provide Feedback")
+            
+            if not st.session_state.feedback_given:
+                st.write("Was the battery identification accurate?")
+                col1, col2, col3 = st.columns([1, 1, 1])
+                
+                with col1:
+                    if st.button("👍 Yes, accurate"):
+                        st.session_state.feedback_given = True
+                        st.success("Thanks for your feedback!")
+                
+                with col2:
+                    if st.button("👎 No, inaccurate"):
+                        st.session_state.feedback_given = True
+                        st.success("Thanks for your feedback! We'll work to improve.")
+                
+                with col3:
+                    if st.button("🤔 Partially correct"):
+                        st.session_state.feedback_given = True
+                        st.success("Thanks for your feedback!")
+                
+                feedback_text = st.text_area("Additional comments (optional):")
+                if st.button("Submit Feedback"):
+                    if feedback_text:
+                        st.success("Thank you for your detailed feedback!")
+                        st.session_state.feedback_given = True
+            else:
+                st.success("Thank you for your feedback!")
@@ -0,0 +1,163 @@
+from functools import partial
+
+import streamlit as st
+from PIL import Image
+
+from battery_analysis import NotABatteryError, analyze_checked
+from battery_parser import extract_battery_type
+from frame_capture import VIDEO_TYPES, CapturePipeline, FrameSampler, StageTimes, start_video_capture
+from instrumentation import track
+
+# Live capture mode of the Battery Analyzer: camera snapshots or a video file
+# go through the frame sampler, and the frames it picks are analyzed on
+# background workers while capture carries on.
+
+
+# Stop the session's running video capture and camera pipeline, if any.
+# Their results are only read by the page run that started them, so once the
+# user moves on they would keep calling the API for nobody.
+def stop_capture(video=True, camera=True):
+    keys = (["capture_video"] if video else []) + (["capture_pipeline"] if camera else [])
+    for key in keys:
+        handle = st.session_state.pop(key, None)
+        if handle is not None:
+            handle.stop()
+
+
+def render_timings(times):
+    rows = times.summary()
+    if rows:
+        st.dataframe([{
+            "Stage": row["stage"],
+            "Count": row["count"],
+            "Mean (ms)": round(row["mean_ms"], 1),
+            "p95 (ms)": round(row["p95_ms"], 1),
+            "Total (ms)": round(row["total_ms"], 1),
+        } for row in rows], hide_index=True)
+
+
+# Save a finished analysis and return its display label (None if the frame
+# was rejected or failed, after showing why)
+def handle_result(result, save_to_history, container):
+    seconds = f"{result.frame.timestamp:.1f}s"
+    if isinstance(result.error, NotABatteryError):
+        container.warning(f"Frame at {seconds}: skipped, {result.error}")
+        return None
+    if result.error is not None:
+        container.error(f"Frame at {seconds}: error analyzing the image: {result.error}")
+        return None
+    save_to_history(result.processed, result.details)
+    st.session_state.battery_details = result.details
+    st.session_state.chat_enabled = True
+    st.session_state.messages = []
+    return f"{extract_battery_type(result.details)} Battery" + (" (reused)" if result.reused else "")
+
+
+def render_result(container, label, data, details):
+    with container.expander(label):
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            st.image(data, width=150)
+        with col2:
+            st.markdown(details)
+
+
+def render_camera(analyze, save_to_history):
+    # One sampler and pipeline per session. Snapshots are deliberate, so a
+    # single sharp one is enough (no still run to wait for).
+    if "capture_pipeline" not in st.session_state:
+        times = StageTimes()
+        st.session_state.capture_sampler = FrameSampler(stable_frames=1, min_interval=0, max_interval=0, times=times)
+        st.session_state.capture_pipeline = CapturePipeline(analyze, times=times)
+        st.session_state.capture_results = []
+        st.session_state.capture_last_photo = None
+    sampler = st.session_state.capture_sampler
+    pipeline = st.session_state.capture_pipeline
+
+    photo = st.camera_input("Point the camera at a battery and take a photo")
+    if photo is not None and photo.file_id != st.session_state.capture_last_photo:
+        st.session_state.capture_last_photo = photo.file_id
+        image = Image.open(photo).convert("RGB")
+        decision, frame = sampler.offer(image, index=sampler.counts["sampled"])
+        if decision == "blurry":
+            st.warning("That photo is too blurry. Hold the camera steady and try again.")
+        elif decision == "unchanged":
+            st.info("That's the battery that was just analyzed. Point the camera at the next one.")
+        else:
+            pipeline.submit(frame)
+
+    # Analyses keep running on the workers; taking another photo reruns the
+    # page and just queues the next frame
+    status = st.empty()
+    results = st.container()
+    while pipeline.pending:
+        for result in pipeline.results(timeout=0.5):
+            label = handle_result(result, save_to_history, results)
+            if label is not None:
+                st.session_state.capture_results.append((label, result.processed.data, result.details))
+        status.caption(f"Analyzing {pipeline.pending} photo(s)... you can keep taking photos.")
+    for result in pipeline.results():
+        label = handle_result(result, save_to_history, results)
+        if label is not None:
+            st.session_state.capture_results.append((label, result.processed.data, result.details))
+    status.empty()
+
+    for label, data, details in reversed(st.session_state.capture_results):
+        render_result(results, label, data, details)
+    if sampler.counts["sampled"]:
+        with st.expander("Capture timing"):
+            st.caption(f"Photos taken: {sampler.counts['sampled']}, analyzed: {sampler.counts['accepted']}, "
+                       f"too blurry: {sampler.counts['blurry']}, repeats: {sampler.counts['unchanged']}, "
+                       f"dropped while analysis was busy: {pipeline.counts['dropped']}")
+            render_timings(pipeline.times)
+
+
+def render_video(analyze, save_to_history):
+    video = st.file_uploader("Upload a video of batteries", type=VIDEO_TYPES)
+    st.caption("Pan across the batteries and hold each one still for a moment; one sharp frame per battery "
+               "is analyzed. Motion JPEG / AVI, GIF and animated WebP work out of the box; "
+               "MP4, MOV, WebM and MKV need PyAV.")
+    if video is None or not st.button("Detect Batteries", key="capture_video_btn"):
+        return
+
+    times = StageTimes()
+    sampler = FrameSampler(times=times)
+    pipeline = CapturePipeline(analyze, times=times)
+    status = st.empty()
+    results = st.container()
+    analyzed = 0
+    with track("capture_video", "capture") as span:
+        capture = start_video_capture(video.getvalue(), sampler, pipeline)
+        st.session_state.capture_video = capture
+        while capture.is_alive() or pipeline.pending:
+            for result in pipeline.results(timeout=0.3):
+                label = handle_result(result, save_to_history, results)
+                if label is not None:
+                    analyzed += 1
+                    render_result(results, f"{result.frame.timestamp:.1f}s - {label}", result.processed.data,
+                                  result.details)
+            status.caption(f"Read {sampler.counts['frames']} frames, checked {sampler.counts['sampled']}, "
+                           f"sent {sampler.counts['accepted']} to analysis...")
+        span.update(frames=sampler.counts["frames"], sampled=sampler.counts["sampled"], analyzed=analyzed)
+    st.session_state.pop("capture_video", None)
+    status.empty()
+
+    if capture.error is not None:
+        st.error(f"Error reading the video: {capture.error}")
+    st.success(f"Read {sampler.counts['frames']} frames and checked {sampler.counts['sampled']}: "
+               f"{sampler.counts['blurry']} blurry, {sampler.counts['unchanged']} showing an already analyzed "
+               f"battery, {sampler.counts['accepted']} sent to analysis ({analyzed} batteries identified).")
+    with st.expander("Capture timing"):
+        render_timings(times)
+
+
+def render_live_capture(client, detector, find_previous, save_to_history):
+    analyze = partial(analyze_checked, client, find_duplicate=find_previous, detector=detector)
+    source = st.radio("Source", ["Camera", "Video file"], horizontal=True, key="capture_source")
+    if source == "Camera":
+        stop_capture(camera=False)
+        render_camera(analyze, save_to_history)
+    else:
+        # Including a video from an earlier run of this page: nothing reads it any more
+        stop_capture()
+        render_video(analyze, save_to_history)
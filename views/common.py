@@ -0,0 +1,72 @@
+import re
+import secrets
+
+import streamlit as st
+
+import config
+from resources import get_llm_client, get_response_cache, get_semantic_cache, get_single_flight
+
+
+# Response cache statistics, shown in the sidebar on the pages that call the API
+def render_cache_stats():
+    response_cache = get_response_cache()
+    # The client can't be created without an API key; the Performance page
+    # still shows the cache statistics then
+    try:
+        client = get_llm_client()
+    except Exception as e:
+        client, client_error = None, e
+    single_flight = get_single_flight()
+    semantic_cache = get_semantic_cache()
+    with st.sidebar.expander("⚡ Response Cache"):
+        cache_stats = response_cache.stats()
+        st.write(f"Hits: {cache_stats['hits']} / Misses: {cache_stats['misses']} "
+                 f"({cache_stats['hit_rate']:.0%} hit rate)")
+        st.write(f"API calls saved: {cache_stats['lifetime_hits']} "
+                 f"(~{cache_stats['lifetime_saved_seconds']:.1f}s of latency)")
+        st.write(f"Cached responses: {cache_stats['entries']}")
+        if client is not None:
+            client_stats = client.stats()
+            st.write(f"API calls: {client_stats['calls']} ({client_stats['retries']} retries, "
+                     f"{client_stats['rate_limited']} rate limited)")
+        else:
+            st.write(f"API calls: none, the API client isn't available ({client_error})")
+        flight_stats = single_flight.stats()
+        st.write(f"Identical concurrent requests coalesced: {flight_stats['coalesced']} "
+                 f"(upstream calls: {flight_stats['upstream_calls']})")
+        semantic_stats = semantic_cache.stats()
+        st.write(f"Chat answers reused for similar questions: {semantic_stats['hits']} "
+                 f"({semantic_stats['hit_rate']:.0%} hit rate, {semantic_stats['entries']} stored)")
+        if st.button("Clear Cache", key="clear_cache_btn"):
+            response_cache.clear()
+            semantic_cache.clear()
+
+
+_OWNER_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+
+# Owner of the history entries this session reads and writes: the signed-in
+# user's email when authentication is configured, otherwise a random ID kept
+# in a cookie so each browser has its own history. Streamlit can read
+# cookies but not set them, so the cookie is written once per session by an
+# empty iframe; until the browser sends it back the ID lives in the
+# session. Call from the script thread (worker threads get it passed in).
+def history_owner():
+    if config.HISTORY_SHARED:
+        return ""
+    if st.user.get("is_logged_in"):
+        return f"user:{st.user.get('email')}"
+    cookie = st.context.cookies.get(config.HISTORY_OWNER_COOKIE)
+    if "history_owner" not in st.session_state:
+        valid = isinstance(cookie, str) and _OWNER_PATTERN.match(cookie)
+        st.session_state.history_owner = cookie if valid else secrets.token_urlsafe(24)
+    owner = st.session_state.history_owner
+    if cookie != owner and not st.session_state.get("history_owner_cookie_set"):
+        st.session_state.history_owner_cookie_set = True
+        max_age = config.HISTORY_OWNER_COOKIE_DAYS * 86400
+        st.iframe(
+            f"<script>window.parent.document.cookie = '{config.HISTORY_OWNER_COOKIE}={owner}; "
+            f"max-age={max_age}; path=/; SameSite=Lax';</script>",
+            height="content",
+        )
+    return owner
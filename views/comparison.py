@@ -0,0 +1,100 @@
+import streamlit as st
+
+from battery_specs import CRITERIA, DEFAULT_WEIGHTS, NUMERIC_METRICS
+from charts import bar_chart_png
+from instrumentation import track
+from llm_cache import prompt_key
+from prompts import comparison_messages
+from resources import get_llm_client, get_single_flight, get_spec_table
+from streaming import stream_completion
+from views.common import render_cache_stats
+
+
+# Comparison bar chart, cached as PNG bytes per (data, metric) so reruns that
+# don't change the data never touch matplotlib
+@st.cache_data(max_entries=64)
+def cached_bar_chart(labels, values, metric):
+    with track("comparison_chart", "chart"):
+        return bar_chart_png(list(labels), list(values), metric)
+
+
+def render():
+    client = get_llm_client()
+    single_flight = get_single_flight()
+    spec_table = get_spec_table()
+    render_cache_stats()
+    
+    st.title("📊 Battery Type Comparison")
+    
+    # Filters shared by the table, chart and ranking
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        chemistries = st.multiselect("Chemistry:", spec_table.chemistries)
+    with col2:
+        form_factors = st.multiselect("Form factor:", spec_table.form_factors)
+    with col3:
+        rechargeable = {"Any": None, "Yes": True, "No": False}[st.selectbox("Rechargeable:", ["Any", "Yes", "No"])]
+    keep = spec_table.mask(chemistries, form_factors, rechargeable)
+    
+    # Display as table
+    st.subheader("Battery Types Comparison Table")
+    st.caption(f"{int(keep.sum())} of {len(spec_table)} batteries")
+    st.dataframe(spec_table.frame[keep])
+    
+    # Create comparison charts
+    st.subheader("Battery Performance Metrics")
+    
+    chart_option = st.selectbox("Select comparison metric:", NUMERIC_METRICS)
+    
+    # Create the bar chart (typical value per chemistry)
+    if keep.any():
+        by_chemistry = spec_table.metric_by_chemistry(chart_option, keep)
+        st.image(cached_bar_chart(tuple(by_chemistry.index), tuple(by_chemistry.tolist()), chart_option))
+    
+    # Rank every battery against the user's weights in one pass
+    st.subheader("Find the Best Battery")
+    st.write("How much does each criterion matter to you? (0 = ignore)")
+    weight_cols = st.columns(len(CRITERIA))
+    weights = {}
+    for weight_col, criterion in zip(weight_cols, CRITERIA):
+        with weight_col:
+            weights[criterion] = st.slider(criterion, 0, 5, DEFAULT_WEIGHTS[criterion], key=f"weight_{criterion}")
+    top_k = st.slider("Number of results:", 1, 50, 10)
+    
+    if sum(weights.values()) == 0:
+        st.info("Give at least one criterion a weight to see a ranking.")
+    else:
+        st.dataframe(spec_table.rank(weights, top_k, chemistries, form_factors, rechargeable))
+    
+    # Additional comparison features
+    st.subheader("Custom Battery Comparison")
+    
+    selected = st.multiselect(
+        "Select batteries to compare:", spec_table.frame.index,
+        default=[t for t in ["Alkaline AA", "NiMH AA"] if t in spec_table.frame.index],
+        max_selections=6
+    )
+    
+    if st.button("Compare Selected Batteries"):
+        if len(selected) < 2:
+            st.warning("Select at least two batteries to compare.")
+        else:
+            # Create comparison
+            comparison = spec_table.compare(selected)
+            st.table(comparison.astype(str))
+            
+            # Generate detailed comparison
+            st.subheader("Detailed Comparison Analysis")
+            
+            try:
+                # One compact row per battery, within the call's token budget
+                messages, tokens_saved = comparison_messages(comparison, selected)
+                # Sessions comparing the same batteries at the same time share one stream
+                st.write_stream(single_flight.do_stream(
+                    prompt_key("gpt-4-turbo", messages, 300),
+                    lambda: stream_completion(client, "comparison", "gpt-4-turbo", messages, 300,
+                                              tokens_saved=tokens_saved)
+                ))
+                
+            except Exception as e:
+                st.error(f"Error generating comparison: {e}")
@@ -0,0 +1,195 @@
+import streamlit as st
+
+import config
+from charts import pie_chart_png
+from history_archive import FORMATS, ArchiveError, import_archive, spool_export
+from instrumentation import track
+from resources import get_dedupe_index, get_history_store
+from views.common import history_owner
+
+
+# Pie chart of battery types, cached as PNG bytes and re-rendered only when
+# the counts change
+@st.cache_data(max_entries=16)
+def cached_pie_chart(type_counts):
+    with track("history_pie_chart", "chart"):
+        return pie_chart_png([label for label, _ in type_counts], [size for _, size in type_counts])
+
+
+# Built only when the download button is clicked, on Streamlit's download
+# thread, and spooled to a temp file instead of held as one bytes object
+def deferred_export(history_store, owner, fmt, filters):
+    def build():
+        with track("history_export", "archive", format=fmt):
+            return spool_export(history_store, owner, fmt, **filters)
+    return build
+
+
+def render_import(history_store, owner):
+    archive = st.file_uploader("Import a history archive (ZIP):", type="zip", key="history_import_file")
+    if archive is None or not st.button("Import Archive"):
+        return
+    
+    # New entries go into the duplicate index batch by batch rather than
+    # rebuilding it from the whole history afterwards
+    dedupe_index = get_dedupe_index()
+    progress = st.empty()
+    
+    def on_batch(inserted, counts):
+        for entry in inserted:
+            if entry["phash"] is not None:
+                dedupe_index.add(entry["phash"], entry["id"])
+        progress.write(f"Imported {sum(counts.values())} entries: " + ", ".join(
+            f"{battery_type} {count}" for battery_type, count in counts.most_common()
+        ))
+    
+    try:
+        with track("history_import", "archive"):
+            imported, skipped, invalid, _ = import_archive(history_store, owner, archive, on_batch=on_batch)
+    except ArchiveError as e:
+        st.error(f"Could not import {archive.name}: {e}")
+        return
+    st.session_state.history_import_result = (
+        f"Imported {imported} entries from {archive.name}"
+        + (f" ({skipped} already present or missing their image were skipped)." if skipped else ".")
+        + (f" {invalid} entries with a corrupt or mismatched image were rejected." if invalid else "")
+    )
+    st.session_state.history_page = 0
+    st.rerun()
+
+
+def render():
+    history_store = get_history_store()
+    owner = history_owner()
+    
+    if "history_page" not in st.session_state:
+        st.session_state.history_page = 0
+    if "history_view_ids" not in st.session_state:
+        st.session_state.history_view_ids = []
+    if "history_filters" not in st.session_state:
+        st.session_state.history_filters = None
+    
+    st.title("📝 Battery Analysis History")
+    
+    history_count = history_store.count(owner)
+    
+    if history_count == 0:
+        st.info("You haven't analyzed any batteries yet. Try uploading a battery image in the Battery Analyzer tab.")
+    else:
+        st.write(f"You have analyzed {history_count} batteries.")
+        
+        # Stats and visualizations
+        battery_type_counts = history_store.type_counts(owner)
+        if battery_type_counts:
+            st.subheader("Battery Types Statistics")
+            
+            # Create pie chart of battery types (re-rendered only when the counts change)
+            st.image(cached_pie_chart(tuple(battery_type_counts.items())))
+        
+        # Display battery history entries, one page at a time (newest first)
+        st.subheader("Battery Analysis Entries")
+        
+        # Filters are answered by the type / timestamp indexes
+        col1, col2, col3 = st.columns([2, 2, 1])
+        with col1:
+            type_filter = st.selectbox("Battery type:", ["All types"] + list(battery_type_counts.keys()))
+        with col2:
+            date_range = st.date_input("Date range:", value=(), key="history_dates")
+        with col3:
+            page_size = st.selectbox(
+                "Per page:", config.HISTORY_PAGE_SIZES,
+                index=config.HISTORY_PAGE_SIZES.index(config.HISTORY_PAGE_SIZE)
+                if config.HISTORY_PAGE_SIZE in config.HISTORY_PAGE_SIZES else 0
+            )
+        
+        filters = {
+            "battery_type": None if type_filter == "All types" else type_filter,
+            "start_date": date_range[0] if len(date_range) > 0 else None,
+            "end_date": date_range[1] if len(date_range) > 1 else None,
+        }
+        
+        # Go back to the first page whenever the filters change
+        filter_key = (type_filter, tuple(date_range), page_size)
+        if st.session_state.history_filters != filter_key:
+            st.session_state.history_filters = filter_key
+            st.session_state.history_page = 0
+        
+        filtered_count = history_store.count(owner, **filters)
+        page_count = max(1, (filtered_count + page_size - 1) // page_size)
+        st.session_state.history_page = min(st.session_state.history_page, page_count - 1)
+        st.session_state.history_view_ids = history_store.page_ids(
+            owner, offset=st.session_state.history_page * page_size, limit=page_size, **filters
+        )
+        
+        if filtered_count == 0:
+            st.info("No entries match these filters.")
+        
+        for entry in history_store.get_many(owner, st.session_state.history_view_ids):
+            with st.expander(f"{entry['timestamp']} - {entry['type']} Battery"):
+                col1, col2 = st.columns([1, 3])
+                
+                with col1:
+                    # Show the thumbnail; the full image is only read when asked for
+                    try:
+                        if st.toggle("Full image", key=f"full_{entry['id']}"):
+                            st.image(history_store.load_image(entry))
+                        else:
+                            st.image(history_store.load_thumbnail(entry), width=150)
+                    except Exception as e:
+                        st.caption(f"Image unavailable: {e}")
+                
+                with col2:
+                    st.markdown(entry['details'])
+                
+                if st.button("Remove Entry", key=f"remove_{entry['id']}"):
+                    history_store.remove(owner, entry['id'])
+                    st.success("Entry removed!")
+                    st.rerun()
+        
+        # Page navigation
+        if page_count > 1:
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                if st.button("◀ Newer", disabled=st.session_state.history_page == 0):
+                    st.session_state.history_page -= 1
+                    st.rerun()
+            with col2:
+                st.write(f"Page {st.session_state.history_page + 1} of {page_count} ({filtered_count} entries)")
+            with col3:
+                if st.button("Older ▶", disabled=st.session_state.history_page >= page_count - 1):
+                    st.session_state.history_page += 1
+                    st.rerun()
+        
+        # Clear history button. In shared mode everyone's history goes, so
+        # ask for confirmation first.
+        confirmed = not config.HISTORY_SHARED or st.checkbox(
+            "This history is shared by everyone using this instance; clear it for all of them"
+        )
+        if st.button("Clear All History", disabled=not confirmed):
+            history_store.clear(owner)
+            get_dedupe_index.clear()
+            st.session_state.history_page = 0
+            st.session_state.history_view_ids = []
+            st.success("History cleared!")
+            st.rerun()
+    
+    # Bulk export of the entries matching the filters above, and import of
+    # archives exported from this or another instance
+    st.subheader("Export / Import")
+    if "history_import_result" in st.session_state:
+        st.success(st.session_state.pop("history_import_result"))
+    if history_count:
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            fmt = st.selectbox("Format:", list(FORMATS), format_func=lambda name: {
+                "csv": "CSV (details only)", "parquet": "Parquet (details only)", "zip": "ZIP (images + manifest)"
+            }[name])
+        with col2:
+            mime, extension = FORMATS[fmt]
+            st.download_button(
+                label=f"Download {filtered_count} Entries",
+                data=deferred_export(history_store, owner, fmt, filters),
+                file_name=f"battery_history{extension}",
+                mime=mime
+            )
+    render_import(history_store, owner)
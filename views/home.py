@@ -0,0 +1,33 @@
+import streamlit as st
+
+from resources import get_history_store
+from views.common import history_owner
+
+
+def render():
+    st.title("🔋 Battery Hub: One Spot for Batteries!")
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.markdown("""
+        ## Welcome to Battery Hub!
+        
+        Your intelligent assistant for all things battery-related:
+        
+        - 📸 **Identify batteries** from photos
+        - 💬 **Chat with our AI** about battery specs and usage
+        - 📊 **Compare different battery types**
+        - ♻️ **Learn about proper recycling**
+        - 📝 **Track your battery usage** over time
+        
+        Get started by navigating to the Battery Analyzer section!
+        """)
+    
+    with col2:
+        st.image("https://cdn-icons-png.flaticon.com/512/4712/4712035.png", width=150)
+        
+        # Quick stats if there's history
+        history_count = get_history_store().count(history_owner())
+        if history_count > 0:
+            st.info(f"You've analyzed {history_count} batteries so far!")
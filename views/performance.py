@@ -0,0 +1,62 @@
+import pandas as pd
+import streamlit as st
+
+import config
+from instrumentation import recorder
+from views.common import render_cache_stats
+
+
+def render():
+    render_cache_stats()
+    
+    st.title("⏱️ Performance")
+    st.write("Latency, token spend and cache behaviour of every instrumented call site in this server process.")
+    
+    summary = recorder.summary()
+    if not summary:
+        st.info("No calls recorded yet. Use the other pages and come back here.")
+    else:
+        def to_ms(seconds):
+            return round(seconds * 1000, 1) if seconds is not None else None
+        
+        perf_df = pd.DataFrame([{
+            "Call site": row["call_site"],
+            "Kind": row["kind"],
+            "Calls": row["count"],
+            "p50 (ms)": to_ms(row["p50"]),
+            "p95 (ms)": to_ms(row["p95"]),
+            "p99 (ms)": to_ms(row["p99"]),
+            "First token p50 (ms)": to_ms(row["ttft_p50"]),
+            "Prompt tokens": row["prompt_tokens"],
+            "Completion tokens": row["completion_tokens"],
+            "Tokens saved": row["tokens_saved"],
+            "Cost (USD)": round(row["cost_usd"], 4),
+            "Payload (KB)": round(row["payload_bytes"] / 1024, 1),
+            "Cache hit rate": f"{row['cache_hits'] / row['cache_lookups']:.0%}" if row["cache_lookups"] else None,
+            "Errors": row["errors"],
+        } for row in summary])
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Calls recorded", int(perf_df["Calls"].sum()))
+        col2.metric("Tokens used", int(perf_df["Prompt tokens"].sum() + perf_df["Completion tokens"].sum()))
+        col3.metric("Estimated spend", f"${perf_df['Cost (USD)'].sum():.2f}")
+        
+        st.subheader("Latency by Call Site")
+        st.dataframe(perf_df.set_index("Call site"))
+        st.bar_chart(perf_df.set_index("Call site")[["p50 (ms)", "p95 (ms)", "p99 (ms)"]])
+        
+        st.subheader("Export")
+        st.download_button(
+            label="Download Records (JSONL)",
+            data=recorder.jsonl(),
+            file_name="batteryhub_metrics.jsonl",
+            mime="application/x-ndjson"
+        )
+        with st.expander("Prometheus Metrics"):
+            if config.METRICS_PORT:
+                st.caption(f"Also served at http://127.0.0.1:{config.METRICS_PORT}/metrics")
+            st.code(recorder.prometheus_text(), language="text")
+        
+        if st.button("Reset Metrics"):
+            recorder.clear()
+            st.rerun()
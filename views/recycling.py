@@ -0,0 +1,96 @@
+import re
+
+import streamlit as st
+
+from instrumentation import track
+from recycling_kb import RECYCLING_TYPES, guide_messages
+from resources import (get_llm_client, get_recycling_guides, get_recycling_locator, get_response_cache,
+                       get_single_flight)
+
+
+# Guide for a type missing from the local knowledge base: ask the model
+# (through the shared response cache)
+def generated_guide(battery_type):
+    from llm_cache import cached_completion
+    return cached_completion(
+        get_response_cache(),
+        get_llm_client(),
+        "recycling",
+        model="gpt-4-turbo",
+        messages=guide_messages(battery_type),
+        max_tokens=400,
+        flight=get_single_flight()
+    )
+
+
+def render():
+    guides = get_recycling_guides()
+    
+    st.title("♻️ Battery Recycling Guide")
+    
+    st.markdown("""
+    ## Why Recycle Batteries?
+    
+    Batteries contain materials that can be harmful to the environment if not disposed of properly. 
+    Recycling batteries helps recover valuable materials and prevents toxic substances from contaminating soil and water.
+    """)
+    
+    # Recycling information by battery type
+    st.subheader("Recycling Instructions by Battery Type")
+    
+    battery_type = st.selectbox(
+        "Select battery type for recycling information:",
+        RECYCLING_TYPES
+    )
+    
+    # Display recycling information based on selection (from the local
+    # knowledge base; only types missing from it go to the model)
+    if battery_type:
+        guide = guides.get(battery_type) if guides is not None else None
+        if guide is not None:
+            st.markdown(guide)
+            st.caption(f"Recycling guide v{guides.version} ({guides.updated}). "
+                       "Always check local rules, which vary by city and state.")
+        else:
+            try:
+                st.markdown(generated_guide(battery_type))
+            except Exception as e:
+                st.error(f"Error generating recycling information: {e}")
+    
+    # Recycling locator
+    st.subheader("📍 Battery Recycling Locator")
+    
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        zip_code = st.text_input("Enter your ZIP code to find nearby recycling locations:").strip()
+    with col2:
+        # Follows the guide's type (a new default index resets the widget)
+        locator_type = st.selectbox("Battery type to drop off:", RECYCLING_TYPES,
+                                    index=RECYCLING_TYPES.index(battery_type))
+    
+    if zip_code and st.button("Find Recycling Locations"):
+        if not re.fullmatch(r"\d{5}", zip_code):
+            st.warning("Please enter a 5-digit US ZIP code.")
+        else:
+            locator = get_recycling_locator()
+            with track("recycling_locator", "locator"):
+                sites = locator.nearest(zip_code, locator_type)
+            if sites is None:
+                st.warning(f"ZIP code {zip_code} isn't in the local location data.")
+            elif not sites:
+                st.info(f"No drop-off sites for {locator_type} batteries in the local data.")
+            else:
+                matched_zip = locator.locate(zip_code)[2]
+                if matched_zip != zip_code:
+                    st.caption(f"ZIP {zip_code} isn't listed; showing sites near {matched_zip}.")
+                if any(site["sample"] for site in sites):
+                    st.warning("These are sample sites bundled with the app for demonstration, not real drop-off "
+                               "locations. Check with your local waste authority before making a trip.")
+                st.markdown(f"### Nearest sites accepting {locator_type} batteries:")
+                for number, site in enumerate(sites, start=1):
+                    st.markdown(
+                        f"{number}. **{site['name']}**  \n"
+                        f"   {site['address']}  \n"
+                        f"   {site['distance_miles']:.1f} miles away  \n"
+                        f"   Accepts: {', '.join(site['accepts'])}"
+                    )